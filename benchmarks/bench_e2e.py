@@ -0,0 +1,328 @@
+"""
+End-to-end benchmark of digest builds against local provider stubs.
+
+Starts a stub server for every provider (stub_providers.py) and an SMTP
+sink (smtp_sink.py), imports main.py configured against them in a scratch
+working directory, and calls prepare_send_email() repeatedly.  Reports
+latency percentiles for the whole build and for each section.
+
+    python benchmarks/bench_e2e.py [--runs N] [--latency-ms MS] [--size ics=1000] [--json PATH]
+
+Caches (forecast, MeteoAlarm, NWS, summaries, calendar index, circuit
+breakers) are wiped before every run so each one does the full fetch; pass
+--warm to keep them.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import math
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import pytz
+from cryptography.fernet import Fernet
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+from smtp_sink import SMTPSink  # noqa: E402
+from stub_providers import DEFAULT_SIZES, ProviderStubs, redirect_hosts  # noqa: E402
+
+# country -> (latitude, longitude, timezone, city/region used for alert matching)
+LOCATIONS = {
+    "us": ("40.7128", "-74.0060", "America/New_York", "New York, NY"),
+    "de": ("52.5200", "13.4050", "Europe/Berlin", "Berlin"),
+}
+
+# Functions timed as sections, by the module attribute prepare_send_email()
+# (THREADED) or build_digest_async() (ASYNC) looks them up through.
+_THREADED_SECTIONS = {
+    "weather": "get_weather",
+    "todo": "get_todo",
+    "calendar": "get_cal_data",
+    "rss": "get_rss_feed",
+    "wotd": "get_word_of_the_day",
+    "qotd": "get_quote_of_the_day",
+    "puzzles": "get_puzzles_of_the_day",
+    "send": "send_email",
+}
+_ASYNC_SECTIONS = {
+    "weather": "get_forecast_async",
+    "todo": "get_todo_tasks_async",
+    "calendar": "get_cal_data_async",
+    "summary": "generate_summary_async",
+    "rss": "get_rss_async",
+    "wotd": "get_wotd_async",
+    "qotd": "get_qotd_async",
+    "puzzles": "get_puzzles",
+    "send": "deliver_pending",
+}
+
+
+class SectionTimer:
+    """Accumulates wall time per section for the run in progress."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = {}
+
+    def add(self, section, seconds):
+        with self._lock:
+            self.current[section] = self.current.get(section, 0.0) + seconds
+
+    def take(self):
+        with self._lock:
+            current, self.current = self.current, {}
+        return current
+
+    def wrap(self, section, func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.add(section, time.perf_counter() - start)
+            return timed_async
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(section, time.perf_counter() - start)
+        return timed
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples):
+    """{section: {"n", "p50", "p90", "p99", "mean", "max"}} in milliseconds."""
+    result = {}
+    for section, values in samples.items():
+        ms = [v * 1000 for v in values]
+        result[section] = {
+            "n": len(ms),
+            "p50": percentile(ms, 50),
+            "p90": percentile(ms, 90),
+            "p99": percentile(ms, 99),
+            "mean": statistics.fmean(ms),
+            "max": max(ms),
+        }
+    return result
+
+
+def _parse_overrides(pairs, kind):
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        if name not in DEFAULT_SIZES or not value:
+            raise SystemExit(f"--{kind} expects PROVIDER=VALUE with PROVIDER one of {', '.join(DEFAULT_SIZES)}")
+        overrides[name] = int(value) if kind == "size" else float(value) / 1000
+    return overrides
+
+
+def _environment(args, stubs, sink, location):
+    latitude, longitude, tz_name, _ = location
+    recipients = [f"reader{i}@example.com" for i in range(args.recipients)]
+    return {
+        "ENCRYPTION_KEY": Fernet.generate_key().decode(),
+        "PASSWORD": "bench",
+        "SSL_CERT_FILE": sink.cert_path,
+        "OPENAI_BASE_URL": f"{stubs.urls['openai']}/v1",
+        "RECIPIENT_EMAIL": ",".join(recipients),
+        "RECIPIENT_NAME": ",".join(f"Reader {i}" for i in range(args.recipients)),
+        "SENDER_EMAIL": "digest@example.com",
+        "SMTP_USERNAME": "bench",
+        "SMTP_PASSWORD": "bench",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(sink.port),
+        "OPENAI_API_KEY": "sk-bench",
+        "ENABLE_SUMMARY": "True",
+        "ENABLE_EMOJIS": "True",
+        "UNIT_SYSTEM": "METRIC",
+        "TIME_SYSTEM": "24HR",
+        "LATITUDE": latitude,
+        "LONGITUDE": longitude,
+        "ADDRESS": "",
+        "WEATHER": "True",
+        "TODOIST_API_KEY": "bench",
+        "VIKUNJA_API_KEY": "bench",
+        "VIKUNJA_BASE_URL": stubs.urls["vikunja"],
+        "WEBCAL_LINKS": f"{stubs.urls['ics']}/calendar.ics",
+        "CALDAV_ACCOUNTS": json.dumps([stubs.caldav_account()]),
+        "CALENDAR_INDEX": "True",
+        "RSS_LINKS": ",".join(f"{stubs.urls['rss']}/feed-{i}.xml" for i in range(args.feeds)),
+        "PUZZLES": "True",
+        "PUZZLES_ANSWERS": "True",
+        "WOTD": "True",
+        "QOTD": "True",
+        "TIMEZONE": tz_name,
+        "HOUR": "6",
+        "MINUTE": "0",
+        "LOGGING_LEVEL": args.log_level,
+        "DISABLE_SCHEDULE": "True",
+        "EXECUTION_MODE": args.mode,
+        "FORECAST_CACHE_GRID": "",
+        "FORECAST_OUTLOOK": "",
+        "WEATHER_ALERTS_MODE": "FULL",
+    }
+
+
+def clear_caches():
+    import circuit_breaker
+    import forecast_cache
+    import meteoalarm_cache
+    import nws_cache
+    import occurrence_index
+
+    shutil.rmtree("./cache", ignore_errors=True)
+    os.makedirs("./cache", exist_ok=True)
+    for module in (forecast_cache, meteoalarm_cache, nws_cache, circuit_breaker, occurrence_index):
+        module.clear()
+
+
+def _instrument(main, timer, mode):
+    """Wrap every section function, where the build looks it up, with the timer."""
+    if mode == "ASYNC":
+        import async_engine
+        target, sections = async_engine, _ASYNC_SECTIONS
+    else:
+        import generate_summary
+        target, sections = main, _THREADED_SECTIONS
+        # The summary runs in the background; time the model call itself.
+        generate_summary.generate_summary = timer.wrap("summary", generate_summary.generate_summary)
+    for section, attribute in sections.items():
+        setattr(target, attribute, timer.wrap(section, getattr(target, attribute)))
+
+
+def run(args):
+    country = args.country
+    location = LOCATIONS[country]
+    tz = pytz.timezone(location[2])
+    stubs = ProviderStubs(
+        sizes=_parse_overrides(args.size, "size"),
+        latency=args.latency_ms / 1000,
+        latencies=_parse_overrides(args.latency, "latency"),
+        jitter=args.jitter_ms / 1000,
+        timezone=tz,
+        area=location[3],
+    )
+    workdir = tempfile.mkdtemp(prefix="bench-e2e-")
+    shutil.copy(os.path.join(REPO_DIR, "version.json"), workdir)
+    previous_dir = os.getcwd()
+
+    with stubs, SMTPSink(delay=args.smtp_delay_ms / 1000) as sink, redirect_hosts(stubs.fixed_hosts()):
+        os.environ.update(_environment(args, stubs, sink, location))
+        os.chdir(workdir)
+        try:
+            import main
+
+            main.country_code = country
+            main.city_state_str = location[3]
+            timer = SectionTimer()
+            _instrument(main, timer, args.mode)
+
+            samples = {"total": []}
+            failures = 0
+            for i in range(args.warmup + args.runs):
+                if not args.warm:
+                    clear_caches()
+                stubs.reset_counts()
+                timer.take()
+                delivered = sink.messages
+                start = time.perf_counter()
+                main.prepare_send_email()
+                elapsed = time.perf_counter() - start
+                sections = timer.take()
+                if sink.messages - delivered != args.recipients:
+                    failures += 1
+                if i < args.warmup:
+                    continue
+                samples["total"].append(elapsed)
+                for section, seconds in sections.items():
+                    samples.setdefault(section, []).append(seconds)
+            requests_per_run = dict(sorted(stubs.requests.items()))
+        finally:
+            os.chdir(previous_dir)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "config": {
+            "mode": args.mode,
+            "country": country,
+            "runs": args.runs,
+            "warm": args.warm,
+            "recipients": args.recipients,
+            "latency_ms": args.latency_ms,
+            "sizes": stubs.sizes,
+        },
+        "failures": failures,
+        "requests_per_run": requests_per_run,
+        "latency_ms": summarize(samples),
+    }
+
+
+def print_report(report):
+    config = report["config"]
+    print(
+        f"{config['mode']} mode, {config['runs']} run(s), {'warm' if config['warm'] else 'cold'} caches, "
+        f"{config['latency_ms']:g} ms stub latency, {config['recipients']} recipient(s)"
+    )
+    print(f"{'section':<10} {'n':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'max ms':>9}")
+    rows = report["latency_ms"]
+    for section in ["total", *sorted(s for s in rows if s != "total")]:
+        row = rows[section]
+        print(
+            f"{section:<10} {row['n']:>4} {row['p50']:>9.1f} {row['p90']:>9.1f} "
+            f"{row['p99']:>9.1f} {row['mean']:>9.1f} {row['max']:>9.1f}"
+        )
+    print(f"requests per run: {report['requests_per_run']}")
+    if report["failures"]:
+        print(f"WARNING: {report['failures']} run(s) did not deliver every message")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="measured runs")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs first")
+    parser.add_argument("--mode", choices=["THREADED", "ASYNC"], default="THREADED")
+    parser.add_argument("--country", choices=sorted(LOCATIONS), default="us",
+                        help="us exercises NWS alerts, de MeteoAlarm")
+    parser.add_argument("--latency-ms", type=float, default=50, help="delay before every stub response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="random extra delay up to this much")
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=MS",
+                        help="per-provider latency override")
+    parser.add_argument("--size", action="append", default=[], metavar="PROVIDER=N",
+                        help="per-provider payload size (days, events, items, tasks)")
+    parser.add_argument("--smtp-delay-ms", type=float, default=0, help="delay after each message at the SMTP sink")
+    parser.add_argument("--recipients", type=int, default=1)
+    parser.add_argument("--feeds", type=int, default=3, help="number of RSS feeds")
+    parser.add_argument("--warm", action="store_true", help="keep caches between runs")
+    parser.add_argument("--log-level", default="CRITICAL", help="LOGGING_LEVEL for the app")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Micro-benchmarks of the CPU-bound parts of a digest build.
+
+Times each parsing/formatting function on synthetic inputs (synthetic.py)
+with no network involved; send_email delivers to a local SMTP sink.
+
+    python benchmarks/bench_micro.py [--scale S] [--filter TEXT] [--json PATH] [--compare BASELINE.json]
+
+--scale multiplies every input size (0.1 for a quick smoke run).  --json
+writes per-call timings with the environment they were taken in; --compare
+reads such a file and exits with status 1 if any case got slower than
+--threshold percent, so CI can track regressions.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone as dt_timezone
+
+import pytz
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+import synthetic  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+TZ = pytz.timezone("America/New_York")
+
+_sink = None  # the SMTPSink send_email delivers to, while run() is active
+
+# Input sizes at --scale 1: events, masters, tasks, days, alerts, lines
+SIZES = {
+    "add_emojis": 2000,
+    "ics_flat": 2000,
+    "ics_rrule": 20,
+    "ics_override_masters": 20,
+    "ics_overrides_per_master": 50,
+    "ics_feeds": 4,
+    "ics_feed_events": 500,
+    "calendar_events": 500,
+    "todo_tasks": 500,
+    "forecast_days": 16,
+    "alerts": 200,
+    "email_sections": 200,
+}
+
+
+def _scaled(name, scale):
+    return max(1, round(SIZES[name] * scale))
+
+
+# ── cases ──────────────────────────────────────────────────────────────────────
+# Each case takes the scale and returns (input size, callable to time).
+
+def _add_emojis(scale):
+    from add_emojis import add_emojis
+
+    size = _scaled("add_emojis", scale)
+    text = synthetic.digest_text(size)
+    return size, lambda: add_emojis(text)
+
+
+def _parse_icalendar(generator):
+    def case(scale):
+        from get_ical_events import parse_icalendar
+
+        size, ics = generator(scale)
+        return size, lambda: parse_icalendar(ics)
+    return case
+
+
+def _flat_feed(scale):
+    size = _scaled("ics_flat", scale)
+    return size, synthetic.flat_ics(size, TZ)
+
+
+def _rrule_feed(scale):
+    size = _scaled("ics_rrule", scale)
+    return size, synthetic.rrule_ics(size, TZ)
+
+
+def _override_feed(scale):
+    masters = _scaled("ics_override_masters", scale)
+    overrides = SIZES["ics_overrides_per_master"]
+    return masters * overrides, synthetic.override_ics(masters, overrides, TZ)
+
+
+def _events_today(scale):
+    from get_ical_events import events_today_from_ical
+
+    size, ics = _flat_feed(scale)
+    return size, lambda: events_today_from_ical(ics, TZ)
+
+
+def _scan_then_events_today(scale):
+    from get_ical_events import events_today_from_ical
+    from ics_stream import scan_calendar
+
+    size, ics = _flat_feed(scale)
+    feed = ics.encode()
+    today = datetime.now(TZ).date()
+    return size, lambda: events_today_from_ical(scan_calendar(feed, today), TZ)
+
+
+def _parse_feeds(processes):
+    """Several feeds downloaded together, parsed in-process or in `processes` workers."""
+    def case(scale):
+        import ics_parse_pool
+        from concurrent.futures import ThreadPoolExecutor
+
+        count = _scaled("ics_feeds", scale)
+        feed = synthetic.flat_ics(_scaled("ics_feed_events", scale), TZ).encode()
+        ics_parse_pool.configure(processes)
+
+        def call():
+            with ThreadPoolExecutor(max_workers=count) as threads:
+                return list(threads.map(ics_parse_pool.parse_feed, [feed] * count))
+        return count, call
+    return case
+
+
+def _format_cal_events(scale):
+    from get_cal_data import format_cal_events
+
+    size = _scaled("calendar_events", scale)
+    events = synthetic.calendar_events_today(size, TZ)
+    # Localized once, as today's filter does before format_cal_events() sees them
+    for event in events:
+        event.localize(TZ)
+    return size, lambda: format_cal_events(list(events), TZ, "12HR")
+
+
+def _format_todo_tasks(scale):
+    from get_todo_tasks import format_todo_tasks
+
+    size = _scaled("todo_tasks", scale)
+    todoist = synthetic.todoist_task_objects(size, TZ)
+    vikunja = synthetic.vikunja_task_dicts(size, TZ)
+    return 2 * size, lambda: format_todo_tasks(TZ, "12HR", todoist, vikunja, "https://vikunja.example.com")
+
+
+def _format_forecast(scale):
+    from get_forecast import format_forecast
+
+    size = _scaled("forecast_days", scale)
+    forecast, aqi = synthetic.forecast_payloads(size, TZ)
+    return size, lambda: format_forecast(
+        forecast, aqi, "", "40.7128", "-74.0060", "us", "New York, NY", "IMPERIAL", "12HR", TZ, outlook=7
+    )
+
+
+def _format_alerts_us(scale):
+    from get_forecast import _format_alerts_us
+
+    size = _scaled("alerts", scale)
+    data = synthetic.nws_alerts(size)
+    return size, lambda: _format_alerts_us(data, "12HR", TZ)
+
+
+def _meteoalarm(scale):
+    from get_forecast import _format_alerts_meteoalarm, _parse_meteoalarm_items
+
+    size = _scaled("alerts", scale)
+    feed = synthetic.meteoalarm_bytes(size)
+    berlin = pytz.timezone("Europe/Berlin")
+    return size, lambda: _format_alerts_meteoalarm(_parse_meteoalarm_items(feed), "germany", "24HR", berlin)
+
+
+def _gen_sudoku(scale):
+    from gen_sudoku import gen_sudoku
+
+    def call():
+        random.seed(9)
+        return gen_sudoku(3, 0.5)
+    return 81, call
+
+
+def _get_puzzles(scale):
+    from get_puzzles import get_puzzles
+
+    def call():
+        random.seed(10)
+        return get_puzzles()
+    return 1, call
+
+
+def _send_email(scale):
+    from send_email import send_email
+
+    size = _scaled("email_sections", scale)
+    events = synthetic.calendar_events_today(size, TZ)
+    cal_string = "\n\n# Events" + "".join(f"\n\n### {e['summary']}\n\n{e['description']}" for e in events)
+    todo_string = synthetic.digest_text(size)
+    weather_string = "\n\n# Weather\n\nSunny, high of 75°F."
+    return size, lambda: send_email(
+        "bench", TZ, "reader@example.com", "Reader", "digest@example.com", "bench", "bench",
+        "127.0.0.1", _sink.port, enable_summary="False", enable_emjois="True",
+        date_string="# Monday, January 5, 2026", weather_string=weather_string,
+        todo_string=todo_string, todo_plain_string=todo_string, cal_string=cal_string,
+    )
+
+
+CASES = {
+    "add_emojis": _add_emojis,
+    "parse_icalendar/flat": _parse_icalendar(_flat_feed),
+    "parse_icalendar/rrule": _parse_icalendar(_rrule_feed),
+    "parse_icalendar/overrides": _parse_icalendar(_override_feed),
+    "parse_feeds/in-process": _parse_feeds(0),
+    "parse_feeds/process-pool": _parse_feeds(4),
+    "events_today_from_ical": _events_today,
+    "events_today_from_ical/scanned": _scan_then_events_today,
+    "format_cal_events": _format_cal_events,
+    "format_todo_tasks": _format_todo_tasks,
+    "format_forecast": _format_forecast,
+    "alerts/nws": _format_alerts_us,
+    "alerts/meteoalarm": _meteoalarm,
+    "gen_sudoku": _gen_sudoku,
+    "get_puzzles": _get_puzzles,
+    "send_email": _send_email,
+}
+
+
+# ── runner ─────────────────────────────────────────────────────────────────────
+
+def time_case(func, repeat, min_time):
+    """Per-call seconds for each of `repeat` runs, each at least `min_time` long."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return [total / number for total in timer.repeat(repeat=repeat, number=number)], number
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    global _sink
+    selected = [name for name in CASES if not args.filter or any(f in name for f in args.filter)]
+    workdir = tempfile.mkdtemp(prefix="bench-micro-")
+    previous_dir = os.getcwd()
+    results = {}
+    with SMTPSink() as sink:
+        _sink = sink
+        os.environ["SSL_CERT_FILE"] = sink.cert_path
+        # send_email spools to ./data/outbox; keep that out of the checkout
+        os.chdir(workdir)
+        try:
+            for name in selected:
+                size, func = CASES[name](args.scale)
+                func()  # warm up imports and caches
+                per_call, number = time_case(func, args.repeat, args.min_time)
+                results[name] = {
+                    "size": size,
+                    "number": number,
+                    "min_us": min(per_call) * 1e6,
+                    "median_us": statistics.median(per_call) * 1e6,
+                    "mean_us": statistics.fmean(per_call) * 1e6,
+                }
+                if not args.json_only:
+                    _print_row(name, results[name])
+        finally:
+            from ics_parse_pool import shutdown
+
+            shutdown()
+            os.chdir(previous_dir)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Cases whose median per-call time grew by more than `threshold` percent."""
+    regressions = {}
+    for name, row in report["results"].items():
+        before = baseline["results"].get(name)
+        if not before or before["size"] != row["size"]:
+            continue
+        change = (row["median_us"] / before["median_us"] - 1) * 100
+        if change > threshold:
+            regressions[name] = change
+    return regressions
+
+
+def _print_header():
+    print(f"{'case':<32} {'size':>6} {'calls':>7} {'min µs':>12} {'median µs':>12} {'mean µs':>12}")
+
+
+def _print_row(name, row):
+    print(
+        f"{name:<32} {row['size']:>6} {row['number']:>7} {row['min_us']:>12.1f} "
+        f"{row['median_us']:>12.1f} {row['mean_us']:>12.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for every input size")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing run")
+    parser.add_argument("--filter", action="append", help="only cases whose name contains this; repeatable")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON ('-' for stdout only)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier --json run")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="percent slowdown of the median that counts as a regression")
+    args = parser.parse_args()
+    args.json_only = args.json == "-"
+    # Per-call info/debug logging would dominate the timings
+    logging.disable(logging.WARNING)
+    if args.filter:
+        unknown = [f for f in args.filter if not any(f in name for name in CASES)]
+        if unknown:
+            raise SystemExit(f"no case matches {', '.join(unknown)}; cases: {', '.join(CASES)}")
+
+    if not args.json_only:
+        _print_header()
+    report = run(args)
+    if args.json_only:
+        json.dump(report, sys.stdout, indent=2)
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for name, change in regressions.items():
+            print(f"REGRESSION {name}: median {change:+.0f}%", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
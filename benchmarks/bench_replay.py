@@ -0,0 +1,166 @@
+"""
+Record real upstream responses once, then replay them for deterministic runs.
+
+    python benchmarks/bench_replay.py record --cassette DIR [--target ...]
+    python benchmarks/bench_replay.py replay --cassette DIR [--runs N] [--latency-scale S] [--json PATH]
+
+Targets are get_forecast, get_cal_data, get_rss and the whole digest
+(prepare_send_email; its email goes to a local SMTP sink, never to the
+configured server).  Settings come from the app's own configuration (.env
+and data/config.json).  Runs happen in a scratch working directory with
+caches wiped before each one, so the user's caches and outbox are left
+alone.
+
+Replay reports latency percentiles per target and a hash of each target's
+output: one distinct hash across runs means the run was deterministic, and
+the same hash on two versions of the code means they produced the same
+output from the same inputs.  Output that depends on the current date or
+time only compares within the same day as the recording.
+"""
+
+import argparse
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+import http_cassette  # noqa: E402
+from bench_e2e import clear_caches, summarize  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+TARGETS = ["forecast", "calendar", "rss", "digest"]
+
+
+def _fingerprint(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            digest.update(part.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _target_functions(main, country):
+    """target -> callable returning the hash of that target's output."""
+    from get_cal_data import get_cal_data
+    from get_forecast import get_forecast
+    from get_rss import get_rss
+
+    outputs = []
+    real_send_email = main.send_email
+    signature = inspect.signature(real_send_email)
+
+    @functools.wraps(real_send_email)
+    def send_email(*args, **kwargs):
+        # Puzzles are generated at random, and the summary is a Future
+        sections = signature.bind(*args, **kwargs).arguments
+        outputs.append(_fingerprint(*(
+            value for name, value in sections.items()
+            if name not in ("puzzles_string", "puzzles_ans_string")
+        )))
+        return real_send_email(*args, **kwargs)
+
+    main.send_email = send_email
+
+    def digest():
+        outputs.clear()
+        main.prepare_send_email()
+        return outputs[-1] if outputs else "no email"
+
+    return {
+        "forecast": lambda: _fingerprint(get_forecast(
+            main.LATITUDE, main.LONGITUDE, country, "", main.UNIT_SYSTEM, main.TIME_SYSTEM,
+            main.timezone, main.VERSION,
+        ) or ""),
+        "calendar": lambda: _fingerprint(get_cal_data(
+            main.WEBCAL_LINKS, main.timezone, main.TIME_SYSTEM, main.CALDAV_ACCOUNTS
+        )),
+        "rss": lambda: _fingerprint(get_rss(main.RSS_LINKS, main.timezone, main.TIME_SYSTEM) if main.RSS_LINKS else ""),
+        "digest": digest,
+    }
+
+
+def run(args):
+    cassette_dir = os.path.abspath(args.cassette)
+    workdir = tempfile.mkdtemp(prefix="bench-replay-")
+    shutil.copy(os.path.join(REPO_DIR, "version.json"), workdir)
+    if os.path.exists(os.path.join(REPO_DIR, "data", "config.json")):
+        os.makedirs(os.path.join(workdir, "data"))
+        shutil.copy(os.path.join(REPO_DIR, "data", "config.json"), os.path.join(workdir, "data"))
+    previous_dir = os.getcwd()
+
+    with SMTPSink() as sink:
+        os.environ["SSL_CERT_FILE"] = sink.cert_path
+        os.environ.pop("HTTP_CASSETTE_MODE", None)
+        os.chdir(workdir)
+        try:
+            import main
+
+            main.SMTP_HOST, main.SMTP_PORT = "127.0.0.1", sink.port
+            main.country_code = args.country
+            targets = _target_functions(main, args.country)
+            selected = args.target or TARGETS
+            runs = 1 if args.mode == http_cassette.RECORD else args.runs
+            samples, hashes = {}, {}
+            with http_cassette.cassette(args.mode, cassette_dir, args.latency_scale):
+                for _ in range(runs):
+                    for target in selected:
+                        clear_caches()
+                        start = time.perf_counter()
+                        output_hash = targets[target]()
+                        samples.setdefault(target, []).append(time.perf_counter() - start)
+                        hashes.setdefault(target, set()).add(output_hash)
+        finally:
+            os.chdir(previous_dir)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "mode": args.mode,
+        "cassette": cassette_dir,
+        "latency_scale": args.latency_scale,
+        "latency_ms": summarize(samples),
+        "output_hashes": {target: sorted(values) for target, values in hashes.items()},
+    }
+
+
+def print_report(report):
+    print(f"{report['mode'].lower()} of {report['cassette']} (latency scale {report['latency_scale']:g})")
+    print(f"{'target':<10} {'n':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'mean ms':>9}  output")
+    for target, row in report["latency_ms"].items():
+        hashes = report["output_hashes"][target]
+        output = hashes[0] if len(hashes) == 1 else f"{len(hashes)} different outputs!"
+        print(
+            f"{target:<10} {row['n']:>4} {row['p50']:>9.1f} {row['p90']:>9.1f} "
+            f"{row['p99']:>9.1f} {row['mean']:>9.1f}  {output}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("mode", type=str.upper, choices=[http_cassette.RECORD, http_cassette.REPLAY])
+    parser.add_argument("--cassette", required=True, help="cassette directory")
+    parser.add_argument("--target", action="append", choices=TARGETS, help="repeatable; default all")
+    parser.add_argument("--runs", type=int, default=10, help="replay runs per target")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="replay delay as a multiple of the recorded latency (0 = none)")
+    parser.add_argument("--country", default="us", help="country code for weather alerts")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
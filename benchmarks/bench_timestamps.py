@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for timestamp formatting in alert sections.
+
+Compares timestamps.format_timestamp() with the strptime cascade that
+get_forecast._fmt_timestamp() used before (three strptime formats, then
+parsedate_to_datetime, re-building the output format on every call).
+
+    python benchmarks/bench_timestamps.py [--number N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+import pytz
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from timestamps import format_timestamp  # noqa: E402
+
+TZ = pytz.timezone("America/New_York")
+
+# The shapes seen in NWS, CAP/MeteoAlarm and RSS alert items.
+SAMPLES = {
+    "iso_offset": "2026-01-15T08:30:00-05:00",
+    "iso_z": "2026-01-15T08:30:00Z",
+    "iso_naive": "2026-01-15T08:30:00",
+    "rfc_2822": "Thu, 15 Jan 2026 08:30:00 +0000",
+    "unparseable": "until further notice",
+}
+
+
+def legacy_fmt_timestamp(ts, time_system, timezone):
+    """The previous implementation, kept here as the baseline."""
+    if not ts:
+        return ""
+    for fmt_str in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            dt = datetime.strptime(ts, fmt_str)
+            if dt.tzinfo:
+                dt = dt.astimezone(timezone)
+            out_fmt = (
+                "%Y-%m-%d %I:%M %p %Z" if time_system.upper() == "12HR" else "%Y-%m-%d %H:%M %Z"
+            )
+            return dt.strftime(out_fmt)
+        except ValueError:
+            pass
+    try:
+        dt = parsedate_to_datetime(ts).astimezone(timezone)
+        out_fmt = (
+            "%Y-%m-%d %I:%M %p %Z" if time_system.upper() == "12HR" else "%Y-%m-%d %H:%M %Z"
+        )
+        return dt.strftime(out_fmt)
+    except Exception:
+        pass
+    return ts
+
+
+def run(number):
+    """Return {sample: {"legacy_us", "current_us", "speedup"}} per-call timings."""
+    results = {}
+    for name, ts in SAMPLES.items():
+        legacy = min(timeit.repeat(lambda: legacy_fmt_timestamp(ts, "12HR", TZ), number=number, repeat=3))
+        current = min(timeit.repeat(lambda: format_timestamp(ts, "12HR", TZ), number=number, repeat=3))
+        results[name] = {
+            "legacy_us": legacy / number * 1e6,
+            "current_us": current / number * 1e6,
+            "speedup": legacy / current if current else float("inf"),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    args = parser.parse_args()
+
+    print(f"{'sample':<12} {'legacy µs':>10} {'current µs':>11} {'speedup':>8}")
+    for name, row in run(args.number).items():
+        print(f"{name:<12} {row['legacy_us']:>10.2f} {row['current_us']:>11.2f} {row['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+A local SMTP-over-TLS sink for benchmarks.
+
+Speaks just enough SMTP (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET,
+NOOP, QUIT) for smtplib.SMTP_SSL, accepts every message and keeps only
+counts.  The server certificate is self-signed for localhost/127.0.0.1;
+point SSL_CERT_FILE at `cert_path` before the SMTP session creates its
+SSL context so the certificate verifies.
+"""
+
+import datetime
+import ipaddress
+import os
+import socketserver
+import ssl
+import tempfile
+import threading
+import time
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+
+def _write_self_signed_cert(directory):
+    """Write cert.pem and key.pem for localhost into `directory`; returns both paths."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+        self.wfile.flush()
+
+    def _read_line(self):
+        return self.rfile.readline().decode("utf-8", "replace").rstrip("\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        self._reply("220 localhost ESMTP bench sink")
+        while True:
+            line = self._read_line()
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == "AUTH":
+                if line.split()[1].upper() == "LOGIN":
+                    self._reply("334 VXNlcm5hbWU6")
+                    self._read_line()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self._read_line()
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    size += len(data)
+                if sink.delay:
+                    time.sleep(sink.delay)
+                sink.record(size)
+                self._reply("250 OK queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            elif not line:
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _TLSServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, sink, context):
+        self.sink = sink
+        self.context = context
+        super().__init__(address, handler)
+
+    def get_request(self):
+        sock, address = super().get_request()
+        return self.context.wrap_socket(sock, server_side=True), address
+
+
+class SMTPSink:
+    """
+    SMTP_SSL sink on 127.0.0.1.  `delay` is slept after each DATA, to model
+    a slow relay.
+
+        with SMTPSink() as sink:
+            os.environ["SSL_CERT_FILE"] = sink.cert_path
+            ... send to ("127.0.0.1", sink.port) ...
+            sink.messages, sink.bytes
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.messages = 0
+        self.bytes = 0
+        self.port = None
+        self.cert_path = None
+        self._lock = threading.Lock()
+        self._server = None
+        self._tmpdir = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="smtp-sink-")
+        self.cert_path, key_path = _write_self_signed_cert(self._tmpdir.name)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert_path, key_path)
+        self._server = _TLSServer(("127.0.0.1", 0), _SMTPHandler, self, context)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+
+    def record(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
@@ -0,0 +1,591 @@
+"""
+Local HTTP stubs for every upstream provider of a digest.
+
+Each provider gets its own ThreadingHTTPServer on 127.0.0.1 serving
+synthetic payloads whose size (days of forecast, number of events, tasks,
+feed items, ...) and response latency are configurable, so end-to-end
+runs are repeatable and don't touch the real services.
+
+Providers reached through a configurable URL (webcal and RSS links, the
+CalDAV account, Vikunja) are simply pointed at their stub.  Providers with
+fixed hosts (Open-Meteo, NWS, MeteoAlarm, Todoist, zenquotes,
+Merriam-Webster, OpenAI) are reached through redirect_hosts(), which
+rewrites requests to those hosts at the transport level of requests and
+httpx.  Nothing in src/ knows about the stubs.
+"""
+
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+from xml.sax.saxutils import escape
+
+import pytz
+
+# provider -> number of items served (forecast days, alerts, events, ...)
+DEFAULT_SIZES = {
+    "forecast": 7,
+    "air_quality": 5,
+    "nws": 3,
+    "meteoalarm": 60,
+    "ics": 200,
+    "caldav": 20,
+    "rss": 40,
+    "todoist": 40,
+    "vikunja": 40,
+    "zenquotes": 1,
+    "wotd": 1,
+    "openai": 3,
+}
+
+# Providers whose host is hard-coded in src/ and must be redirected.
+FIXED_HOSTS = {
+    "forecast": "api.open-meteo.com",
+    "air_quality": "air-quality-api.open-meteo.com",
+    "nws": "api.weather.gov",
+    "meteoalarm": "feeds.meteoalarm.org",
+    "todoist": "api.todoist.com",
+    "zenquotes": "zenquotes.io",
+    "wotd": "www.merriam-webster.com",
+    "openai": "api.openai.com",
+}
+
+_WORDS = (
+    "weather review standup budget garden library quarterly invoice dentist "
+    "planning migration release roadmap coffee groceries concert laundry "
+    "deploy report training workshop interview marathon recital"
+).split()
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+
+def _json(payload):
+    return 200, "application/json", json.dumps(payload).encode()
+
+
+def _xml(text, content_type="application/rss+xml"):
+    return 200, content_type, text.encode()
+
+
+# ── payload generators ─────────────────────────────────────────────────────────
+
+def forecast_payload(query, days, tz):
+    """Open-Meteo /v1/forecast for the daily= and hourly= variables asked for."""
+    rng = random.Random(1)
+    today = datetime.now(tz).date()
+    dates = [(today + timedelta(days=d)).isoformat() for d in range(days)]
+    hours = [f"{d}T{h:02d}:00" for d in dates for h in range(24)]
+
+    daily = {"time": dates}
+    for var in query.get("daily", [""])[0].split(","):
+        if var in ("sunrise", "sunset"):
+            daily[var] = [f"{d}T{'06:45' if var == 'sunrise' else '17:30'}" for d in dates]
+        elif var == "weathercode":
+            daily[var] = [rng.choice([0, 1, 2, 3, 61, 63, 71]) for _ in dates]
+        elif var:
+            daily[var] = [round(rng.uniform(0, 25), 1) for _ in dates]
+
+    hourly = {"time": hours}
+    for var in query.get("hourly", [""])[0].split(","):
+        if var:
+            hourly[var] = [round(rng.uniform(0, 90), 1) for _ in hours]
+    return {"timezone": str(tz), "daily": daily, "hourly": hourly}
+
+
+def air_quality_payload(query, days, tz):
+    """Open-Meteo /v1/air-quality: hourly values for every requested variable."""
+    rng = random.Random(2)
+    today = datetime.now(tz).date()
+    hours = [f"{today + timedelta(days=d)}T{h:02d}:00" for d in range(days) for h in range(24)]
+    hourly = {"time": hours}
+    for var in query.get("hourly", [""])[0].split(","):
+        if var:
+            hourly[var] = [rng.randint(5, 120) for _ in hours]
+    return {"hourly": hourly}
+
+
+def nws_points_payload():
+    return {
+        "properties": {
+            "forecastZone": "https://api.weather.gov/zones/forecast/BNZ001",
+            "county": "https://api.weather.gov/zones/county/BNC001",
+        }
+    }
+
+
+def nws_alerts_payload(count):
+    rng = random.Random(3)
+    now = datetime.now(pytz.UTC)
+    features = []
+    for i in range(count):
+        features.append({
+            "id": f"urn:oid:bench.alert.{i}",
+            "properties": {
+                "event": rng.choice(["Wind Advisory", "Flood Watch", "Winter Storm Warning"]),
+                "severity": rng.choice(["Minor", "Moderate", "Severe"]),
+                "headline": _sentence(rng, 8),
+                "description": " ".join(_sentence(rng, 12) + "." for _ in range(4)),
+                "onset": (now - timedelta(hours=2)).isoformat(),
+                "expires": (now + timedelta(hours=10)).isoformat(),
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def meteoalarm_feed(count, area):
+    """MeteoAlarm legacy RSS with CAP fields; every third item covers `area`."""
+    rng = random.Random(4)
+    now = datetime.now(pytz.UTC)
+    items = []
+    for i in range(count):
+        region = area if i % 3 == 0 else f"Region {i}"
+        items.append(
+            "<item>"
+            f"<title>{escape(_sentence(rng, 4))}</title>"
+            f"<description>{escape(_sentence(rng, 20))}</description>"
+            f"<pubDate>{format_datetime(now - timedelta(hours=1))}</pubDate>"
+            f"<cap:onset>{(now - timedelta(hours=1)).isoformat()}</cap:onset>"
+            f"<cap:expires>{(now + timedelta(hours=12)).isoformat()}</cap:expires>"
+            f"<cap:severity>{rng.choice(['Minor', 'Moderate', 'Severe'])}</cap:severity>"
+            f"<cap:areaDesc>{escape(region)}</cap:areaDesc>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:cap="urn:oasis:names:tc:emergency:cap:1.2"><channel>'
+        "<title>MeteoAlarm</title>" + "".join(items) + "</channel></rss>"
+    )
+
+
+def _vevent(rng, uid, start, all_day=False, rrule=None):
+    if all_day:
+        when = f"DTSTART;VALUE=DATE:{start:%Y%m%d}\r\nDTEND;VALUE=DATE:{start + timedelta(days=1):%Y%m%d}"
+    else:
+        end = start + timedelta(minutes=rng.choice([30, 60, 90]))
+        when = f"DTSTART:{start:%Y%m%dT%H%M%SZ}\r\nDTEND:{end:%Y%m%dT%H%M%SZ}"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{start:%Y%m%dT%H%M%SZ}" if not all_day else f"DTSTAMP:{start:%Y%m%d}T000000Z",
+        when,
+        f"SUMMARY:{_sentence(rng, 3)}",
+        f"LOCATION:{rng.randint(1, 999)} {_sentence(rng, 1)} Street",
+        f"DESCRIPTION:{_sentence(rng, 10)}",
+    ]
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    lines.append("END:VEVENT")
+    return "\r\n".join(lines)
+
+
+def ics_events(count, tz, seed=5):
+    """
+    VEVENT blocks: a quarter today (timed and all-day), some weekly
+    recurring, the rest scattered over the past year as in a real calendar.
+    """
+    rng = random.Random(seed)
+    midnight = tz.localize(datetime.combine(datetime.now(tz).date(), datetime.min.time()))
+    events = []
+    for i in range(count):
+        uid = f"bench-{seed}-{i}@stub"
+        kind = i % 8
+        if kind in (0, 1):
+            start = (midnight + timedelta(hours=8 + i % 10)).astimezone(pytz.UTC)
+            events.append(_vevent(rng, uid, start))
+        elif kind == 2:
+            events.append(_vevent(rng, uid, midnight.date(), all_day=True))
+        elif kind == 3:
+            start = (midnight - timedelta(days=7 * rng.randint(1, 30), hours=-9)).astimezone(pytz.UTC)
+            events.append(_vevent(rng, uid, start, rrule="FREQ=WEEKLY"))
+        else:
+            start = (midnight - timedelta(days=rng.randint(1, 365), hours=-rng.randint(7, 20))).astimezone(pytz.UTC)
+            events.append(_vevent(rng, uid, start))
+    return events
+
+
+def ics_feed(count, tz):
+    return "\r\n".join([
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//dailySummaryEmail//bench//EN",
+        *ics_events(count, tz),
+        "END:VCALENDAR",
+        "",
+    ])
+
+
+def rss_feed(count):
+    rng = random.Random(6)
+    now = datetime.now(pytz.UTC)
+    items = "".join(
+        "<item>"
+        f"<title>{escape(_sentence(rng, 6))}</title>"
+        f"<link>https://news.example.com/{i}</link>"
+        f"<description>{escape(_sentence(rng, 30))}</description>"
+        f"<pubDate>{format_datetime(now - timedelta(minutes=37 * i))}</pubDate>"
+        "</item>"
+        for i in range(count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        "<title>Bench News</title><link>https://news.example.com/</link>"
+        f"<description>Synthetic feed</description>{items}</channel></rss>"
+    )
+
+
+def wotd_feed():
+    now = datetime.now(pytz.UTC)
+    summary = escape(
+        "<p><strong>Petrichor</strong> is the pleasant smell after rain.</p>"
+        "<p>Petrichor means the earthy scent produced when rain falls on dry soil.\n"
+        "// The petrichor drifted through the open window.\nSee the entry ></p>"
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        "<title>Word of the Day</title><item><title>petrichor</title>"
+        f"<description>{summary}</description><pubDate>{format_datetime(now)}</pubDate>"
+        "</item></channel></rss>"
+    )
+
+
+_TODOIST_TIMESTAMP = "2026-01-01T00:00:00.000000Z"
+
+
+def todoist_projects(count):
+    projects = max(1, count // 10)
+    return [
+        {
+            "id": f"p{i}", "name": f"Project {i}", "description": "", "child_order": i,
+            "color": "charcoal", "is_collapsed": False, "is_shared": False, "is_favorite": False,
+            "is_archived": False, "can_assign_tasks": False, "view_style": "list",
+            "created_at": _TODOIST_TIMESTAMP, "updated_at": _TODOIST_TIMESTAMP,
+            "inbox_project": i == 0,
+        }
+        for i in range(projects)
+    ]
+
+
+def todoist_sections(count):
+    return [
+        {"id": f"s{i}", "name": f"Section {i}", "project_id": f"p{i % max(1, count // 10)}",
+         "is_collapsed": False, "section_order": i}
+        for i in range(max(1, count // 5))
+    ]
+
+
+def todoist_tasks(count, tz):
+    rng = random.Random(7)
+    today = datetime.now(tz).date()
+    projects = max(1, count // 10)
+    sections = max(1, count // 5)
+    tasks = []
+    for i in range(count):
+        if i % 3 == 0:
+            due = {"date": today.isoformat(), "string": "today", "is_recurring": False}
+        else:
+            due = {"date": f"{today}T{8 + i % 12:02d}:30:00", "string": "today", "is_recurring": i % 5 == 0}
+        tasks.append({
+            "id": f"t{i}", "content": _sentence(rng, 4), "description": "",
+            "project_id": f"p{i % projects}", "section_id": f"s{i % sections}" if i % 2 else None,
+            "parent_id": None, "labels": [], "priority": rng.randint(1, 4), "due": due,
+            "deadline": None, "duration": None, "is_collapsed": False, "child_order": i,
+            "responsible_uid": None, "assigned_by_uid": None, "completed_at": None,
+            "added_by_uid": "u1", "added_at": _TODOIST_TIMESTAMP, "updated_at": _TODOIST_TIMESTAMP,
+        })
+    return tasks
+
+
+def vikunja_tasks(count, tz):
+    rng = random.Random(8)
+    today = datetime.now(tz).date()
+    return [
+        {
+            "id": i,
+            "title": _sentence(rng, 4),
+            "done": i % 10 == 9,
+            "due_date": f"{today}T{8 + i % 12:02d}:00:00Z" if i % 4 else None,
+            "priority": rng.randint(1, 5),
+            "project": {"title": f"Project {i % 4}"},
+            "bucket": {"title": "Doing"} if i % 3 == 0 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def chat_completion(sentences):
+    rng = random.Random(9)
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4o-mini",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": " ".join(_sentence(rng, 12) + "." for _ in range(sentences))},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 400, "completion_tokens": 60, "total_tokens": 460},
+    }
+
+
+# ── CalDAV ─────────────────────────────────────────────────────────────────────
+
+_CALDAV_PRINCIPAL = "/principal/"
+_CALDAV_HOME = "/calendars/"
+_CALDAV_CALENDAR = "/calendars/bench/"
+
+
+def _dav_response(href, props):
+    return (
+        f"<d:response><d:href>{href}</d:href><d:propstat><d:prop>{props}</d:prop>"
+        "<d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>"
+    )
+
+
+def _multistatus(responses):
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<d:multistatus xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:caldav">'
+        + "".join(responses) + "</d:multistatus>"
+    )
+
+
+def _collection_props(path):
+    calendar = path == _CALDAV_CALENDAR
+    return (
+        f"<d:current-user-principal><d:href>{_CALDAV_PRINCIPAL}</d:href></d:current-user-principal>"
+        f"<c:calendar-home-set><d:href>{_CALDAV_HOME}</d:href></c:calendar-home-set>"
+        "<d:resourcetype><d:collection/>" + ("<c:calendar/>" if calendar else "") + "</d:resourcetype>"
+        f"<d:displayname>{'Bench' if calendar else 'Home'}</d:displayname>"
+        + ('<c:supported-calendar-component-set><c:comp name="VEVENT"/></c:supported-calendar-component-set>'
+           if calendar else "")
+    )
+
+
+def caldav_propfind(path, depth):
+    responses = [_dav_response(path, _collection_props(path))]
+    if depth == "1" and path == _CALDAV_HOME:
+        responses.append(_dav_response(_CALDAV_CALENDAR, _collection_props(_CALDAV_CALENDAR)))
+    return _multistatus(responses)
+
+
+def caldav_report(count, tz):
+    responses = []
+    for i, event in enumerate(ics_events(count, tz, seed=10)):
+        data = f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//bench//EN\r\n{event}\r\nEND:VCALENDAR\r\n"
+        responses.append(_dav_response(
+            f"{_CALDAV_CALENDAR}event-{i}.ics",
+            f'<d:getetag>"{i}"</d:getetag><c:calendar-data>{escape(data)}</c:calendar-data>',
+        ))
+    return _multistatus(responses)
+
+
+# ── routing ────────────────────────────────────────────────────────────────────
+
+def _route(provider, method, path, query, headers, size, options):
+    """(status, content type, body bytes) for one request to a provider stub."""
+    tz = options["timezone"]
+    if provider == "forecast":
+        return _json(forecast_payload(query, size, tz))
+    if provider == "air_quality":
+        return _json(air_quality_payload(query, size, tz))
+    if provider == "nws":
+        if path.startswith("/points/"):
+            return _json(nws_points_payload())
+        return _json(nws_alerts_payload(size))
+    if provider == "meteoalarm":
+        return _xml(meteoalarm_feed(size, options["area"]))
+    if provider == "ics":
+        return _xml(ics_feed(size, tz), "text/calendar")
+    if provider == "rss":
+        return _xml(rss_feed(size))
+    if provider == "wotd":
+        return _xml(wotd_feed())
+    if provider == "zenquotes":
+        return _json([{"q": "Simplicity is prerequisite for reliability.", "a": "Edsger W. Dijkstra"}])
+    if provider == "openai":
+        return _json(chat_completion(size))
+    if provider == "vikunja":
+        return _json(vikunja_tasks(size, tz))
+    if provider == "todoist":
+        if path.endswith("/projects"):
+            results = todoist_projects(size)
+        elif path.endswith("/sections"):
+            results = todoist_sections(size)
+        else:
+            results = todoist_tasks(size, tz)
+        return _json({"results": results, "next_cursor": None})
+    if provider == "caldav":
+        if method == "PROPFIND":
+            return 207, "application/xml", caldav_propfind(path, headers.get("Depth", "0")).encode()
+        if method == "REPORT":
+            return 207, "application/xml", caldav_report(size, tz).encode()
+        if method == "OPTIONS":
+            return 200, "text/plain", b""
+    return 404, "text/plain", b"not found"
+
+
+def _handler_class(stubs, provider):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _serve(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            parts = urlsplit(self.path)
+            stubs.record(provider)
+            delay = stubs.latency_for(provider)
+            if delay:
+                time.sleep(delay)
+            status, content_type, body = _route(
+                provider, self.command, parts.path, parse_qs(parts.query), self.headers,
+                stubs.sizes[provider], stubs.options,
+            )
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if provider == "caldav":
+                self.send_header("DAV", "1, 2, calendar-access")
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PROPFIND = do_REPORT = do_OPTIONS = _serve
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ProviderStubs:
+    """
+    One local HTTP server per provider.
+
+        with ProviderStubs(sizes={"ics": 500}, latency=0.05) as stubs:
+            stubs.urls["ics"]   # "http://127.0.0.1:PORT"
+            with redirect_hosts(stubs.fixed_hosts()):
+                ...
+
+    `latency` is the delay in seconds before every response; `latencies`
+    overrides it per provider.  `timezone` (pytz) decides what "today" is
+    in generated events and tasks, `area` which MeteoAlarm items match the
+    configured location.
+    """
+
+    def __init__(self, sizes=None, latency=0.0, latencies=None, jitter=0.0, timezone=pytz.UTC, area=""):
+        self.sizes = {**DEFAULT_SIZES, **(sizes or {})}
+        self.latency = latency
+        self.latencies = latencies or {}
+        self.jitter = jitter
+        self.options = {"timezone": timezone, "area": area}
+        self.urls = {}
+        self.requests = {}
+        self._servers = []
+        self._lock = threading.Lock()
+        self._rng = random.Random(11)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        for provider in DEFAULT_SIZES:
+            server = ThreadingHTTPServer(("127.0.0.1", 0), _handler_class(self, provider))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name=f"stub-{provider}", daemon=True).start()
+            self._servers.append(server)
+            self.urls[provider] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def latency_for(self, provider):
+        base = self.latencies.get(provider, self.latency)
+        if self.jitter:
+            with self._lock:
+                base += self._rng.uniform(0, self.jitter)
+        return base
+
+    def record(self, provider):
+        with self._lock:
+            self.requests[provider] = self.requests.get(provider, 0) + 1
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = {}
+
+    def fixed_hosts(self):
+        """{real hostname: stub base url} for redirect_hosts()."""
+        return {host: self.urls[provider] for provider, host in FIXED_HOSTS.items()}
+
+    def caldav_account(self):
+        return {"type": "webdav", "url": f"{self.urls['caldav']}{_CALDAV_PRINCIPAL}",
+                "username": "bench", "password": "bench"}
+
+
+# ── host redirection ───────────────────────────────────────────────────────────
+
+def _rewrite(url, hosts):
+    """Point a URL whose host is in `hosts` at the stub; other URLs are unchanged."""
+    parts = urlsplit(url)
+    target = hosts.get((parts.hostname or "").lower())
+    if not target:
+        return url
+    stub = urlsplit(target)
+    return urlunsplit((stub.scheme, stub.netloc, parts.path, parts.query, parts.fragment))
+
+
+@contextmanager
+def redirect_hosts(hosts):
+    """
+    Send every request for the given hosts ({hostname: "http://127.0.0.1:PORT"})
+    to the stubs instead, for requests and httpx (sync and async).
+    """
+    import httpx
+    import requests.adapters
+
+    original_send = requests.adapters.HTTPAdapter.send
+    original_sync = httpx.HTTPTransport.handle_request
+    original_async = httpx.AsyncHTTPTransport.handle_async_request
+
+    def send(self, request, *args, **kwargs):
+        request.url = _rewrite(request.url, hosts)
+        return original_send(self, request, *args, **kwargs)
+
+    def _redirected(request):
+        target = hosts.get(request.url.host)
+        if target:
+            stub = urlsplit(target)
+            request.url = request.url.copy_with(scheme=stub.scheme, host=stub.hostname, port=stub.port)
+        return request
+
+    def handle_request(self, request):
+        return original_sync(self, _redirected(request))
+
+    async def handle_async_request(self, request):
+        return await original_async(self, _redirected(request))
+
+    requests.adapters.HTTPAdapter.send = send
+    httpx.HTTPTransport.handle_request = handle_request
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+    try:
+        yield
+    finally:
+        requests.adapters.HTTPAdapter.send = original_send
+        httpx.HTTPTransport.handle_request = original_sync
+        httpx.AsyncHTTPTransport.handle_async_request = original_async
@@ -0,0 +1,179 @@
+"""
+Synthetic inputs of arbitrary size for the micro-benchmarks.
+
+Every generator is deterministic (seeded) and produces data shaped like
+what the corresponding provider returns, so timings are comparable across
+runs and versions.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytz
+
+from stub_providers import (
+    _sentence,
+    air_quality_payload,
+    forecast_payload,
+    meteoalarm_feed,
+    nws_alerts_payload,
+    todoist_tasks,
+    vikunja_tasks,
+)
+
+_CALENDAR_HEADER = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//dailySummaryEmail//synthetic//EN\r\n"
+_CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+
+def _midnight(tz):
+    return tz.localize(datetime.combine(datetime.now(tz).date(), datetime.min.time()))
+
+
+def _utc(dt):
+    return dt.astimezone(pytz.UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _vevent(uid, start, minutes, summary, extra=()):
+    return "\r\n".join([
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_utc(start)}",
+        f"DTSTART:{_utc(start)}",
+        f"DTEND:{_utc(start + timedelta(minutes=minutes))}",
+        f"SUMMARY:{summary}",
+        f"LOCATION:{summary} Hall",
+        f"DESCRIPTION:{summary} notes",
+        *extra,
+        "END:VEVENT",
+    ])
+
+
+def _calendar(events):
+    return _CALENDAR_HEADER + "\r\n".join(events) + "\r\n" + _CALENDAR_FOOTER
+
+
+def flat_ics(count, tz=pytz.UTC):
+    """`count` one-off events spread over the past year and the next month."""
+    rng = random.Random(21)
+    midnight = _midnight(tz)
+    return _calendar([
+        _vevent(
+            f"flat-{i}@synthetic",
+            midnight + timedelta(days=rng.randint(-365, 30), hours=rng.randint(7, 20)),
+            rng.choice([30, 60, 90]),
+            _sentence(rng, 3),
+        )
+        for i in range(count)
+    ])
+
+
+def rrule_ics(count, tz=pytz.UTC):
+    """
+    `count` recurring masters with open-ended daily, weekday and weekly rules
+    and a few EXDATEs each, all expanded up to the parser's horizon.
+    """
+    rng = random.Random(22)
+    midnight = _midnight(tz)
+    rules = ["FREQ=DAILY", "FREQ=WEEKLY;BYDAY=MO,WE,FR", "FREQ=WEEKLY", "FREQ=DAILY;INTERVAL=2"]
+    events = []
+    for i in range(count):
+        start = midnight - timedelta(days=rng.randint(30, 720)) + timedelta(hours=rng.randint(7, 20))
+        exdates = [_utc(start + timedelta(days=7 * k)) for k in range(1, 4)]
+        events.append(_vevent(
+            f"rrule-{i}@synthetic", start, 60, _sentence(rng, 3),
+            [f"RRULE:{rules[i % len(rules)]}", f"EXDATE:{','.join(exdates)}"],
+        ))
+    return _calendar(events)
+
+
+def override_ics(masters, overrides_per_master, tz=pytz.UTC):
+    """
+    Weekly masters, each with `overrides_per_master` moved occurrences
+    (RECURRENCE-ID components), the shape of a heavily edited meeting series.
+    """
+    rng = random.Random(23)
+    midnight = _midnight(tz)
+    events = []
+    for i in range(masters):
+        uid = f"series-{i}@synthetic"
+        start = midnight - timedelta(weeks=overrides_per_master) + timedelta(hours=9 + i % 8)
+        events.append(_vevent(uid, start, 60, _sentence(rng, 3), ["RRULE:FREQ=WEEKLY"]))
+        for k in range(overrides_per_master):
+            original = start + timedelta(weeks=k)
+            events.append(_vevent(
+                uid, original + timedelta(hours=1), 60, _sentence(rng, 3),
+                [f"RECURRENCE-ID:{_utc(original)}"],
+            ))
+    return _calendar(events)
+
+
+def calendar_events_today(count, tz=pytz.UTC):
+    """Parsed Events for today, as format_cal_events() receives them."""
+    from calendar_event import Event
+
+    rng = random.Random(24)
+    midnight = _midnight(tz)
+    events = []
+    for i in range(count):
+        if i % 5 == 0:
+            start = midnight.date()
+            end = start + timedelta(days=1)
+        else:
+            start = midnight + timedelta(hours=7, minutes=15 * (i % 48))
+            end = start + timedelta(minutes=rng.choice([30, 60]))
+        summary = _sentence(rng, 3)
+        events.append(Event(start, end, summary, f"{summary} Hall", f"today-{i}@synthetic", _sentence(rng, 12)))
+    return events
+
+
+def todoist_task_objects(count, tz=pytz.UTC):
+    """Todoist SDK Task objects, as get_todoist_tasks() returns them."""
+    from todoist_api_python.models import Task
+
+    tasks = []
+    for i, data in enumerate(todoist_tasks(count, tz)):
+        task = Task.from_dict(data)
+        task._project_name = f"Project {i % 4}" + (f" › Section {i % 3}" if i % 2 else "")
+        tasks.append(task)
+    return tasks
+
+
+def vikunja_task_dicts(count, tz=pytz.UTC):
+    """Normalised Vikunja task dicts, as get_vikunja_tasks() returns them."""
+    from get_vikunja_tasks import _normalize_vikunja_tasks
+
+    return _normalize_vikunja_tasks(vikunja_tasks(count, tz))
+
+
+def forecast_payloads(days, tz=pytz.UTC):
+    """(forecast, air quality) Open-Meteo payloads covering `days` days."""
+    from get_forecast import _DAILY_PARAMETERS, _HOURLY_PARAMETERS
+
+    forecast = forecast_payload(
+        {"daily": [",".join(_DAILY_PARAMETERS)], "hourly": [",".join(_HOURLY_PARAMETERS)]}, days, tz
+    )
+    pollutants = "us_aqi,us_aqi_pm2_5,us_aqi_pm10,us_aqi_nitrogen_dioxide,us_aqi_ozone,us_aqi_sulphur_dioxide"
+    return forecast, air_quality_payload({"hourly": [pollutants]}, days, tz)
+
+
+def nws_alerts(count):
+    return nws_alerts_payload(count)
+
+
+def meteoalarm_bytes(count, area="Berlin"):
+    return meteoalarm_feed(count, area).encode()
+
+
+def digest_text(lines):
+    """Markdown resembling the task and calendar sections, with links, for add_emojis()."""
+    rng = random.Random(25)
+    words = ("meeting lunch gym dentist homework flight groceries call laundry birthday "
+             "deadline coffee study report doctor concert").split()
+    out = ["# Tasks"]
+    for i in range(lines):
+        task = " ".join(rng.choice(words) for _ in range(rng.randint(2, 6)))
+        if i % 7 == 0:
+            out.append(f"- [{task}](https://example.com/tasks/{i}?ref=digest) - Due: 17:00")
+        else:
+            out.append(f"- {task.capitalize()} - Due: {8 + i % 12:02d}:30")
+    return "\n".join(out)
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import traceback
+
+import httpx
+
+import nws_cache
+from forecast_cache import grid_degrees
+from generate_summary import generate_summary_async
+from get_cal_data import get_cal_data_async
+from get_date import get_current_date_in_timezone
+from get_forecast import get_forecast_async, prefetch_forecasts
+from get_puzzles import get_puzzles
+from get_qotd import get_qotd_async
+from get_rss import get_rss_async
+from get_todo_tasks import get_todo_tasks_async
+from get_wotd import get_wotd_async
+from outbox import deliver_pending, enqueue
+from request_budget import request_budget
+from send_email import (
+    SUMMARY_DEADLINE_SECONDS,
+    build_message,
+    parse_recipients,
+    render_email,
+    summary_input_text,
+)
+
+# Optional asyncio execution engine (EXECUTION_MODE=ASYNC).
+#
+# Every provider of a digest runs as a coroutine on one event loop and all
+# digests share one httpx.AsyncClient connection pool, so a single process
+# can build many digests concurrently without a thread per request.  The
+# few blocking libraries (Todoist SDK, caldav, puzzle generation) run in the
+# loop's bounded default executor.  Rendered messages go through the outbox
+# and are delivered by one batched drain over a shared SMTP session.
+#
+# A digest is described by a plain dict of settings using the config key
+# names from main.py, plus "VERSION", "timezone" (pytz object),
+# "country_code" and "city_state_str".
+
+_MAX_CONCURRENT_DIGESTS = 50
+_MAX_HTTP_CONNECTIONS = 100
+
+
+def _enabled(value):
+    return value in ["True", "true", True]
+
+
+async def _empty(value):
+    return value
+
+
+async def _section(name, coro, default):
+    """Await one provider, logging and substituting `default` if it fails."""
+    try:
+        result = await coro
+        logging.debug(f"{name} obtained.")
+        return result
+    except Exception as e:
+        logging.error(f"Error obtaining {name}: {e}")
+        logging.debug(traceback.format_exc())
+        return default
+
+
+async def build_digest_async(client, settings):
+    """
+    Gather every section of one digest concurrently and render it.
+    Returns (text, html, date_string).
+    """
+    tz = settings["timezone"]
+    time_system = settings.get("TIME_SYSTEM", "24HR")
+    date_string = get_current_date_in_timezone(tz)
+
+    if _enabled(settings.get("WEATHER")):
+        weather = get_forecast_async(
+            client,
+            settings.get("LATITUDE"),
+            settings.get("LONGITUDE"),
+            settings.get("country_code"),
+            settings.get("city_state_str"),
+            settings.get("UNIT_SYSTEM", "METRIC"),
+            time_system,
+            tz,
+            settings.get("VERSION", "unknown"),
+            grid_degrees(settings.get("FORECAST_CACHE_GRID")),
+            settings.get("FORECAST_OUTLOOK"),
+            settings.get("WEATHER_ALERTS_MODE"),
+        )
+    else:
+        weather = _empty("")
+
+    if settings.get("TODOIST_API_KEY") or settings.get("VIKUNJA_API_KEY"):
+        todo = get_todo_tasks_async(
+            client,
+            tz,
+            time_system,
+            settings.get("TODOIST_API_KEY"),
+            settings.get("VIKUNJA_API_KEY"),
+            settings.get("VIKUNJA_BASE_URL"),
+        )
+    else:
+        todo = _empty(("", ""))
+
+    rss_links = settings.get("RSS_LINKS")
+    rss = get_rss_async(client, rss_links, tz, time_system) if rss_links else _empty("")
+
+    weather_task = asyncio.create_task(_section("Weather", weather, ""))
+    todo_task = asyncio.create_task(_section("Todo", todo, ("", "")))
+    cal_task = asyncio.create_task(
+        _section(
+            "Calendar events",
+            get_cal_data_async(
+                client, settings.get("WEBCAL_LINKS"), tz, time_system, settings.get("CALDAV_ACCOUNTS"),
+                settings.get("CALENDAR_INDEX", False), settings.get("CALENDAR_PRECEDENCE"),
+            ),
+            "",
+        )
+    )
+    other_tasks = asyncio.gather(
+        _section("RSS", rss, ""),
+        _section("Word of the Day", get_wotd_async(client), "") if _enabled(settings.get("WOTD")) else _empty(""),
+        _section("Quote of the Day", get_qotd_async(client), "") if _enabled(settings.get("QOTD")) else _empty(""),
+        _section("Puzzles", asyncio.to_thread(get_puzzles), ("", "")) if _enabled(settings.get("PUZZLES")) else _empty(("", "")),
+    )
+
+    # The summary only depends on weather, tasks and calendar, so it starts
+    # as soon as those are in and overlaps with the remaining sections.
+    summary = None
+    summary_enabled = settings.get("OPENAI_API_KEY") is not None and _enabled(settings.get("ENABLE_SUMMARY"))
+    weather_string, (todo_html_string, todo_plain_string), calendar_events = await asyncio.gather(
+        weather_task, todo_task, cal_task
+    )
+    if summary_enabled:
+        try:
+            summary = await asyncio.wait_for(
+                generate_summary_async(
+                    summary_input_text(weather_string or "", todo_plain_string, calendar_events),
+                    settings.get("OPENAI_API_KEY"),
+                ),
+                SUMMARY_DEADLINE_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logging.warning(f"Summary generation exceeded its {SUMMARY_DEADLINE_SECONDS}s deadline.")
+        if summary is None:
+            summary = "Error generating summary."
+
+    rss_string, wotd_string, quote_string, (puzzles_string, puzzles_ans_string) = await other_tasks
+    if not _enabled(settings.get("PUZZLES_ANSWERS")):
+        puzzles_ans_string = ""
+
+    text, html = render_email(
+        settings.get("VERSION", "unknown"),
+        tz,
+        settings.get("OPENAI_API_KEY"),
+        settings.get("ENABLE_SUMMARY"),
+        settings.get("ENABLE_EMOJIS"),
+        date_string,
+        weather_string or "",
+        todo_html_string,
+        todo_plain_string,
+        calendar_events,
+        rss_string or "",
+        puzzles_string,
+        wotd_string or "",
+        quote_string or "",
+        puzzles_ans_string,
+        summary=summary,
+    )
+    return text, html, date_string
+
+
+async def run_digests_async(settings_list):
+    """
+    Build every digest in `settings_list` concurrently, spool the rendered
+    messages to the outbox and deliver them with one drain per SMTP account.
+
+    Returns the outbox delivery counts summed over all accounts.
+    """
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_DIGESTS)
+    limits = httpx.Limits(max_connections=_MAX_HTTP_CONNECTIONS)
+
+    async def _build(client, settings):
+        async with semaphore:
+            # Each digest runs in its own task, so each gets its own budget
+            # and its own record of the weather alerts it shows.
+            with request_budget(), nws_cache.digest_alerts(settings.get("RECIPIENT_EMAIL")) as shown_alerts:
+                return await build_digest_async(client, settings), shown_alerts
+
+    # Several digests with weather: fetch their forecasts in a few batched
+    # open-meteo requests up front so each digest is served from the cache.
+    batches = {}
+    for settings in settings_list:
+        if _enabled(settings.get("WEATHER")):
+            group = (settings.get("UNIT_SYSTEM", "METRIC"), grid_degrees(settings.get("FORECAST_CACHE_GRID")))
+            batches.setdefault(group, []).append(
+                (settings.get("LATITUDE"), settings.get("LONGITUDE"), settings.get("country_code"), settings["timezone"])
+            )
+    with request_budget():
+        for (unit_system, grid), locations in batches.items():
+            if len(locations) > 1:
+                await asyncio.to_thread(prefetch_forecasts, locations, unit_system, grid)
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        results = await asyncio.gather(
+            *(_build(client, settings) for settings in settings_list), return_exceptions=True
+        )
+
+    ids_by_account = {}
+    for settings, result in zip(settings_list, results):
+        if isinstance(result, BaseException):
+            logging.critical(f"Error building digest for {settings.get('RECIPIENT_EMAIL')}: {result}")
+            continue
+        (text, html, date_string), shown_alerts = result
+        account = (
+            settings.get("SMTP_HOST"),
+            settings.get("SMTP_PORT"),
+            settings.get("SMTP_USERNAME"),
+            settings.get("SMTP_PASSWORD"),
+        )
+        for email, name in parse_recipients(settings.get("RECIPIENT_EMAIL"), settings.get("RECIPIENT_NAME")):
+            message = build_message(text, html, email, name, date_string, settings.get("SMTP_USERNAME"))
+            ids_by_account.setdefault(account, set()).add(
+                enqueue(message, settings.get("SENDER_EMAIL"), [email])
+            )
+        shown_alerts.commit()
+
+    totals = {"sent": 0, "retrying": 0, "failed": 0}
+    for (host, port, username, password), message_ids in ids_by_account.items():
+        counts = await asyncio.to_thread(
+            deliver_pending, host, port, username, password, message_ids=message_ids
+        )
+        for key in totals:
+            totals[key] += counts[key]
+    logging.info(
+        f"Async engine: {len(settings_list)} digest(s) built; "
+        f"{totals['sent']} sent, {totals['retrying']} awaiting retry, {totals['failed']} failed."
+    )
+    return totals
+
+
+def run_digests(settings_list):
+    """Blocking wrapper around run_digests_async() for scheduler and Flask threads."""
+    return asyncio.run(run_digests_async(settings_list))
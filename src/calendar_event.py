@@ -0,0 +1,91 @@
+from datetime import date, datetime, time, timedelta
+
+# One calendar occurrence, as parse_icalendar() produces it and every later
+# stage (the occurrence index, today's filter, format_cal_events) consumes it.
+#
+# Events used to be dicts that each stage re-localized: all-day dates were
+# turned into datetimes, then made aware for the "today" test, then made
+# aware and converted again for sorting and formatting.  An Event keeps its
+# fields in __slots__, records whether it is all-day when it is created (a
+# DATE rather than a DATE-TIME start), and localize() converts start/end to
+# aware datetimes in the reader's timezone once; calling it again with the
+# same timezone is free.
+#
+# Item access (event["start"], event.get("location"), dict(event)) keeps
+# working for code written against the dicts.
+
+
+def _aware(value, timezone):
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if value.tzinfo is None or value.utcoffset() is None:
+        return timezone.localize(value)
+    return value.astimezone(timezone)
+
+
+class Event:
+    FIELDS = ("start", "end", "summary", "location", "uid", "description", "recurrence_id")
+
+    __slots__ = FIELDS + ("all_day", "_timezone")
+
+    def __init__(self, start, end, summary="No Title", location=None, uid=None, description=None,
+                 recurrence_id=None):
+        self.start = start
+        self.end = end
+        self.summary = summary
+        self.location = location
+        self.uid = uid
+        self.description = description
+        self.recurrence_id = recurrence_id
+        self.all_day = isinstance(start, date) and not isinstance(start, datetime)
+        self._timezone = None
+
+    def localize(self, timezone):
+        """Make start/end aware datetimes in `timezone` (all-day dates at midnight); returns self."""
+        if self._timezone is not timezone:
+            self.start = _aware(self.start, timezone)
+            self.end = _aware(self.end, timezone)
+            self._timezone = timezone
+        return self
+
+    def occurs_on(self, day):
+        """Whether a localized event touches `day`; an end at exactly midnight is exclusive."""
+        end = self.end
+        if end.time() == time.min and end.date() != self.start.date():
+            end -= timedelta(seconds=1)
+        return self.start.date() <= day <= end.date()
+
+    # ── dict compatibility ─────────────────────────────────────────────────────
+
+    def keys(self):
+        return self.FIELDS
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+        if key == "start":
+            self.all_day = isinstance(value, date) and not isinstance(value, datetime)
+        if key in ("start", "end"):
+            self._timezone = None
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Event({self.summary!r}, {self.start!r}, {self.end!r})"
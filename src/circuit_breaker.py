@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+# Per-host circuit breakers for upstream providers.
+#
+# A host starts "closed" (requests flow normally).  After
+# _FAILURE_THRESHOLD consecutive failures (timeouts, connection errors,
+# 408/429/5xx) it is "open": requests to it fail immediately with
+# CircuitOpenError, so a dead provider costs nothing instead of a full retry
+# ladder, and callers fall back to cached or placeholder content.  Once
+# _COOLDOWN_SECONDS have passed the breaker is "half-open": one probe request
+# is let through; success closes the breaker, failure re-opens it for
+# another cooldown.  States are persisted to CIRCUIT_STATE_PATH so a
+# known-dead host is skipped straight away after a restart.
+CIRCUIT_STATE_PATH = "./cache/circuit_breakers.json"
+
+_FAILURE_THRESHOLD = 5
+_COOLDOWN_SECONDS = 5 * 60
+_FAILURE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+_lock = threading.Lock()
+_states = None  # host -> {"state", "failures", "opened_at"}; loaded lazily
+_probes = {}  # host -> start time of the half-open probe in flight
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of contacting a host whose breaker is open."""
+
+
+def host_of(url):
+    return (urlsplit(url).hostname or url).lower()
+
+
+def _load():
+    try:
+        with open(CIRCUIT_STATE_PATH, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Circuit breaker: unreadable state file: {e}")
+        return {}
+
+
+def _save():
+    """Write the current states; called with _lock held."""
+    try:
+        directory = os.path.dirname(CIRCUIT_STATE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{CIRCUIT_STATE_PATH}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(_states, f)
+        os.replace(tmp_path, CIRCUIT_STATE_PATH)
+    except OSError as e:
+        logging.warning(f"Circuit breaker: could not write state file: {e}")
+
+
+def _state(host):
+    """The mutable state record for a host; called with _lock held."""
+    global _states
+    if _states is None:
+        _states = _load()
+    return _states.setdefault(host, {"state": CLOSED, "failures": 0, "opened_at": None})
+
+
+def allow(url):
+    """
+    Whether a request to the url's host may be made now.  For an open
+    breaker whose cooldown has passed this admits a single half-open probe.
+    """
+    host = host_of(url)
+    now = time.time()
+    with _lock:
+        state = _state(host)
+        if state["state"] == CLOSED:
+            return True
+        if now - (state["opened_at"] or 0) < _COOLDOWN_SECONDS:
+            return False
+        # Only one probe at a time; a probe that never reported back (e.g.
+        # the process died) is given up on after another cooldown.
+        probe_started = _probes.get(host)
+        if probe_started is not None and now - probe_started < _COOLDOWN_SECONDS:
+            return False
+        _probes[host] = now
+        if state["state"] != HALF_OPEN:
+            state["state"] = HALF_OPEN
+            _save()
+        logging.info(f"Circuit breaker: probing '{host}'.")
+        return True
+
+
+def check(url):
+    """Raise CircuitOpenError unless a request to the url's host is allowed."""
+    if not allow(url):
+        raise CircuitOpenError(f"Circuit open for '{host_of(url)}'; skipping request to '{url}'")
+
+
+def record_success(url):
+    host = host_of(url)
+    with _lock:
+        state = _state(host)
+        _probes.pop(host, None)
+        if state["state"] == CLOSED and state["failures"] == 0:
+            return
+        if state["state"] != CLOSED:
+            logging.info(f"Circuit breaker: '{host}' recovered; closing.")
+        state.update(state=CLOSED, failures=0, opened_at=None)
+        _save()
+
+
+def record_failure(url):
+    host = host_of(url)
+    with _lock:
+        state = _state(host)
+        _probes.pop(host, None)
+        state["failures"] += 1
+        if state["state"] == HALF_OPEN or (
+            state["state"] == CLOSED and state["failures"] >= _FAILURE_THRESHOLD
+        ):
+            logging.warning(
+                f"Circuit breaker: opening for '{host}' after {state['failures']} failure(s); "
+                f"skipping it for {_COOLDOWN_SECONDS}s."
+            )
+            state.update(state=OPEN, opened_at=time.time())
+        _save()
+
+
+def is_host_failure(exc):
+    """Whether an exception means the host itself is failing (not e.g. a 404)."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return exc.response is not None and exc.response.status_code in _FAILURE_STATUS_CODES
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _FAILURE_STATUS_CODES
+    return isinstance(
+        exc,
+        (
+            requests.exceptions.Timeout,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+            httpx.TransportError,
+            OSError,
+        ),
+    )
+
+
+@contextmanager
+def guard(url):
+    """
+    Run a request to `url` behind its host's breaker: raise CircuitOpenError
+    if it is open, and record the outcome of the enclosed block.
+    """
+    check(url)
+    try:
+        yield
+    except Exception as e:
+        if is_host_failure(e):
+            record_failure(url)
+        else:
+            record_success(url)
+        raise
+    record_success(url)
+
+
+def breaker_status():
+    """{host: {"state", "failures", "opened_at", "retry_at"}} for every known host."""
+    global _states
+    with _lock:
+        if _states is None:
+            _states = _load()
+        result = {}
+        for host, state in _states.items():
+            opened_at = state.get("opened_at")
+            result[host] = {
+                "state": state["state"],
+                "failures": state["failures"],
+                "opened_at": opened_at,
+                "retry_at": opened_at + _COOLDOWN_SECONDS if state["state"] != CLOSED and opened_at else None,
+            }
+        return result
+
+
+def clear():
+    """Forget every in-memory state (the state file is reloaded on next use)."""
+    global _states
+    with _lock:
+        _states = None
+        _probes.clear()
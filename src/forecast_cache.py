@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+# Cache for open-meteo forecast and air-quality payloads.
+#
+# Entries are keyed by the request coordinates snapped to a grid (so nearby
+# location triggers share one download), the unit system, the timezone and
+# the local date.  open-meteo refreshes its models hourly, so an entry never
+# outlives the top of the hour it was fetched in, and never lives longer than
+# _FORECAST_CACHE_TTL_SECONDS.  Entries are kept in memory and mirrored to
+# FORECAST_CACHE_DIR so restarts and separate processes reuse them.
+FORECAST_CACHE_DIR = "./cache/forecast"
+DEFAULT_GRID_DEGREES = 0.05
+
+_FORECAST_CACHE_TTL_SECONDS = 30 * 60
+
+# Expired entries stay on disk this much longer as a fallback for when the
+# provider is down (see get(allow_stale=True)).
+_FORECAST_STALE_SECONDS = 24 * 60 * 60
+
+# Keys include the local date, so yesterday's files are never read again.
+# put() sweeps the directory for files past the stale limit at most this often.
+_SWEEP_INTERVAL_SECONDS = 60 * 60
+
+_memory = {}
+_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def grid_degrees(value, default=DEFAULT_GRID_DEGREES):
+    """Parse a configured grid size; blank or invalid values fall back to `default`."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def snap_to_grid(latitude, longitude, grid=DEFAULT_GRID_DEGREES):
+    """
+    Round coordinates to the nearest multiple of `grid` degrees.  A grid of 0
+    leaves them unchanged apart from float normalisation.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    if grid:
+        latitude = round(latitude / grid) * grid
+        longitude = round(longitude / grid) * grid
+    return round(latitude, 4), round(longitude, 4)
+
+
+def cache_key(kind, latitude, longitude, unit_system, timezone, local_date):
+    """Stable key for one payload; `kind` separates forecast and air-quality data."""
+    material = f"{kind}|{latitude}|{longitude}|{str(unit_system).upper()}|{timezone}|{local_date}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+
+def _expiry(now):
+    """Expire at the next top of the hour, or after the TTL if that comes first."""
+    next_hour = (int(now) // 3600 + 1) * 3600
+    return min(now + _FORECAST_CACHE_TTL_SECONDS, next_hour)
+
+
+def _path(key):
+    return os.path.join(FORECAST_CACHE_DIR, f"{key}.json")
+
+
+def get(key, allow_stale=False):
+    """
+    Return the cached payload for `key`, or None when missing or expired.
+    With `allow_stale`, an expired payload from the last day is returned
+    instead; used when the provider can't be reached.
+    """
+    now = time.time()
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            if entry["expires_at"] > now:
+                return entry["data"]
+            del _memory[key]
+
+    try:
+        with open(_path(key), "r") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Forecast cache: unreadable entry {key}: {e}")
+        return None
+
+    expired_for = now - entry.get("expires_at", 0)
+    if expired_for >= 0:
+        if allow_stale and expired_for < _FORECAST_STALE_SECONDS:
+            return entry["data"]
+        if expired_for >= _FORECAST_STALE_SECONDS:
+            try:
+                os.remove(_path(key))
+            except OSError:
+                pass
+        return None
+
+    with _lock:
+        _memory[key] = entry
+    return entry["data"]
+
+
+def _sweep(now):
+    """
+    Delete disk entries that can no longer be served, even as stale data.
+    A file's modification time is when it was fetched, and an entry expires
+    at most _FORECAST_CACHE_TTL_SECONDS later.
+    """
+    cutoff = now - _FORECAST_CACHE_TTL_SECONDS - _FORECAST_STALE_SECONDS
+    try:
+        names = os.listdir(FORECAST_CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(FORECAST_CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def put(key, data):
+    """Store a payload in memory and on disk until its expiry."""
+    global _last_sweep
+    now = time.time()
+    entry = {"expires_at": _expiry(now), "data": data}
+    with _lock:
+        _memory[key] = entry
+        # Drop expired in-memory entries so long-running processes stay small
+        for stale in [k for k, v in _memory.items() if v["expires_at"] <= now]:
+            del _memory[stale]
+        sweep = now - _last_sweep >= _SWEEP_INTERVAL_SECONDS
+        if sweep:
+            _last_sweep = now
+    if sweep:
+        _sweep(now)
+    try:
+        os.makedirs(FORECAST_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{_path(key)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, _path(key))
+    except OSError as e:
+        logging.warning(f"Forecast cache: could not write entry {key}: {e}")
+
+
+def clear():
+    """Forget every in-memory entry (disk entries are swept by put())."""
+    global _last_sweep
+    with _lock:
+        _memory.clear()
+        _last_sweep = 0.0
@@ -1,36 +1,167 @@
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+_SUMMARY_MODEL = "gpt-4o-mini"
+_SUMMARY_MAX_TOKENS = 120
+# Bump whenever _SUMMARY_PROMPT changes so cached summaries are not reused.
+_SUMMARY_PROMPT_VERSION = 1
+_SUMMARY_PROMPT = (
+    "Write a 2-3 sentence summary of the user's inputted text. Do not include info"
+    "about the user's name or email address. Do not include info about the puzzle, "
+    "word of the day, or quote of the day. Only include the most important information."
+    "Only include weather information if it is abnormal for the location, or if there is a "
+    "severe weather warning. Focus on important tasks and events."
+    "Generate this summary in a way that the user can get a good grasp of their "
+    "day by only reading these 2-3 sentences. Ensure to use the same timing system as the content,"
+    "12hr or 24hr. ALso make sure to use imperial or metric, as seen in the content."
+    "Make sure that all events and tasks are in the correct timezone."
+)
+
+# Summaries of identical input (re-sends, manual test sends, API retriggers)
+# are served from this file instead of calling the model again.
+SUMMARY_CACHE_PATH = "./cache/summary_cache.json"
+_SUMMARY_CACHE_TTL_SECONDS = 24 * 3600
+_SUMMARY_CACHE_MAX_ENTRIES = 256
+
+_cache_lock = threading.Lock()
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Background workers for start_summary().  A summary that misses its
+# deadline keeps running here and still lands in the cache for next time.
+_SUMMARY_WORKERS = 4
+_summary_executor = ThreadPoolExecutor(max_workers=_SUMMARY_WORKERS, thread_name_prefix="summary")
+
+
+def _get_client(api_key):
+    """Return the OpenAI client for `api_key`, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key)
+            _clients[api_key] = client
+        return client
+
+
+def _cache_key(text):
+    """Hash of the whitespace-normalised input, model and prompt version."""
+    normalized = " ".join(text.split())
+    material = f"{_SUMMARY_MODEL}\n{_SUMMARY_PROMPT_VERSION}\n{normalized}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _load_cache():
+    try:
+        with open(SUMMARY_CACHE_PATH, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logging.error(f"Error reading summary cache: {e}")
+        return {}
+
+
+def _cached_summary(key):
+    with _cache_lock:
+        entry = _load_cache().get(key)
+    if entry and time.time() - entry.get("created_at", 0) < _SUMMARY_CACHE_TTL_SECONDS:
+        return entry.get("summary")
+    return None
+
+
+def _store_summary(key, summary):
+    """Persist a summary, dropping expired entries and the oldest beyond the cap."""
+    now = time.time()
+    with _cache_lock:
+        cache = {
+            k: v for k, v in _load_cache().items()
+            if now - v.get("created_at", 0) < _SUMMARY_CACHE_TTL_SECONDS
+        }
+        cache[key] = {"summary": summary, "created_at": now}
+        if len(cache) > _SUMMARY_CACHE_MAX_ENTRIES:
+            newest = sorted(cache.items(), key=lambda item: item[1]["created_at"])
+            cache = dict(newest[-_SUMMARY_CACHE_MAX_ENTRIES:])
+        try:
+            os.makedirs(os.path.dirname(SUMMARY_CACHE_PATH) or ".", exist_ok=True)
+            tmp_path = f"{SUMMARY_CACHE_PATH}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, SUMMARY_CACHE_PATH)
+        except OSError as e:
+            logging.error(f"Error writing summary cache: {e}")
+
+
+def _summary_messages(text):
+    return [
+        {
+            "role": "system",
+            "content": _SUMMARY_PROMPT
+        },
+        {
+            "role": "user",
+            "content": text
+        }
+    ]
 
 
 def generate_summary(text, api_key):
     try:
-        client = OpenAI(api_key=api_key)
-
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Write a 2-3 sentence summary of the user's inputted text. Do not include info"
-                               "about the user's name or email address. Do not include info about the puzzle, "
-                               "word of the day, or quote of the day. Only include the most important information."
-                               "Only include weather information if it is abnormal for the location, or if there is a "
-                               "severe weather warning. Focus on important tasks and events."
-                               "Generate this summary in a way that the user can get a good grasp of their "
-                               "day by only reading these 2-3 sentences. Ensure to use the same timing system as the content,"
-                               "12hr or 24hr. ALso make sure to use imperial or metric, as seen in the content."
-                               "Make sure that all events and tasks are in the correct timezone."
-                },
-                {
-                    "role": "user",
-                    "content": text
-                }
-            ],
-            max_tokens=120,
+        key = _cache_key(text)
+        cached = _cached_summary(key)
+        if cached is not None:
+            logging.debug("Summary served from cache.")
+            return f"# Summary\n\n{cached}\n\n"
+
+        completion = _get_client(api_key).chat.completions.create(
+            model=_SUMMARY_MODEL,
+            messages=_summary_messages(text),
+            max_tokens=_SUMMARY_MAX_TOKENS,
         )
+        summary = completion.choices[0].message.content
+        _store_summary(key, summary)
+
+        return f"# Summary\n\n{summary}\n\n"
+
+    except Exception as e:
+        logging.critical(f"Error occurred while generating summary: {e}")
+        return None
+
+
+def start_summary(text, api_key):
+    """Start generate_summary() in the background and return its Future."""
+    return _summary_executor.submit(generate_summary, text, api_key)
+
+
+async def generate_summary_async(text, api_key):
+    """
+    Coroutine counterpart of generate_summary() using the async OpenAI client.
+    Shares the summary cache; the async client is bound to the running event
+    loop, so it lives for the duration of the call.
+    """
+    try:
+        key = _cache_key(text)
+        cached = _cached_summary(key)
+        if cached is not None:
+            logging.debug("Summary served from cache.")
+            return f"# Summary\n\n{cached}\n\n"
+
+        async with AsyncOpenAI(api_key=api_key) as client:
+            completion = await client.chat.completions.create(
+                model=_SUMMARY_MODEL,
+                messages=_summary_messages(text),
+                max_tokens=_SUMMARY_MAX_TOKENS,
+            )
+        summary = completion.choices[0].message.content
+        _store_summary(key, summary)
 
-        return f"# Summary\n\n{completion.choices[0].message.content}\n\n"
+        return f"# Summary\n\n{summary}\n\n"
 
     except Exception as e:
         logging.critical(f"Error occurred while generating summary: {e}")
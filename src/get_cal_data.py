@@ -1,6 +1,23 @@
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
-from get_ical_events import get_ics_events
+from get_ical_events import get_ics_events, get_ics_events_async
 from get_caldav_events import get_caldav_events
+from timestamps import output_format
+
+# Webcal feeds are downloaded side by side; large ones are then parsed in
+# worker processes when ics_parse_pool is configured.
+_FEED_WORKERS = 4
+
+# The same event often reaches us twice: a calendar subscribed both as a
+# webcal link and through a CalDAV account, or an invite that is in two of
+# the reader's calendars.  Duplicates are matched on UID and recurrence
+# instance, or on (summary, start, end) for events without a UID, and the
+# copy from the source listed first in CALENDAR_PRECEDENCE is kept.  CalDAV
+# comes first by default, since shared webcal feeds are often redacted.
+DEFAULT_PRECEDENCE = "caldav,webcal"
 
 
 def ensure_datetime(dt):
@@ -38,25 +55,98 @@ def handle_all_day_event(event):
     else:
         return "\n\nAll day event"
 
-def get_cal_data(WEBCAL_LINKS, timezone, TIME_SYSTEM, caldav_accounts=None):
-    events = []
+def get_cal_data(WEBCAL_LINKS, timezone, TIME_SYSTEM, caldav_accounts=None, use_index=False, precedence=None):
+    """
+    `use_index` answers from the persistent occurrence index (see
+    occurrence_index); `precedence` orders the sources for deduplication.
+    """
+    events_by_source = {"webcal": [], "caldav": []}
 
     if WEBCAL_LINKS:
-        for link in WEBCAL_LINKS.split(","):
-            ics_events = get_ics_events(url=link, timezone=timezone)
-            events.extend(ics_events)
+        links = WEBCAL_LINKS.split(",")
+        with ThreadPoolExecutor(max_workers=min(_FEED_WORKERS, len(links)), thread_name_prefix="webcal") as pool:
+            # Through copy_context() so the workers see the build's request budget
+            futures = [
+                pool.submit(contextvars.copy_context().run, get_ics_events, link, timezone, use_index)
+                for link in links
+            ]
+            for future in futures:
+                events_by_source["webcal"].extend(future.result())
+
+    if caldav_accounts:
+        events_by_source["caldav"].extend(get_caldav_events(caldav_accounts, timezone, use_index))
+
+    return format_cal_events(deduplicate_events(events_by_source, precedence, timezone), timezone, TIME_SYSTEM)
+
 
+async def get_cal_data_async(
+    client, WEBCAL_LINKS, timezone, TIME_SYSTEM, caldav_accounts=None, use_index=False, precedence=None
+):
+    """
+    Coroutine counterpart of get_cal_data().  Every webcal feed is fetched
+    concurrently on the event loop; the caldav library is blocking, so CalDAV
+    accounts are read in a worker thread at the same time.
+    """
+    links = WEBCAL_LINKS.split(",") if WEBCAL_LINKS else []
+    tasks = [get_ics_events_async(client, link, timezone, use_index) for link in links]
     if caldav_accounts:
-        events.extend(get_caldav_events(caldav_accounts, timezone))
+        tasks.append(asyncio.to_thread(get_caldav_events, caldav_accounts, timezone, use_index))
 
-    # Unify all event start/end to aware datetimes in the same timezone
+    results = await asyncio.gather(*tasks)
+    events_by_source = {
+        "webcal": [event for feed_events in results[:len(links)] for event in feed_events],
+        "caldav": results[len(links)] if caldav_accounts else [],
+    }
+
+    return format_cal_events(deduplicate_events(events_by_source, precedence, timezone), timezone, TIME_SYSTEM)
+
+
+def _source_order(precedence):
+    """Source names from a "caldav,webcal" setting, highest precedence first."""
+    names = [name.strip().lower() for name in (precedence or DEFAULT_PRECEDENCE).split(",")]
+    return [name for name in names if name]
+
+
+def _dedup_key(event, timezone=None):
+    uid = event.get("uid")
+    if uid:
+        return "uid", str(uid), event.get("recurrence_id")
+    if timezone is not None:
+        # A floating time from one feed and a TZID time from another only
+        # compare equal once both are aware datetimes in the same zone.
+        event.localize(timezone)
+    summary = " ".join(str(event.get("summary") or "").split()).casefold()
+    return "content", summary, event["start"], event["end"]
+
+
+def deduplicate_events(events_by_source, precedence=None, timezone=None):
+    """
+    Merge {source name: events} into one list holding a single copy of each
+    event.  Sources are taken in `precedence` order (any not named follow),
+    and within a source in their own order, so the first copy seen wins.
+    Events without a UID are compared in `timezone` when it is given.
+    """
+    order = _source_order(precedence)
+    sources = sorted(events_by_source, key=lambda name: order.index(name) if name in order else len(order))
+    kept = {}
+    total = 0
+    for source in sources:
+        for event in events_by_source[source]:
+            kept.setdefault(_dedup_key(event, timezone), event)
+            total += 1
+    if total > len(kept):
+        logging.info(f"Calendar: merged {total - len(kept)} duplicate event(s).")
+    return list(kept.values())
+
+
+def format_cal_events(events, timezone, TIME_SYSTEM):
+    """Sort the collected events and format them as the calendar section."""
+    # Start/end as aware datetimes in `timezone`; a no-op for events today's
+    # filter has already localized
     for event in events:
-        event["start"] = ensure_datetime(event["start"])
-        event["end"] = ensure_datetime(event["end"])
-        event["start"] = localize_or_convert(event["start"], timezone)
-        event["end"] = localize_or_convert(event["end"], timezone)
+        event.localize(timezone)
 
-    events.sort(key=lambda e: e["start"])
+    events.sort(key=lambda e: e.start)
 
     # Prepare the final text
     text = "\n\n# Events" if events else ""
@@ -70,8 +160,8 @@ def get_cal_data(WEBCAL_LINKS, timezone, TIME_SYSTEM, caldav_accounts=None):
         if description:
             text += f"\n\n{description}"
 
-        is_all_day = event.get("is_all_day")
-        if is_all_day is None:
+        is_all_day = event.all_day
+        if not is_all_day:
             is_all_day = (
                 event["start"].time() == datetime.min.time()
                 and event["end"].time() == datetime.min.time()
@@ -86,12 +176,8 @@ def get_cal_data(WEBCAL_LINKS, timezone, TIME_SYSTEM, caldav_accounts=None):
             start_dt = event["start"]
             end_dt = event["end"]
 
-            time_format = "%-I:%M %p" if TIME_SYSTEM.upper() == "12HR" else "%H:%M"
-            date_time_format = (
-                "%-I:%M %p on %A, %B %d, %Y"
-                if TIME_SYSTEM.lower() == "12hr"
-                else "%H:%M on %A, %B %d, %Y"
-            )
+            time_format = output_format(TIME_SYSTEM, "time")
+            date_time_format = output_format(TIME_SYSTEM, "datetime")
 
             if start_dt.date() == today:
                 text += f"\n\nStarts at {start_dt.strftime(time_format)}"
@@ -1,8 +1,12 @@
 import json
 import logging
+import sqlite3
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 
-from get_ical_events import parse_icalendar, is_event_today, convert_all_day_event
+import circuit_breaker
+import occurrence_index
+from get_ical_events import events_today, parse_icalendar
 
 # Known CalDAV principal URLs for common providers.
 # Notes per provider:
@@ -95,12 +99,64 @@ def list_caldav_calendars(account):
     ]
 
 
-def _fetch_account_events(account, timezone):
+def _sync_indexed_calendar(cal, source):
+    """
+    Bring a calendar's indexed occurrences up to date from its sync-token:
+    only objects changed since the stored token are downloaded and
+    re-expanded.  Servers without sync support get a "fake-" token
+    derived from the objects' ETags; those are compared, then re-indexed
+    in full when different.
+    """
+    with occurrence_index.source_lock(source):
+        state = occurrence_index.source_state(source)
+        token = state["version"] if state else None
+        incremental = bool(token) and not token.startswith("fake-")
+        collection = cal.get_objects_by_sync_token(sync_token=token if incremental else None)
+        new_token = str(collection.sync_token) if collection.sync_token else None
+        if state is not None and new_token and new_token == token:
+            occurrence_index.mark_unchanged(source)
+            return
+        data = {str(obj.url): obj.data for obj in collection}
+        unloaded = [obj.url for obj in collection if not obj.data]
+        if unloaded:
+            # One calendar-multiget REPORT rather than a GET per changed object
+            for obj in cal.multiget(unloaded):
+                if str(obj.url) in data:
+                    data[str(obj.url)] = obj.data
+        # A deleted object is not returned by the multiget, so stays without data
+        objects = {href: parse_icalendar(body) if body else None for href, body in data.items()}
+        if incremental and new_token and not new_token.startswith("fake-"):
+            occurrence_index.update_objects(source, objects, new_token)
+        else:
+            occurrence_index.replace_source(
+                source, {href: events for href, events in objects.items() if events is not None}, new_token
+            )
+
+
+def _indexed_calendar_source(cal, account_type):
+    """Sync a calendar into the index; returns its source key, or None if it has never been indexed."""
+    source = occurrence_index.caldav_source(cal.url)
+    try:
+        _sync_indexed_calendar(cal, source)
+    except sqlite3.Error:
+        raise
+    except Exception as e:
+        if occurrence_index.source_state(source) is None:
+            logging.warning(f"Error reading calendar from {account_type} account: {e}")
+            return None
+        logging.warning(f"Error syncing calendar '{cal.name}' ({account_type}), using the indexed copy: {e}")
+    return source
+
+
+def _fetch_account_events(account, timezone, use_index=False):
     account_type = account.get("type", "webdav").lower()
     username = account.get("username", "")
 
+    url = _resolve_url(account_type, username, account.get("url", ""))
     try:
-        calendars = _connect(account)
+        # An unreachable server is skipped for a while (see circuit_breaker)
+        with circuit_breaker.guard(url) if url else nullcontext():
+            calendars = _connect(account)
     except Exception as e:
         logging.error(f"Could not connect to CalDAV account ({account_type}, {username}): {e}")
         return []
@@ -120,9 +176,16 @@ def _fetch_account_events(account, timezone):
     search_end = search_start + timedelta(days=1)
 
     events = []
+    sources = []
     for cal in calendars:
         if enabled_urls is not None and str(cal.url) not in enabled_urls:
             continue
+        if use_index:
+            try:
+                sources.append(_indexed_calendar_source(cal, account_type))
+                continue
+            except sqlite3.Error as e:
+                logging.warning(f"Calendar index unavailable, searching '{cal.name}' directly: {e}")
         try:
             cal_events = cal.date_search(start=search_start, end=search_end, expand=False)
             cal_event_data = [e for event in cal_events for e in parse_icalendar(event.data)]
@@ -131,19 +194,17 @@ def _fetch_account_events(account, timezone):
         except Exception as e:
             logging.warning(f"Error reading calendar from {account_type} account: {e}")
 
-    result = []
-    for event in events:
+    sources = [source for source in sources if source]
+    if sources:
         try:
-            event = convert_all_day_event(event, timezone)
-            if is_event_today(event["start"], event["end"], timezone):
-                result.append(event)
-        except Exception as e:
-            logging.warning(f"Error processing CalDAV event: {e}")
+            events.extend(occurrence_index.events_between(sources, today))
+        except sqlite3.Error as e:
+            logging.warning(f"Calendar index query failed for {account_type} account: {e}")
 
-    return result
+    return events_today(events, timezone)
 
 
-def get_caldav_events(caldav_accounts_json, timezone):
+def get_caldav_events(caldav_accounts_json, timezone, use_index=False):
     """Fetch today's events from all authenticated CalDAV accounts.
 
     caldav_accounts_json: JSON string containing a list of account dicts:
@@ -154,6 +215,9 @@ def get_caldav_events(caldav_accounts_json, timezone):
           {"type": "webdav",    "url": "https://…/dav/calendars/user/",
                                 "username": "user", "password": "pass"}
         ]
+
+    With use_index, calendars are kept in occurrence_index and synced by
+    sync-token instead of searched for today's date on every run.
     """
     if not caldav_accounts_json:
         return []
@@ -173,6 +237,6 @@ def get_caldav_events(caldav_accounts_json, timezone):
         if not isinstance(account, dict):
             logging.warning(f"Skipping non-dict CalDAV account entry: {account}")
             continue
-        events.extend(_fetch_account_events(account, timezone))
+        events.extend(_fetch_account_events(account, timezone, use_index))
 
     return events
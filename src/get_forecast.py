@@ -1,12 +1,40 @@
+import asyncio
+import contextvars
 import logging
 import re
 import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
-from email.utils import parsedate_to_datetime
 
+import httpx
 import requests
 
+import forecast_cache
+import meteoalarm_cache
+import nws_cache
+from hourly_stats import daily_stats, day_index
+from http_client import async_get_with_retry, get_with_retry as _get_with_timeout_retry
+from timestamps import format_timestamp
+from xml_stream import iter_elements
+
+# The forecast, air-quality and alert requests are independent, so they run
+# side by side and the weather section costs the slowest of the three rather
+# than their sum.  Each has its own deadline (retries included); AQI and
+# alerts are optional and are simply left out when they miss theirs.
+_FORECAST_DEADLINE_SECONDS = 60
+_AQI_DEADLINE_SECONDS = 20
+_ALERTS_DEADLINE_SECONDS = 20
+_FETCH_WORKERS = 6
+# Locations per open-meteo request when forecasts are batched
+_BATCH_CHUNK_SIZE = 50
+_fetch_executor = ThreadPoolExecutor(max_workers=_FETCH_WORKERS, thread_name_prefix="forecast")
+
+
+def _result_by(future, start_time, deadline_seconds):
+    """Wait for `future` until `deadline_seconds` after `start_time` (monotonic)."""
+    remaining = start_time + deadline_seconds - time.monotonic()
+    return future.result(timeout=max(remaining, 0))
 
 # MeteoAlarm RSS feed slugs keyed by ISO 3166-1 alpha-2 country code (lowercase).
 # Source: https://feeds.meteoalarm.org/
@@ -52,117 +80,14 @@ _METEOALARM_SLUGS = {
     "gb": "united-kingdom",
 }
 
-_HTTP_TIMEOUT_SECONDS = 10
-_HTTP_INITIAL_RETRY_DELAY_SECONDS = 10
-_HTTP_MAX_RETRY_DELAY_SECONDS = 60
-_HTTP_MAX_ELAPSED_SECONDS = 300  # give up after 5 minutes total
-_TRANSIENT_HTTP_STATUS_CODES = {408, 429, 500, 502, 503, 504}
-
-
-def _get_with_timeout_retry(
-    url,
-    headers=None,
-    timeout=_HTTP_TIMEOUT_SECONDS,
-    initial_retry_delay=_HTTP_INITIAL_RETRY_DELAY_SECONDS,
-    max_retry_delay=_HTTP_MAX_RETRY_DELAY_SECONDS,
-    max_elapsed_seconds=_HTTP_MAX_ELAPSED_SECONDS,
-):
-    """
-    Run an HTTP GET with exponential backoff + jitter on transient failures.
-
-    Retries on timeouts, connection errors, and 408/429/5xx responses.
-    Fails fast on non-transient HTTP errors (e.g. 400, 404).
-
-    The delay sequence starts at `initial_retry_delay`, doubles each attempt,
-    caps at `max_retry_delay`, and adds ±20 % jitter to spread concurrent
-    callers.  Gives up entirely once `max_elapsed_seconds` have passed since
-    the first attempt.
-    """
-    import random
-
-    start_time = time.monotonic()
-    delay = initial_retry_delay
-    last_exc = None
-
-    while True:
-        elapsed = time.monotonic() - start_time
-        if last_exc is not None and elapsed >= max_elapsed_seconds:
-            logging.error(
-                f"Giving up on '{url}' after {elapsed:.0f}s ({max_elapsed_seconds}s limit). "
-                f"Last error: {last_exc}"
-            )
-            raise last_exc
-
-        try:
-            response = requests.get(url, headers=headers, timeout=timeout)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response else None
-            if status_code is None or status_code in _TRANSIENT_HTTP_STATUS_CODES:
-                last_exc = e
-            else:
-                raise
-        except (
-            requests.exceptions.Timeout,
-            requests.exceptions.ConnectionError,
-            requests.exceptions.ChunkedEncodingError,
-        ) as e:
-            last_exc = e
-
-        # Jitter: ±20 % of current delay
-        jitter = delay * 0.2 * (2 * random.random() - 1)
-        sleep_time = min(delay + jitter, max_retry_delay)
-
-        # Don't sleep past the overall deadline
-        remaining = max_elapsed_seconds - (time.monotonic() - start_time)
-        sleep_time = min(sleep_time, remaining)
-        if sleep_time <= 0:
-            logging.error(
-                f"Giving up on '{url}' after {time.monotonic() - start_time:.0f}s "
-                f"({max_elapsed_seconds}s limit). Last error: {last_exc}"
-            )
-            raise last_exc
-
-        logging.warning(
-            f"Transient error for '{url}'. "
-            f"Retrying in {sleep_time:.1f}s (elapsed {time.monotonic() - start_time:.0f}s / "
-            f"{max_elapsed_seconds}s). Last error: {last_exc}"
-        )
-        time.sleep(sleep_time)
-        delay = min(delay * 2, max_retry_delay)
-
 
 def _fmt_timestamp(ts, time_system, timezone):
     """
     Parse a timestamp string (ISO 8601 or RFC 2822) and return a
     formatted string in the user's preferred time format and timezone.
-    Returns the raw string unchanged if all parsing attempts fail.
+    Returns the raw string unchanged if it can't be parsed.
     """
-    if not ts:
-        return ""
-    # ISO 8601 variants (CAP standard)
-    for fmt_str in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S"):
-        try:
-            dt = datetime.strptime(ts, fmt_str)
-            if dt.tzinfo:
-                dt = dt.astimezone(timezone)
-            out_fmt = (
-                "%Y-%m-%d %I:%M %p %Z" if time_system.upper() == "12HR" else "%Y-%m-%d %H:%M %Z"
-            )
-            return dt.strftime(out_fmt)
-        except ValueError:
-            pass
-    # RFC 2822 (standard RSS pubDate)
-    try:
-        dt = parsedate_to_datetime(ts).astimezone(timezone)
-        out_fmt = (
-            "%Y-%m-%d %I:%M %p %Z" if time_system.upper() == "12HR" else "%Y-%m-%d %H:%M %Z"
-        )
-        return dt.strftime(out_fmt)
-    except Exception:
-        pass
-    return ts
+    return format_timestamp(ts, time_system, timezone)
 
 
 def _strip_html(text):
@@ -171,20 +96,26 @@ def _strip_html(text):
     return re.sub(r"\s+", " ", text).strip()
 
 
-def _fetch_alerts_us(latitude, longitude, time_system, timezone, version):
+def _fetch_alerts_us(latitude, longitude, time_system, timezone, version, alerts_mode=None):
     """
     Fetch active weather alerts from the NWS API for a US location.
+    The point is resolved to its forecast zone and county once (cached in
+    nws_cache) and alerts are fetched per zone, shared by every recipient in
+    it for a few minutes.  With alerts_mode "NEW", alerts already sent in the
+    previous email for this location are shortened to a single line.
     Returns a formatted string, or "" if no alerts or on error.
-    Endpoint: https://api.weather.gov/alerts/active?point={lat},{lon}
+    Endpoints: https://api.weather.gov/points/{lat},{lon}
+               https://api.weather.gov/alerts/active?zone={zones}
     """
-    url = f"https://api.weather.gov/alerts/active?point={latitude},{longitude}"
-    headers = {
-        "User-Agent": f"dailySummaryEmail/{version}",
-        "Accept": "application/geo+json",
-    }
     try:
-        resp = _get_with_timeout_retry(url, headers=headers)
-        data = resp.json()
+        zones = _nws_zones(latitude, longitude, version)
+        key = nws_cache.zone_key(zones) if zones else nws_cache.point_key(latitude, longitude)
+        with nws_cache.zone_lock(key):
+            data = nws_cache.get_alerts(key)
+            if data is None:
+                url, headers = _nws_alerts_request(latitude, longitude, version, zones)
+                resp = _get_with_timeout_retry(url, headers=headers, max_elapsed_seconds=_ALERTS_DEADLINE_SECONDS)
+                data = nws_cache.put_alerts(key, resp.json())
     except requests.RequestException as e:
         logging.warning(f"Failed to fetch NWS alerts: {e}")
         return ""
@@ -192,6 +123,86 @@ def _fetch_alerts_us(latitude, longitude, time_system, timezone, version):
         logging.warning(f"Unexpected error fetching NWS alerts: {e}")
         return ""
 
+    return _render_alerts_us(data, latitude, longitude, time_system, timezone, alerts_mode)
+
+
+def _nws_zones(latitude, longitude, version):
+    """
+    Return the NWS zone IDs (forecast zone and county) covering a point,
+    resolving and caching them on first use.  Returns [] when the point can't
+    be resolved, in which case alerts are queried by point instead.
+    """
+    zones = nws_cache.get_zones(latitude, longitude)
+    if zones is not None:
+        return zones
+    url, headers = _nws_points_request(latitude, longitude, version)
+    try:
+        resp = _get_with_timeout_retry(url, headers=headers, max_elapsed_seconds=_ALERTS_DEADLINE_SECONDS)
+        zones = _zones_from_point(resp.json())
+    except (requests.RequestException, ValueError) as e:
+        logging.warning(f"NWS: could not resolve zones for {latitude},{longitude}: {e}")
+        return []
+    if zones:
+        nws_cache.put_zones(latitude, longitude, zones)
+    return zones
+
+
+def _nws_points_request(latitude, longitude, version):
+    url = f"https://api.weather.gov/points/{latitude},{longitude}"
+    headers = {
+        "User-Agent": f"dailySummaryEmail/{version}",
+        "Accept": "application/geo+json",
+    }
+    return url, headers
+
+
+def _zones_from_point(data):
+    """Zone IDs (e.g. "NYZ072", "NYC061") from an NWS /points payload."""
+    props = data.get("properties", {})
+    return [
+        props[field].rstrip("/").rsplit("/", 1)[-1]
+        for field in ("forecastZone", "county")
+        if props.get(field)
+    ]
+
+
+def _nws_alerts_request(latitude, longitude, version, zones=None):
+    """Return the (url, headers) pair for the NWS active-alerts query for zones, or at a point."""
+    if zones:
+        url = f"https://api.weather.gov/alerts/active?zone={','.join(sorted(zones))}"
+    else:
+        url = f"https://api.weather.gov/alerts/active?point={latitude},{longitude}"
+    headers = {
+        "User-Agent": f"dailySummaryEmail/{version}",
+        "Accept": "application/geo+json",
+    }
+    return url, headers
+
+
+def _render_alerts_us(data, latitude, longitude, time_system, timezone, alerts_mode):
+    """
+    Format NWS alerts.  In "NEW" mode alerts already delivered to this
+    recipient are shortened, and the ones shown are noted for the build's
+    nws_cache.digest_alerts() record, which is saved once the email is sent.
+    """
+    if (alerts_mode or "").upper() != "NEW":
+        return _format_alerts_us(data, time_system, timezone)
+    location = nws_cache.point_key(latitude, longitude)
+    text = _format_alerts_us(data, time_system, timezone, nws_cache.seen_ids(location))
+    nws_cache.note_shown(location, {_alert_id(f) for f in data.get("features", []) if _alert_id(f)})
+    return text
+
+
+def _alert_id(feature):
+    return feature.get("id") or feature.get("properties", {}).get("id")
+
+
+def _format_alerts_us(data, time_system, timezone, seen=None):
+    """
+    Format an NWS alerts GeoJSON payload; returns "" when there are no alerts.
+    Alerts whose ID is in `seen` were already sent and get a one-line reminder
+    instead of their full text.
+    """
     features = data.get("features", [])
     if not features:
         logging.debug("NWS: no active alerts for this location.")
@@ -211,6 +222,10 @@ def _fetch_alerts_us(latitude, longitude, time_system, timezone, version):
         if severity and severity.lower() not in ("unknown", ""):
             header += f" [{severity}]"
 
+        if seen and _alert_id(feature) in seen:
+            blocks.append(f"{header} continues" + (f" until {expires}" if expires else "") + ".")
+            continue
+
         parts = [header]
         if headline:
             parts.append(headline)
@@ -233,25 +248,46 @@ def _fetch_alerts_us(latitude, longitude, time_system, timezone, version):
 def _fetch_alerts_meteoalarm(country_code, city_state_str, time_system, timezone, version):
     """
     Fetch active weather alerts from MeteoAlarm RSS feeds for European countries.
-    Filters items whose title contains any word from city_state_str so only
-    locally-relevant alerts are shown. Falls back to all alerts if city_state_str
-    is empty or no items match.
+    Keeps only items for the region in city_state_str (falling back to all
+    alerts if it is empty or nothing matches).  Each country's feed is parsed
+    once and shared through meteoalarm_cache; refreshes are conditional GETs.
     Returns a formatted string, or "" if no alerts or on error.
     Feed index: https://feeds.meteoalarm.org/
     """
-    slug = _METEOALARM_SLUGS.get(country_code.lower())
-    if not slug:
+    request = _meteoalarm_request(country_code, version)
+    if request is None:
         logging.debug(f"MeteoAlarm: no feed available for country '{country_code}'.")
         return ""
+    slug, url, headers = request
 
-    url = f"https://feeds.meteoalarm.org/feeds/meteoalarm-legacy-rss-{slug}"
-    headers = {"User-Agent": f"dailySummaryEmail/{version}"}
+    entry = None
     try:
-        resp = _get_with_timeout_retry(url, headers=headers)
-        root = ET.fromstring(resp.content)
+        locations = meteoalarm_cache.note_location(slug, city_state_str)
+        with meteoalarm_cache.slug_lock(slug):
+            entry = meteoalarm_cache.get(slug)
+            covered = meteoalarm_cache.covers(entry, city_state_str)
+            if not meteoalarm_cache.is_fresh(entry) or not covered:
+                resp = _get_with_timeout_retry(
+                    url,
+                    # A 304 would not bring back the items this location is missing
+                    headers={**headers, **(meteoalarm_cache.conditional_headers(entry) if covered else {})},
+                    max_elapsed_seconds=_ALERTS_DEADLINE_SECONDS,
+                    stream=True,
+                )
+                try:
+                    # Parse straight off the socket rather than buffering the whole feed.
+                    resp.raw.decode_content = True
+                    entry = _store_meteoalarm_response(
+                        slug, entry, resp.status_code, resp.headers, resp.raw, locations
+                    )
+                finally:
+                    resp.close()
     except requests.RequestException as e:
-        logging.warning(f"Failed to fetch MeteoAlarm feed for '{slug}': {e}")
-        return ""
+        if entry is None:
+            logging.warning(f"Failed to fetch MeteoAlarm feed for '{slug}': {e}")
+            return ""
+        # Fall back to the last parse (e.g. while the host's circuit breaker is open)
+        logging.warning(f"Failed to refresh MeteoAlarm feed for '{slug}', using cached copy: {e}")
     except ET.ParseError as e:
         logging.warning(f"Failed to parse MeteoAlarm feed XML for '{slug}': {e}")
         return ""
@@ -259,45 +295,119 @@ def _fetch_alerts_meteoalarm(country_code, city_state_str, time_system, timezone
         logging.warning(f"Unexpected error fetching MeteoAlarm feed for '{slug}': {e}")
         return ""
 
-    items = root.findall(".//item")
-    if not items:
-        logging.debug(f"MeteoAlarm: no items in feed for '{slug}'.")
-        return ""
+    return _format_alerts_meteoalarm(
+        meteoalarm_cache.lookup(entry, city_state_str), slug, time_system, timezone
+    )
 
-    # Build a set of lowercase tokens from city_state_str for region matching
-    location_tokens = (
-        {w.lower() for w in re.split(r"[\s,]+", city_state_str) if len(w) > 2}
-        if city_state_str
-        else set()
+
+def _meteoalarm_request(country_code, version):
+    """Return (slug, url, headers) for the country's MeteoAlarm feed, or None if it has none."""
+    slug = _METEOALARM_SLUGS.get(country_code.lower())
+    if not slug:
+        return None
+    url = f"https://feeds.meteoalarm.org/feeds/meteoalarm-legacy-rss-{slug}"
+    headers = {"User-Agent": f"dailySummaryEmail/{version}"}
+    return slug, url, headers
+
+
+def _store_meteoalarm_response(slug, entry, status_code, headers, body, locations=()):
+    """
+    Reuse the cached parse on 304 Not Modified; otherwise parse and cache the
+    new feed.  `body` is the response bytes or a readable stream; `locations`
+    are those whose alerts must survive the item cap.
+    """
+    if status_code == 304 and entry is not None:
+        logging.debug(f"MeteoAlarm: feed for '{slug}' not modified.")
+        return meteoalarm_cache.mark_not_modified(slug, entry)
+    items, truncated = _parse_meteoalarm_items(body, _METEOALARM_MAX_ITEMS, locations)
+    return meteoalarm_cache.put(
+        slug,
+        items,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+        truncated=truncated,
+        locations=locations,
     )
 
-    def _item_matches_location(item):
-        if not location_tokens:
-            return True
-        title = (item.findtext("title") or "").lower()
-        return any(token in title for token in location_tokens)
 
-    matched = [i for i in items if _item_matches_location(i)]
-    # Fall back to all items if nothing matched (avoids silently dropping everything)
-    display_items = matched if matched else items
+_CAP_NS = {"cap": "urn:oasis:names:tc:emergency:cap:1.2"}
+
+# Upper bound on the items kept from one country feed, so a runaway feed
+# can't grow the cache without limit.  The first _METEOALARM_MAX_ITEMS items
+# are kept for every recipient in the country.  Past that, items are only
+# kept when they mention one of the locations that read the feed (up to as
+# many again).  The feed is not ordered by region, so finding those means
+# reading on to the end; parsing only stops at the cap when no location is
+# known, or once the second allowance is full.
+_METEOALARM_MAX_ITEMS = 500
+
+
+def _meteoalarm_item(element):
+    return {
+        "title": element.findtext("title") or "",
+        "description": element.findtext("description") or "",
+        "pub_date": (element.findtext("pubDate") or "").strip(),
+        "onset": (element.findtext("cap:onset", namespaces=_CAP_NS) or "").strip(),
+        "expires": (element.findtext("cap:expires", namespaces=_CAP_NS) or "").strip(),
+        "severity": (element.findtext("cap:severity", namespaces=_CAP_NS) or "").strip(),
+        "areas": [
+            area.text.strip()
+            for area in element.findall(".//cap:areaDesc", namespaces=_CAP_NS)
+            if area.text and area.text.strip()
+        ],
+    }
 
-    cap_ns = {"cap": "urn:oasis:names:tc:emergency:cap:1.2"}
-    blocks = []
-    for item in display_items:
-        title = _strip_html(item.findtext("title") or "")
-        description = _strip_html(item.findtext("description") or "")
-        pub_date_raw = (item.findtext("pubDate") or "").strip()
-
-        onset = _fmt_timestamp(
-            (item.findtext("cap:onset", namespaces=cap_ns) or "").strip(),
-            time_system, timezone,
-        )
-        expires = _fmt_timestamp(
-            (item.findtext("cap:expires", namespaces=cap_ns) or "").strip(),
-            time_system, timezone,
+
+def _parse_meteoalarm_items(source, limit=_METEOALARM_MAX_ITEMS, locations=()):
+    """
+    Parse a MeteoAlarm legacy RSS feed (bytes or a binary stream) into plain
+    item dicts.  Items are parsed one at a time and discarded once copied, so
+    memory use does not grow with the size of the feed.  See
+    _METEOALARM_MAX_ITEMS for how `limit` and `locations` apply.
+
+    Returns (items, truncated), where truncated means items were left out.
+    """
+    items = []
+    matching = dropped = 0
+    elements = iter_elements(source, "item", limit=None if locations else limit)
+    for element in elements:
+        if limit is None or len(items) < limit:
+            items.append(_meteoalarm_item(element))
+            continue
+        if matching >= limit:
+            dropped += 1
+            break  # the rest of the feed is not read
+        item = _meteoalarm_item(element)
+        if any(meteoalarm_cache.mentions(item, location) for location in locations):
+            items.append(item)
+            matching += 1
+        else:
+            dropped += 1
+    truncated = bool(dropped) or (not locations and limit is not None and len(items) >= limit)
+    if dropped:
+        logging.warning(
+            f"MeteoAlarm: feed truncated to {limit} items plus {matching} for {', '.join(locations)}; "
+            f"dropped {dropped}{' or more' if matching >= limit else ''} other item(s)."
         )
-        severity = (item.findtext("cap:severity", namespaces=cap_ns) or "").strip()
-        pub_date_str = _fmt_timestamp(pub_date_raw, time_system, timezone)
+    elif truncated:
+        logging.warning(f"MeteoAlarm: feed truncated to its first {limit} items.")
+    return items, truncated
+
+
+def _format_alerts_meteoalarm(items, slug, time_system, timezone):
+    """Format MeteoAlarm items (already filtered to the location)."""
+    if not items:
+        logging.debug(f"MeteoAlarm: no items in feed for '{slug}'.")
+        return ""
+
+    blocks = []
+    for item in items:
+        title = _strip_html(item["title"])
+        description = _strip_html(item["description"])
+        onset = _fmt_timestamp(item["onset"], time_system, timezone)
+        expires = _fmt_timestamp(item["expires"], time_system, timezone)
+        severity = item["severity"]
+        pub_date_str = _fmt_timestamp(item["pub_date"], time_system, timezone)
 
         header = f"**{title}**" if title else "**Weather Alert**"
         if severity and severity.lower() not in ("unknown", ""):
@@ -315,15 +425,329 @@ def _fetch_alerts_meteoalarm(country_code, city_state_str, time_system, timezone
 
         blocks.append("\n\n".join(parts))
 
-    if blocks:
-        logging.info(f"MeteoAlarm: found {len(blocks)} alert(s) for '{slug}'.")
-    else:
-        logging.debug(f"MeteoAlarm: no matching alerts for '{slug}'.")
+    logging.info(f"MeteoAlarm: found {len(blocks)} alert(s) for '{slug}'.")
     return "\n\n".join(blocks)
 
 
+_DAILY_PARAMETERS = [
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "apparent_temperature_max",
+    "apparent_temperature_min",
+    "precipitation_sum",
+    "windspeed_10m_max",
+    "uv_index_max",
+    "sunrise",
+    "sunset",
+    "weathercode",
+]
+_HOURLY_PARAMETERS = ["relativehumidity_2m", "temperature_2m", "precipitation_probability"]
+
+
+_WEATHERCODE_DESCRIPTIONS = {
+    0: ("Clear sky", "☀️"),
+    1: ("Mainly clear", "🌤️"),
+    2: ("Partly cloudy", "⛅"),
+    3: ("Overcast", "☁️"),
+    45: ("Fog", "🌫️"),
+    48: ("Depositing rime fog", "🌫️"),
+    51: ("Light drizzle", "🌦️"),
+    53: ("Moderate drizzle", "🌧️"),
+    55: ("Dense drizzle", "🌧️"),
+    56: ("Light freezing drizzle", "🌧️"),
+    57: ("Dense freezing drizzle", "🌧️"),
+    61: ("Slight rain", "🌧️"),
+    63: ("Moderate rain", "🌧️"),
+    65: ("Heavy rain", "🌧️"),
+    66: ("Light freezing rain", "🌧️"),
+    67: ("Heavy freezing rain", "🌧️"),
+    71: ("Slight snow fall", "❄️"),
+    73: ("Moderate snow fall", "❄️"),
+    75: ("Heavy snow fall", "❄️"),
+    77: ("Snow grains", "❄️"),
+    80: ("Slight rain showers", "🌦️"),
+    81: ("Moderate rain showers", "🌧️"),
+    82: ("Violent rain showers", "🌧️"),
+    85: ("Slight snow showers", "❄️"),
+    86: ("Heavy snow showers", "❄️"),
+    95: ("Thunderstorm", "⛈️"),
+    96: ("Thunderstorm with slight hail", "⛈️"),
+    99: ("Thunderstorm with heavy hail", "⛈️"),
+}
+
+
+def _outlook_indices(dates, today_index, outlook):
+    """
+    Pick the daily-array indices for the outlook section.  `outlook` is a
+    number of days after today ("3"), or "WEEKEND" for one weekend: the
+    coming Saturday and Sunday on a weekday, the rest of the current one
+    (today included) on a Saturday or Sunday.  Anything else (including ""
+    and "0") disables the outlook.
+    """
+    outlook = str(outlook or "").strip().upper()
+    upcoming = range(today_index + 1, len(dates))
+    if outlook == "WEEKEND":
+        for i in range(today_index, len(dates)):
+            weekday = datetime.fromisoformat(dates[i]).weekday()
+            if weekday >= 5:
+                return list(range(i, min(i + 7 - weekday, len(dates))))  # up to and including Sunday
+        return []
+    try:
+        days = int(outlook)
+    except ValueError:
+        return []
+    return list(upcoming)[:max(days, 0)]
+
+
+def _format_outlook(daily_data, indices, units):
+    """Render the outlook days as an aligned table in a code block; missing values show as "n/a"."""
+    temp_unit = units["temp_unit"]
+    precip_unit = units["precip_unit"]
+
+    def value(key, i, unit):
+        return "n/a" if daily_data[key][i] is None else f"{daily_data[key][i]}{unit}"
+
+    rows = []
+    for i in indices:
+        condition, emoji = _WEATHERCODE_DESCRIPTIONS.get(daily_data["weathercode"][i], ("Unknown", "❓"))
+        rows.append((
+            datetime.fromisoformat(daily_data["time"][i]).strftime("%a %b %-d"),
+            f"{value('temperature_2m_min', i, temp_unit)} to {value('temperature_2m_max', i, temp_unit)}",
+            value("precipitation_sum", i, f" {precip_unit}"),
+            f"{condition} {emoji}",
+        ))
+    widths = [max(len(row[col]) for row in rows) for col in range(3)]
+    lines = [
+        "  ".join(value.ljust(width) for value, width in zip(row[:3], widths)) + "  " + row[3]
+        for row in rows
+    ]
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+# Hourly rain-window detection and the compact timeline
+_RAIN_PROBABILITY_THRESHOLD = 50  # percent
+_TIMELINE_HOURS = (6, 9, 12, 15, 18, 21)
+
+
+def _rain_windows(times, probabilities, start, stop, threshold=_RAIN_PROBABILITY_THRESHOLD):
+    """
+    Scan one day's hourly precipitation probabilities once and return the
+    runs at or above `threshold` as (first_hour, hour_after_last, peak) with
+    timestamps taken from `times`.
+    """
+    windows = []
+    run_start = None
+    peak = 0
+    for i in range(start, min(stop, len(probabilities))):
+        probability = probabilities[i]
+        if probability is not None and probability >= threshold:
+            if run_start is None:
+                run_start, peak = i, probability
+            peak = max(peak, probability)
+        elif run_start is not None:
+            windows.append((times[run_start], times[i], peak))
+            run_start = None
+    if run_start is not None:
+        last = min(stop, len(probabilities)) - 1
+        # The window runs to the end of the last wet hour
+        end = times[last + 1] if last + 1 < len(times) else None
+        windows.append((times[run_start], end, peak))
+    return windows
+
+
+def _hour_label(timestamp, time_system):
+    hour = datetime.fromisoformat(timestamp)
+    return hour.strftime("%-I%p").lower() if time_system.upper() == "12HR" else hour.strftime("%H")
+
+
+def _format_hourly_outlook(hourly, start, stop, temp_unit, time_system):
+    """
+    Build the rain-window / warmest-hour lines and a compact temperature and
+    rain-chance timeline for one day's slice of the hourly arrays.
+    Returns "" when the payload has no hourly temperature or rain data.
+    """
+    times = hourly.get("time", [])
+    temperatures = hourly.get("temperature_2m") or []
+    probabilities = hourly.get("precipitation_probability") or []
+    if not temperatures and not probabilities:
+        return ""
+    fmt = "%-I:%M %p" if time_system.upper() == "12HR" else "%H:%M"
+
+    lines = []
+    for first, end, peak in _rain_windows(times, probabilities, start, stop):
+        first_str = datetime.fromisoformat(first).strftime(fmt)
+        # A run that lasts until the last hour of the day ends at midnight
+        end_str = datetime.fromisoformat(end).strftime(fmt) if end and end[:10] == first[:10] else "midnight"
+        lines.append(f"Rain Likely: {first_str} to {end_str} (up to {peak}%)")
+
+    # Warmest hour in a single pass over the day's temperatures
+    warmest = None
+    for i in range(start, min(stop, len(temperatures))):
+        if temperatures[i] is not None and (warmest is None or temperatures[i] > temperatures[warmest]):
+            warmest = i
+    if warmest is not None:
+        warmest_str = datetime.fromisoformat(times[warmest]).strftime(fmt)
+        lines.append(f"Warmest: {temperatures[warmest]}{temp_unit} at {warmest_str}")
+
+    columns = [
+        i for i in range(start, min(stop, len(times)))
+        if datetime.fromisoformat(times[i]).hour in _TIMELINE_HOURS
+    ]
+    timeline = ""
+    if columns:
+        def _cell(series, i, suffix):
+            return f"{round(series[i])}{suffix}" if i < len(series) and series[i] is not None else "-"
+
+        rows = [["", *(_hour_label(times[i], time_system) for i in columns)]]
+        if temperatures:
+            rows.append(["Temp", *(_cell(temperatures, i, "°") for i in columns)])
+        if probabilities:
+            rows.append(["Rain", *(_cell(probabilities, i, "%") for i in columns)])
+        timeline = "```\n" + "\n".join(
+            row[0].ljust(5) + "".join(cell.rjust(6) for cell in row[1:]) for row in rows
+        ) + "\n```"
+
+    parts = [f"\n{line}\n" for line in lines]
+    if timeline:
+        parts.append(f"\n{timeline}\n")
+    return "".join(parts)
+
+
+def _unit_settings(unit_system):
+    """Return open-meteo request units, display units and outfit thresholds for a unit system."""
+    if unit_system.upper() == "IMPERIAL":
+        return {
+            "temperature_unit": "fahrenheit",
+            "windspeed_unit": "mph",
+            "precipitation_unit": "inch",
+            "temp_unit": "°F",
+            "precip_unit": "in",
+            "wind_unit": "mph",
+            "temp_thresholds": (86, 68, 50, 32, 10),
+            "windy_thresh": 20,
+        }
+    return {
+        "temperature_unit": "celsius",
+        "windspeed_unit": "kmh",
+        "precipitation_unit": "mm",
+        "temp_unit": "°C",
+        "precip_unit": "mm",
+        "wind_unit": "km/h",
+        "temp_thresholds": (30, 20, 10, 0, -12),
+        "windy_thresh": 32,
+    }
+
+
+def _aqi_param(country_code):
+    return "us_aqi" if country_code == "us" else "european_aqi"
+
+
+def _forecast_url(latitude, longitude, unit_system, timezone):
+    units = _unit_settings(unit_system)
+    return (
+        f"https://api.open-meteo.com/v1/forecast?"
+        f"latitude={latitude}&longitude={longitude}"
+        f"&daily={','.join(_DAILY_PARAMETERS)}"
+        f"&hourly={','.join(_HOURLY_PARAMETERS)}"
+        f"&temperature_unit={units['temperature_unit']}"
+        f"&windspeed_unit={units['windspeed_unit']}"
+        f"&precipitation_unit={units['precipitation_unit']}"
+        f"&timezone={timezone}"
+    )
+
+
+def _aqi_url(latitude, longitude, country_code):
+    aqi_param = _aqi_param(country_code)
+    return (
+        f"https://air-quality-api.open-meteo.com/v1/air-quality?"
+        f"latitude={latitude}&longitude={longitude}"
+        f"&hourly={aqi_param},{aqi_param}_pm2_5,{aqi_param}_pm10,"
+        f"{aqi_param}_nitrogen_dioxide,{aqi_param}_ozone,"
+        f"{aqi_param}_sulphur_dioxide"
+        f"&timezone=auto"
+    )
+
+
+def _fetch_alerts(
+    latitude, longitude, country_code, city_state_str, time_system, timezone, version, alerts_mode=None
+):
+    """Dispatch to the alert source for the country, or return "" where none exists."""
+    if country_code == "us":
+        return _fetch_alerts_us(latitude, longitude, time_system, timezone, version, alerts_mode)
+    if country_code in _METEOALARM_SLUGS:
+        return _fetch_alerts_meteoalarm(country_code, city_state_str, time_system, timezone, version)
+    logging.debug(f"No alerts source available for country '{country_code}'.")
+    return ""
+
+
+def _cache_keys(latitude, longitude, country_code, unit_system, timezone, cache_grid):
+    """
+    Snap the coordinates to the cache grid and return (latitude, longitude,
+    forecast_key, aqi_key).  The snapped coordinates are also used for the
+    open-meteo requests so every point in a grid cell shares one download.
+    """
+    grid_lat, grid_lon = forecast_cache.snap_to_grid(latitude, longitude, cache_grid)
+    local_date = datetime.now(timezone).date().isoformat()
+    forecast_key = forecast_cache.cache_key("forecast", grid_lat, grid_lon, unit_system, timezone, local_date)
+    aqi_key = forecast_cache.cache_key(
+        f"aqi-{_aqi_param(country_code)}", grid_lat, grid_lon, "", timezone, local_date
+    )
+    return grid_lat, grid_lon, forecast_key, aqi_key
+
+
+def _cached_json(key, url, max_elapsed_seconds):
+    """
+    Return the JSON payload for `url` from the forecast cache, fetching it on
+    a miss.  If the fetch fails (e.g. the host's circuit breaker is open), an
+    expired cached payload is used when there is one.
+    """
+    data = forecast_cache.get(key)
+    if data is not None:
+        logging.debug(f"Forecast cache hit for '{url}'.")
+        return data
+    try:
+        data = _get_with_timeout_retry(url, max_elapsed_seconds=max_elapsed_seconds).json()
+    except requests.RequestException as e:
+        return _stale_or_raise(key, url, e)
+    forecast_cache.put(key, data)
+    return data
+
+
+def _stale_or_raise(key, url, exc):
+    stale = forecast_cache.get(key, allow_stale=True)
+    if stale is None:
+        raise exc
+    logging.warning(f"Using stale cached data for '{url}': {exc}")
+    return stale
+
+
+async def _cached_json_async(client, key, url, max_elapsed_seconds):
+    """Coroutine counterpart of _cached_json()."""
+    data = forecast_cache.get(key)
+    if data is not None:
+        logging.debug(f"Forecast cache hit for '{url}'.")
+        return data
+    try:
+        response = await async_get_with_retry(client, url, max_elapsed_seconds=max_elapsed_seconds)
+    except (httpx.HTTPError, requests.RequestException) as e:
+        return _stale_or_raise(key, url, e)
+    data = response.json()
+    forecast_cache.put(key, data)
+    return data
+
+
 def get_forecast(
-    latitude, longitude, country_code, city_state_str, unit_system, time_system, timezone, version="unknown"
+    latitude,
+    longitude,
+    country_code,
+    city_state_str,
+    unit_system,
+    time_system,
+    timezone,
+    version="unknown",
+    cache_grid=forecast_cache.DEFAULT_GRID_DEGREES,
+    outlook=None,
+    alerts_mode=None,
 ):
     """
     Fetch weather forecast and AQI data for the given coordinates and return
@@ -331,10 +755,16 @@ def get_forecast(
     by the caller (resolved once at startup via get_coordinates).
 
     Alerts are sourced from:
-      - US:     NWS API  (https://api.weather.gov/alerts/active?point=lat,lon)
+      - US:     NWS API  (https://api.weather.gov/alerts/active?zone=...)
       - Europe: MeteoAlarm RSS feeds (https://feeds.meteoalarm.org/)
       - Other:  No alerts (graceful no-op)
     All sources are free and require no API key.
+
+    Forecast and AQI payloads are served from forecast_cache when a request
+    for the same `cache_grid`-degree cell, units, timezone and local date was
+    made within the current hour.  `outlook` adds an N-day or weekend
+    table rendered from the same forecast payload.  `alerts_mode` "NEW"
+    shortens US alerts already sent in the previous email.
     """
     if not latitude or not longitude:
         logging.error("get_forecast called without valid latitude/longitude.")
@@ -342,84 +772,364 @@ def get_forecast(
 
     # country_code is passed in — no Nominatim call needed here
     country_code = (country_code or "us").lower()
-    aqi_param = "us_aqi" if country_code == "us" else "european_aqi"
-
-    # ------------------------------------------------------------------
-    # Units
-    # ------------------------------------------------------------------
-    if unit_system.upper() == "IMPERIAL":
-        temperature_unit = "fahrenheit"
-        windspeed_unit = "mph"
-        precipitation_unit = "inch"
-        temp_unit = "°F"
-        precip_unit = "in"
-        wind_unit = "mph"
-        hot_thresh, warm_thresh, chilly_thresh, cold_thresh, very_cold_thresh = 86, 68, 50, 32, 10
-        windy_thresh = 20
-    else:
-        temperature_unit = "celsius"
-        windspeed_unit = "kmh"
-        precipitation_unit = "mm"
-        temp_unit = "°C"
-        precip_unit = "mm"
-        wind_unit = "km/h"
-        hot_thresh, warm_thresh, chilly_thresh, cold_thresh, very_cold_thresh = 30, 20, 10, 0, -12
-        windy_thresh = 32
 
-    # ------------------------------------------------------------------
-    # Fetch weather forecast
-    # ------------------------------------------------------------------
-    daily_parameters = [
-        "temperature_2m_max",
-        "temperature_2m_min",
-        "apparent_temperature_max",
-        "apparent_temperature_min",
-        "precipitation_sum",
-        "windspeed_10m_max",
-        "uv_index_max",
-        "sunrise",
-        "sunset",
-        "weathercode",
-    ]
-    hourly_parameters = ["relativehumidity_2m"]
+    grid_lat, grid_lon, forecast_key, aqi_key = _cache_keys(
+        latitude, longitude, country_code, unit_system, timezone, cache_grid
+    )
 
-    weather_url = (
-        f"https://api.open-meteo.com/v1/forecast?"
-        f"latitude={latitude}&longitude={longitude}"
-        f"&daily={','.join(daily_parameters)}"
-        f"&hourly={','.join(hourly_parameters)}"
-        f"&temperature_unit={temperature_unit}"
-        f"&windspeed_unit={windspeed_unit}"
-        f"&precipitation_unit={precipitation_unit}"
-        f"&timezone={timezone}"
+    start_time = time.monotonic()
+    # copy_context() so the workers see the caller's request budget
+    forecast_future = _fetch_executor.submit(
+        contextvars.copy_context().run,
+        _cached_json,
+        forecast_key,
+        _forecast_url(grid_lat, grid_lon, unit_system, timezone),
+        _FORECAST_DEADLINE_SECONDS,
+    )
+    aqi_future = _fetch_executor.submit(
+        contextvars.copy_context().run,
+        _cached_json,
+        aqi_key,
+        _aqi_url(grid_lat, grid_lon, country_code),
+        _AQI_DEADLINE_SECONDS,
+    )
+    alerts_future = _fetch_executor.submit(
+        contextvars.copy_context().run,
+        _fetch_alerts,
+        latitude,
+        longitude,
+        country_code,
+        city_state_str,
+        time_system,
+        timezone,
+        version,
+        alerts_mode,
     )
 
+    # ------------------------------------------------------------------
+    # Weather forecast (required)
+    # ------------------------------------------------------------------
     try:
-        response = _get_with_timeout_retry(weather_url)
-        forecast_data = response.json()
+        forecast_data = _result_by(forecast_future, start_time, _FORECAST_DEADLINE_SECONDS)
+    except FutureTimeoutError:
+        logging.error(f"Forecast data not received within {_FORECAST_DEADLINE_SECONDS}s.")
+        return "Failed to retrieve forecast data: request timed out"
     except requests.RequestException as e:
         logging.error(f"Failed to retrieve forecast data: {e}")
         return f"Failed to retrieve forecast data: {e}"
 
     # ------------------------------------------------------------------
-    # Fetch AQI data
+    # AQI data (optional)
     # ------------------------------------------------------------------
-    aqi_url = (
-        f"https://air-quality-api.open-meteo.com/v1/air-quality?"
-        f"latitude={latitude}&longitude={longitude}"
-        f"&hourly={aqi_param},{aqi_param}_pm2_5,{aqi_param}_pm10,"
-        f"{aqi_param}_nitrogen_dioxide,{aqi_param}_ozone,"
-        f"{aqi_param}_sulphur_dioxide"
-        f"&timezone=auto"
-    )
-
     aqi_data = {}
     try:
-        aqi_response = _get_with_timeout_retry(aqi_url)
-        aqi_data = aqi_response.json()
+        aqi_data = _result_by(aqi_future, start_time, _AQI_DEADLINE_SECONDS)
+    except FutureTimeoutError:
+        logging.warning(f"AQI data not received within {_AQI_DEADLINE_SECONDS}s.")
     except requests.RequestException as e:
         logging.warning(f"Failed to retrieve AQI data: {e}")
 
+    # ------------------------------------------------------------------
+    # Alerts (optional)
+    # ------------------------------------------------------------------
+    alerts_info = ""
+    try:
+        alerts_info = _result_by(alerts_future, start_time, _ALERTS_DEADLINE_SECONDS)
+    except FutureTimeoutError:
+        logging.warning(f"Weather alerts not received within {_ALERTS_DEADLINE_SECONDS}s.")
+    except Exception as e:
+        logging.warning(f"Unexpected error fetching alerts: {e}")
+
+    return format_forecast(
+        forecast_data,
+        aqi_data,
+        alerts_info,
+        latitude,
+        longitude,
+        country_code,
+        city_state_str,
+        unit_system,
+        time_system,
+        timezone,
+        outlook,
+    )
+
+
+def _fetch_batch(url, max_elapsed_seconds):
+    """GET a multi-location open-meteo URL; always returns a list of per-location payloads."""
+    data = _get_with_timeout_retry(url, max_elapsed_seconds=max_elapsed_seconds).json()
+    return data if isinstance(data, list) else [data]
+
+
+def prefetch_forecasts(locations, unit_system, cache_grid=forecast_cache.DEFAULT_GRID_DEGREES):
+    """
+    Fill the forecast cache for many locations with as few requests as
+    possible.  open-meteo accepts comma-separated coordinate (and timezone)
+    lists and answers with one payload per location, so cache misses are
+    deduplicated and requested _BATCH_CHUNK_SIZE at a time.  AQI requests
+    are batched the same way, grouped by AQI scale (US or European).
+
+    `locations` is a list of (latitude, longitude, country_code, timezone).
+    Failures are logged; the affected locations are simply fetched again
+    by get_forecast().
+    """
+    forecast_misses = {}
+    aqi_misses = {}
+    for latitude, longitude, country_code, timezone in locations:
+        if not latitude or not longitude:
+            continue
+        country_code = (country_code or "us").lower()
+        grid_lat, grid_lon, forecast_key, aqi_key = _cache_keys(
+            latitude, longitude, country_code, unit_system, timezone, cache_grid
+        )
+        if forecast_cache.get(forecast_key) is None:
+            forecast_misses[forecast_key] = (grid_lat, grid_lon, timezone)
+        if forecast_cache.get(aqi_key) is None:
+            aqi_misses.setdefault(_aqi_param(country_code), {})[aqi_key] = (grid_lat, grid_lon, country_code)
+
+    requests_to_make = []
+    forecast_items = list(forecast_misses.items())
+    for i in range(0, len(forecast_items), _BATCH_CHUNK_SIZE):
+        chunk = forecast_items[i:i + _BATCH_CHUNK_SIZE]
+        url = _forecast_url(
+            ",".join(str(lat) for _, (lat, _, _) in chunk),
+            ",".join(str(lon) for _, (_, lon, _) in chunk),
+            unit_system,
+            ",".join(str(tz) for _, (_, _, tz) in chunk),
+        )
+        requests_to_make.append(([key for key, _ in chunk], url, _FORECAST_DEADLINE_SECONDS))
+    for misses in aqi_misses.values():
+        aqi_items = list(misses.items())
+        for i in range(0, len(aqi_items), _BATCH_CHUNK_SIZE):
+            chunk = aqi_items[i:i + _BATCH_CHUNK_SIZE]
+            url = _aqi_url(
+                ",".join(str(lat) for _, (lat, _, _) in chunk),
+                ",".join(str(lon) for _, (_, lon, _) in chunk),
+                chunk[0][1][2],
+            )
+            requests_to_make.append(([key for key, _ in chunk], url, _AQI_DEADLINE_SECONDS))
+
+    if not requests_to_make:
+        return 0
+
+    start_time = time.monotonic()
+    futures = [
+        (keys, url, deadline, _fetch_executor.submit(contextvars.copy_context().run, _fetch_batch, url, deadline))
+        for keys, url, deadline in requests_to_make
+    ]
+    for keys, url, deadline, future in futures:
+        try:
+            payloads = _result_by(future, start_time, deadline)
+        except FutureTimeoutError:
+            logging.warning(f"Batched forecast request not answered within {deadline}s: '{url}'.")
+            continue
+        except (requests.RequestException, ValueError) as e:
+            logging.warning(f"Batched forecast request failed: {e}")
+            continue
+        if len(payloads) != len(keys):
+            logging.warning(f"Batched forecast returned {len(payloads)} payload(s) for {len(keys)} location(s).")
+            continue
+        for key, payload in zip(keys, payloads):
+            forecast_cache.put(key, payload)
+
+    logging.info(f"Prefetched forecasts for {len(locations)} location(s) in {len(requests_to_make)} request(s).")
+    return len(requests_to_make)
+
+
+async def get_forecast_async(
+    client,
+    latitude,
+    longitude,
+    country_code,
+    city_state_str,
+    unit_system,
+    time_system,
+    timezone,
+    version="unknown",
+    cache_grid=forecast_cache.DEFAULT_GRID_DEGREES,
+    outlook=None,
+    alerts_mode=None,
+):
+    """
+    Coroutine counterpart of get_forecast() for an httpx.AsyncClient.  The
+    forecast, air-quality and alert requests run concurrently on the loop,
+    with the same per-request deadlines and the same forecast cache.
+    """
+    if not latitude or not longitude:
+        logging.error("get_forecast called without valid latitude/longitude.")
+        return ""
+
+    country_code = (country_code or "us").lower()
+    grid_lat, grid_lon, forecast_key, aqi_key = _cache_keys(
+        latitude, longitude, country_code, unit_system, timezone, cache_grid
+    )
+    forecast_data, aqi_data, alerts_info = await asyncio.gather(
+        asyncio.wait_for(
+            _cached_json_async(
+                client,
+                forecast_key,
+                _forecast_url(grid_lat, grid_lon, unit_system, timezone),
+                _FORECAST_DEADLINE_SECONDS,
+            ),
+            _FORECAST_DEADLINE_SECONDS,
+        ),
+        asyncio.wait_for(
+            _cached_json_async(
+                client, aqi_key, _aqi_url(grid_lat, grid_lon, country_code), _AQI_DEADLINE_SECONDS
+            ),
+            _AQI_DEADLINE_SECONDS,
+        ),
+        asyncio.wait_for(
+            _fetch_alerts_async(
+                client,
+                latitude,
+                longitude,
+                country_code,
+                city_state_str,
+                time_system,
+                timezone,
+                version,
+                alerts_mode,
+            ),
+            _ALERTS_DEADLINE_SECONDS,
+        ),
+        return_exceptions=True,
+    )
+
+    if isinstance(forecast_data, asyncio.TimeoutError):
+        logging.error(f"Forecast data not received within {_FORECAST_DEADLINE_SECONDS}s.")
+        return "Failed to retrieve forecast data: request timed out"
+    if isinstance(forecast_data, BaseException):
+        logging.error(f"Failed to retrieve forecast data: {forecast_data}")
+        return f"Failed to retrieve forecast data: {forecast_data}"
+
+    if isinstance(aqi_data, BaseException):
+        logging.warning(f"Failed to retrieve AQI data: {aqi_data}")
+        aqi_data = {}
+
+    if isinstance(alerts_info, BaseException):
+        logging.warning(f"Unexpected error fetching alerts: {alerts_info}")
+        alerts_info = ""
+
+    return format_forecast(
+        forecast_data,
+        aqi_data,
+        alerts_info,
+        latitude,
+        longitude,
+        country_code,
+        city_state_str,
+        unit_system,
+        time_system,
+        timezone,
+        outlook,
+    )
+
+
+async def _fetch_alerts_async(
+    client, latitude, longitude, country_code, city_state_str, time_system, timezone, version, alerts_mode=None
+):
+    """Coroutine counterpart of _fetch_alerts()."""
+    if country_code == "us":
+        try:
+            zones = await _nws_zones_async(client, latitude, longitude, version)
+            key = nws_cache.zone_key(zones) if zones else nws_cache.point_key(latitude, longitude)
+            data = nws_cache.get_alerts(key)
+            if data is None:
+                url, headers = _nws_alerts_request(latitude, longitude, version, zones)
+                resp = await async_get_with_retry(
+                    client, url, headers=headers, max_elapsed_seconds=_ALERTS_DEADLINE_SECONDS
+                )
+                data = nws_cache.put_alerts(key, resp.json())
+        except Exception as e:
+            logging.warning(f"Failed to fetch NWS alerts: {e}")
+            return ""
+        return _render_alerts_us(data, latitude, longitude, time_system, timezone, alerts_mode)
+
+    request = _meteoalarm_request(country_code, version)
+    if request is None:
+        logging.debug(f"No alerts source available for country '{country_code}'.")
+        return ""
+    slug, url, headers = request
+    entry = None
+    try:
+        locations = meteoalarm_cache.note_location(slug, city_state_str)
+        entry = meteoalarm_cache.get(slug)
+        covered = meteoalarm_cache.covers(entry, city_state_str)
+        if not meteoalarm_cache.is_fresh(entry) or not covered:
+            resp = await async_get_with_retry(
+                client,
+                url,
+                headers={**headers, **(meteoalarm_cache.conditional_headers(entry) if covered else {})},
+                max_elapsed_seconds=_ALERTS_DEADLINE_SECONDS,
+            )
+            entry = _store_meteoalarm_response(
+                slug, entry, resp.status_code, resp.headers, resp.content, locations
+            )
+    except ET.ParseError as e:
+        logging.warning(f"Failed to parse MeteoAlarm feed XML for '{slug}': {e}")
+        return ""
+    except (httpx.HTTPError, requests.RequestException) as e:
+        if entry is None:
+            logging.warning(f"Failed to fetch MeteoAlarm feed for '{slug}': {e}")
+            return ""
+        logging.warning(f"Failed to refresh MeteoAlarm feed for '{slug}', using cached copy: {e}")
+    except Exception as e:
+        logging.warning(f"Failed to fetch MeteoAlarm feed for '{slug}': {e}")
+        return ""
+    return _format_alerts_meteoalarm(
+        meteoalarm_cache.lookup(entry, city_state_str), slug, time_system, timezone
+    )
+
+
+async def _nws_zones_async(client, latitude, longitude, version):
+    """Coroutine counterpart of _nws_zones()."""
+    zones = nws_cache.get_zones(latitude, longitude)
+    if zones is not None:
+        return zones
+    url, headers = _nws_points_request(latitude, longitude, version)
+    try:
+        resp = await async_get_with_retry(
+            client, url, headers=headers, max_elapsed_seconds=_ALERTS_DEADLINE_SECONDS
+        )
+        zones = _zones_from_point(resp.json())
+    except (httpx.HTTPError, ValueError) as e:
+        logging.warning(f"NWS: could not resolve zones for {latitude},{longitude}: {e}")
+        return []
+    if zones:
+        nws_cache.put_zones(latitude, longitude, zones)
+    return zones
+
+
+def format_forecast(
+    forecast_data,
+    aqi_data,
+    alerts_info,
+    latitude,
+    longitude,
+    country_code,
+    city_state_str,
+    unit_system,
+    time_system,
+    timezone,
+    outlook=None,
+):
+    """
+    Build the weather section from already-downloaded open-meteo forecast and
+    air-quality payloads plus a pre-formatted alerts string.  Performs no I/O,
+    so the threaded and asyncio pipelines share it.  `outlook` adds a
+    multi-day table from the same payload (see _outlook_indices).
+    """
+    country_code = (country_code or "us").lower()
+    aqi_param = _aqi_param(country_code)
+    units = _unit_settings(unit_system)
+    temp_unit = units["temp_unit"]
+    precip_unit = units["precip_unit"]
+    wind_unit = units["wind_unit"]
+    hot_thresh, warm_thresh, chilly_thresh, cold_thresh, very_cold_thresh = units["temp_thresholds"]
+    windy_thresh = units["windy_thresh"]
+    aqi_data = aqi_data or {}
+
     # ------------------------------------------------------------------
     # Parse daily weather for today
     # ------------------------------------------------------------------
@@ -444,37 +1154,7 @@ def get_forecast(
     feels_like_min = daily_data["apparent_temperature_min"][index]
     feels_like_max = daily_data["apparent_temperature_max"][index]
 
-    weathercode_descriptions = {
-        0: ("Clear sky", "☀️"),
-        1: ("Mainly clear", "🌤️"),
-        2: ("Partly cloudy", "⛅"),
-        3: ("Overcast", "☁️"),
-        45: ("Fog", "🌫️"),
-        48: ("Depositing rime fog", "🌫️"),
-        51: ("Light drizzle", "🌦️"),
-        53: ("Moderate drizzle", "🌧️"),
-        55: ("Dense drizzle", "🌧️"),
-        56: ("Light freezing drizzle", "🌧️"),
-        57: ("Dense freezing drizzle", "🌧️"),
-        61: ("Slight rain", "🌧️"),
-        63: ("Moderate rain", "🌧️"),
-        65: ("Heavy rain", "🌧️"),
-        66: ("Light freezing rain", "🌧️"),
-        67: ("Heavy freezing rain", "🌧️"),
-        71: ("Slight snow fall", "❄️"),
-        73: ("Moderate snow fall", "❄️"),
-        75: ("Heavy snow fall", "❄️"),
-        77: ("Snow grains", "❄️"),
-        80: ("Slight rain showers", "🌦️"),
-        81: ("Moderate rain showers", "🌧️"),
-        82: ("Violent rain showers", "🌧️"),
-        85: ("Slight snow showers", "❄️"),
-        86: ("Heavy snow showers", "❄️"),
-        95: ("Thunderstorm", "⛈️"),
-        96: ("Thunderstorm with slight hail", "⛈️"),
-        99: ("Thunderstorm with heavy hail", "⛈️"),
-    }
-    condition, emoji = weathercode_descriptions.get(weathercode, ("Unknown", "❓"))
+    condition, emoji = _WEATHERCODE_DESCRIPTIONS.get(weathercode, ("Unknown", "❓"))
 
     sunrise_time = datetime.fromisoformat(sunrise)
     sunset_time = datetime.fromisoformat(sunset)
@@ -483,11 +1163,16 @@ def get_forecast(
     sunset_str = sunset_time.strftime(fmt)
 
     # Average humidity for today
-    hourly_data = forecast_data.get("hourly", {})
-    hourly_times = hourly_data.get("time", [])
-    humidity_values = hourly_data.get("relativehumidity_2m", [])
-    today_humidity = [h for t, h in zip(hourly_times, humidity_values) if t.startswith(today)]
-    avg_humidity = round(sum(today_humidity) / len(today_humidity), 1) if today_humidity else "N/A"
+    hourly_by_day = daily_stats(forecast_data.get("hourly"), _HOURLY_PARAMETERS)
+    today_humidity = hourly_by_day.get(today, {}).get("relativehumidity_2m")
+    avg_humidity = round(today_humidity["mean"], 1) if today_humidity else "N/A"
+
+    # Rain windows, warmest hour and the hourly timeline for today
+    hourly_data = forecast_data.get("hourly") or {}
+    today_hours = day_index(hourly_data.get("time", [])).get(today)
+    hourly_outlook = (
+        _format_hourly_outlook(hourly_data, *today_hours, temp_unit, time_system) if today_hours else ""
+    )
 
     # ------------------------------------------------------------------
     # AQI summary
@@ -496,13 +1181,16 @@ def get_forecast(
     aqi_suggestion = ""
     try:
         if aqi_data and "hourly" in aqi_data:
-            aqi_times = aqi_data["hourly"]["time"]
-            today_aqi_values = [
-                val for t, val in zip(aqi_times, aqi_data["hourly"][aqi_param])
-                if t.startswith(today)
-            ]
-            if today_aqi_values:
-                avg_aqi = round(sum(today_aqi_values) / len(today_aqi_values), 1)
+            pollutants = {
+                f"{aqi_param}_pm2_5": "PM2.5",
+                f"{aqi_param}_pm10": "PM10",
+                f"{aqi_param}_nitrogen_dioxide": "Nitrogen Dioxide",
+                f"{aqi_param}_ozone": "Ozone",
+                f"{aqi_param}_sulphur_dioxide": "Sulphur Dioxide",
+            }
+            today_aqi = daily_stats(aqi_data["hourly"], [aqi_param, *pollutants]).get(today, {})
+            if aqi_param in today_aqi:
+                avg_aqi = round(today_aqi[aqi_param]["mean"], 1)
 
                 if country_code == "us":
                     if avg_aqi > 300:
@@ -525,40 +1213,17 @@ def get_forecast(
                     elif avg_aqi > 20:
                         aqi_suggestion = "Air quality is fair. Some pollutants may affect sensitive individuals."
 
-            pollutants = {
-                f"{aqi_param}_pm2_5": "PM2.5",
-                f"{aqi_param}_pm10": "PM10",
-                f"{aqi_param}_nitrogen_dioxide": "Nitrogen Dioxide",
-                f"{aqi_param}_ozone": "Ozone",
-                f"{aqi_param}_sulphur_dioxide": "Sulphur Dioxide",
-            }
             pollutant_warnings = []
             for param, name in pollutants.items():
-                if param in aqi_data["hourly"]:
-                    values = [
-                        v for t, v in zip(aqi_times, aqi_data["hourly"][param])
-                        if t.startswith(today)
-                    ]
-                    if values:
-                        avg_val = round(sum(values) / len(values), 1)
-                        if avg_val > 50:
-                            pollutant_warnings.append(f"- {name}: AQI {avg_val}. Consider reducing exposure.")
+                if param in today_aqi:
+                    avg_val = round(today_aqi[param]["mean"], 1)
+                    if avg_val > 50:
+                        pollutant_warnings.append(f"- {name}: AQI {avg_val}. Consider reducing exposure.")
             if pollutant_warnings:
                 aqi_suggestion += "\nPollutant-specific warnings:\n" + "\n".join(pollutant_warnings)
     except Exception as e:
         logging.warning(f"Error calculating AQI: {e}")
 
-    # ------------------------------------------------------------------
-    # Alerts
-    # ------------------------------------------------------------------
-    if country_code == "us":
-        alerts_info = _fetch_alerts_us(latitude, longitude, time_system, timezone, version)
-    elif country_code in _METEOALARM_SLUGS:
-        alerts_info = _fetch_alerts_meteoalarm(country_code, city_state_str, time_system, timezone, version)
-    else:
-        alerts_info = ""
-        logging.debug(f"No alerts source available for country '{country_code}'.")
-
     # ------------------------------------------------------------------
     # Outfit suggestions
     # ------------------------------------------------------------------
@@ -618,6 +1283,11 @@ def get_forecast(
     if aqi_suggestion:
         weather_string += f"\n{aqi_suggestion}"
     weather_string += f"\n{outfit_suggestions}"
+    if hourly_outlook:
+        weather_string += f"\n{hourly_outlook}"
+    outlook_indices = _outlook_indices(dates, index, outlook)
+    if outlook_indices:
+        weather_string += f"\n\n## Outlook\n\n{_format_outlook(daily_data, outlook_indices, units)}\n"
     if alerts_info:
         weather_string += f"\n\n## Severe Weather Alerts:\n{alerts_info}"
 
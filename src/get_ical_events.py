@@ -1,34 +1,91 @@
+import httpx
 import requests
+import sqlite3
 from icalendar import Calendar
-from datetime import datetime, date, timedelta
+from datetime import datetime
 from dateutil.rrule import rrulestr
 import logging
 
+import ics_parse_pool
+import occurrence_index
+from calendar_event import Event
+from http_client import async_get_with_retry, get_with_retry
+from ics_stream import ICSScanner, scan_calendar
+
 # Configuration for retries and logging
 MAX_RETRIES = 3
 TIMEOUT = 5  # seconds
+FEED_DEADLINE_SECONDS = 30  # overall cap for one feed download, retries included
 MAX_FUTURE_YEARS = 5
 
 logging.basicConfig(level=logging.DEBUG)  # Set to DEBUG for detailed log
 
 
-def fetch_icalendar(url):
+def fetch_icalendar(url, window=None):
+    """
+    Download a feed.  With `window` = (first_day, last_day) the body is
+    scanned as it streams in and only the events that may fall in that
+    window are returned (see ics_stream); otherwise the whole feed is.
+    """
+    url = _normalize_ics_url(url)
+    try:
+        logging.debug(f"Fetching iCalendar from: {url}")
+        response = get_with_retry(
+            url, timeout=TIMEOUT, max_elapsed_seconds=FEED_DEADLINE_SECONDS, stream=window is not None
+        )
+        try:
+            if window is None:
+                ical_string = response.text
+            else:
+                response.raw.decode_content = True
+                ical_string = scan_calendar(response.raw, *window, encoding=_charset(response.headers))
+        finally:
+            response.close()
+        logging.debug("Fetched iCalendar data successfully")
+        return ical_string
+    except requests.exceptions.RequestException as e:
+        logging.critical(f"Failed to fetch iCalendar from {url}: {e}")
+        return None
+
+
+async def fetch_icalendar_async(client, url, window=None):
+    """Coroutine counterpart of fetch_icalendar() for an httpx.AsyncClient."""
+    url = _normalize_ics_url(url)
     for attempt in range(MAX_RETRIES):
         try:
-            if url.startswith("webcal://"):
-                url = url.replace("webcal://", "https://", 1)
             logging.debug(f"Fetching iCalendar from: {url}")
-            response = requests.get(url, timeout=TIMEOUT)
-            response.raise_for_status()
+            async with client.stream("GET", url, timeout=TIMEOUT, follow_redirects=True) as response:
+                response.raise_for_status()
+                if window is None:
+                    await response.aread()
+                    ical_string = response.text
+                else:
+                    scanner = ICSScanner(*window, encoding=_charset(response.headers))
+                    async for chunk in response.aiter_bytes():
+                        scanner.feed(chunk)
+                    ical_string = scanner.close()
             logging.debug("Fetched iCalendar data successfully")
-            return response.text
-        except requests.exceptions.RequestException as e:
+            return ical_string
+        except httpx.HTTPError as e:
             logging.critical(f"Attempt {attempt + 1}: Error occurred: {e}")
-            if attempt < MAX_RETRIES - 1:
-                continue  # Retry
-            else:
-                logging.critical("Max retries reached. Failing.")
-                return None
+    logging.critical("Max retries reached. Failing.")
+    return None
+
+
+def _charset(headers):
+    """The charset declared in Content-Type; iCalendar defaults to UTF-8 (RFC 5545)."""
+    for param in headers.get("Content-Type", "").split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+def _normalize_ics_url(url):
+    url = url.strip()
+    if url.startswith("webcal://"):
+        url = url.replace("webcal://", "https://", 1)
+    return url
 
 
 def parse_icalendar(ical_string):
@@ -81,29 +138,28 @@ def parse_icalendar(ical_string):
                             continue  # Skip dates specified in EXDATE
 
                         try:
-                            event = {
-                                "start": dt,
-                                "end": dt + event_duration,
-                                "summary": str(summary) if summary else "No Title",
-                                "location": location,
-                                "uid": uid,
-                                "description": str(description) if description else None,
-                                "description": str(description) if description else None,
-                            }
+                            event = Event(
+                                dt,
+                                dt + event_duration,
+                                str(summary) if summary else "No Title",
+                                location,
+                                uid,
+                                str(description) if description else None,
+                                recurrence_id=dt,
+                            )
                             logging.debug(f"Adding recurring event: {event}")
                             events.append(event)
                         except Exception as e:
                             logging.critical(f"Error creating event: {e}")
                 else:
-                    event = {
-                        "start": start,
-                        "end": end,
-                        "summary": str(summary) if summary else "No Title",
-                        "location": location,
-                        "uid": uid,
-                        "description": str(description) if description else None,
-                    }
-                    events.append(event)
+                    events.append(Event(
+                        start,
+                        end,
+                        str(summary) if summary else "No Title",
+                        location,
+                        uid,
+                        str(description) if description else None,
+                    ))
 
     # Process exceptions to recurring events
     for (uid, ex_start), ex_component in exceptions.items():
@@ -116,84 +172,148 @@ def parse_icalendar(ical_string):
                     if ex_component.get("summary")
                     else "No Title"
                 )
-            if location:
-                apple_maps_link = f"https://maps.apple.com/?q={location}"
-                event["apple_maps_link"] = apple_maps_link
 
     return events
 
-def make_aware(dt, timezone):
-    try:
-        if isinstance(dt, datetime):
-            if dt.tzinfo is None:
-                return timezone.localize(dt)
-            return dt
-        elif isinstance(dt, date):
-            dt = datetime.combine(dt, datetime.min.time())
-            return timezone.localize(dt)
-    except Exception as e:
-        logging.critical(f"Error in make_aware: {e}")
-        raise
-    raise ValueError("Unsupported date type")
-
-
-def is_event_today(event_start, event_end, timezone):
-    try:
-        today = datetime.now(timezone).date()
-        event_start = make_aware(event_start, timezone)
-        event_end = make_aware(event_end, timezone)
 
-        # Handle exclusive end time on all-day events that ends exactly at 00:00
-        if event_end.time() == datetime.min.time() and event_end.date() != event_start.date():
-            event_end -= timedelta(seconds=1)
+def get_ics_events(url, timezone, use_index=False):
+    """
+    Today's events from a webcal feed.  With `use_index` the feed is kept
+    expanded in occurrence_index and only re-parsed when it changes;
+    otherwise it is streamed through the ics_stream pre-filter.
+    """
+    today = datetime.now(timezone).date()
+    if use_index:
+        try:
+            source = _refresh_indexed_feed(url)
+            return _indexed_events_today(source, timezone, today, url)
+        except sqlite3.Error as e:
+            logging.warning(f"Calendar index unavailable, parsing feed directly: {e}")
+    ical_string = fetch_icalendar(url, window=(today, today))
+    return events_today_from_ical(ical_string, timezone, url)
+
 
-        return event_start.date() <= today <= event_end.date()
-    except Exception as e:
-        logging.critical(f"Error in is_event_today: {e}")
-        raise
+async def get_ics_events_async(client, url, timezone, use_index=False):
+    """Coroutine counterpart of get_ics_events() for an httpx.AsyncClient."""
+    today = datetime.now(timezone).date()
+    if use_index:
+        try:
+            source = await _refresh_indexed_feed_async(client, url)
+            return _indexed_events_today(source, timezone, today, url)
+        except sqlite3.Error as e:
+            logging.warning(f"Calendar index unavailable, parsing feed directly: {e}")
+    ical_string = await fetch_icalendar_async(client, url, window=(today, today))
+    return _parsed_events_today(await ics_parse_pool.parse_feed_async(ical_string), timezone, url)
 
 
-def is_all_day_event(event):
-    logging.debug("Checking for all-day event")
-    start = event["start"]
-    end = event["end"]
+def events_today_from_ical(ical_string, timezone, url=""):
+    """Parse a downloaded feed and keep only the events occurring today."""
+    return _parsed_events_today(ics_parse_pool.parse_feed(ical_string), timezone, url)
+
+
+def _parsed_events_today(events, timezone, url):
+    result = events_today(events, timezone)
+    short_url = url[:60] + "..." if len(url) > 60 else url
+    logging.info(f"iCal {short_url}: {len(events)} total events, {len(result)} today")
+    return result
 
-def convert_all_day_event(event, timezone):
-    try:
-        if isinstance(event["start"], date) and not isinstance(event["start"], datetime):
-            event["start"] = make_aware(datetime.combine(event["start"], datetime.min.time()), timezone)
-        if isinstance(event["end"], date) and not isinstance(event["end"], datetime):
-            event["end"] = make_aware(datetime.combine(event["end"], datetime.min.time()), timezone)
-    except Exception as e:
-        logging.critical(f"Error in convert_all_day_event: {e}")
-        raise
-    return event
-    end = event["end"]
-    return (
-            isinstance(start, date)
-            and not isinstance(start, datetime)
-            and isinstance(end, date)
-            and not isinstance(end, datetime)
-    )
-
-
-def get_ics_events(url, timezone):
-    ical_string = fetch_icalendar(url)
-    converted = []
-    for event in parse_icalendar(ical_string):
-        try:
-            converted.append(convert_all_day_event(event, timezone))
-        except Exception as e:
-            logging.warning(f"Skipping event due to conversion error: {e}")
 
+def events_today(events, timezone):
+    """Keep the parsed events occurring today, localized to `timezone`."""
+    today = datetime.now(timezone).date()
     result = []
-    for event in converted:
+    for event in events:
         try:
-            if is_event_today(event["start"], event["end"], timezone):
+            if event.localize(timezone).occurs_on(today):
                 result.append(event)
         except Exception as e:
             logging.warning(f"Skipping event due to date filter error: {e}")
+    return result
+
+
+# ── occurrence index ───────────────────────────────────────────────────────────
+
+def _request_feed(url, headers):
+    """GET a feed through get_with_retry(); returns the response, or None if it failed."""
+    try:
+        logging.debug(f"Fetching iCalendar from: {url}")
+        return get_with_retry(url, headers=headers, timeout=TIMEOUT, max_elapsed_seconds=FEED_DEADLINE_SECONDS)
+    except requests.exceptions.RequestException as e:
+        logging.critical(f"Failed to fetch iCalendar from {url}: {e}")
+        return None
+
+
+async def _request_feed_async(client, url, headers):
+    try:
+        logging.debug(f"Fetching iCalendar from: {url}")
+        return await async_get_with_retry(
+            client, url, headers=headers, timeout=TIMEOUT, max_elapsed_seconds=FEED_DEADLINE_SECONDS
+        )
+    except (httpx.HTTPError, requests.exceptions.RequestException) as e:
+        logging.critical(f"Failed to fetch iCalendar from {url}: {e}")
+        return None
+
+
+def _feed_version(state, status_code, body):
+    """The content version of a downloaded feed, or None if it is unchanged since it was indexed."""
+    if status_code == 304 and state is not None:
+        return None
+    version = occurrence_index.content_version(body)
+    if state is not None and state["version"] == version:
+        return None
+    return version
 
+
+def _store_feed(source, headers, version, events):
+    """Re-index a feed with its parsed events, or record that it was unchanged (version None)."""
+    etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+    if version is None:
+        occurrence_index.mark_unchanged(source, etag, last_modified)
+    else:
+        occurrence_index.replace_source(source, {"": events}, version, etag, last_modified)
+
+
+def _stale_source(source, state, url):
+    if state is None:
+        return None
+    logging.warning(f"iCal {url}: download failed, using the indexed copy.")
+    return source
+
+
+def _refresh_indexed_feed(url):
+    """Bring a feed's indexed occurrences up to date; returns its source key, or None."""
+    url = _normalize_ics_url(url)
+    source = occurrence_index.webcal_source(url)
+    with occurrence_index.source_lock(source):
+        state = occurrence_index.source_state(source)
+        response = _request_feed(url, occurrence_index.conditional_headers(state))
+        if response is None:
+            return _stale_source(source, state, url)
+        version = _feed_version(state, response.status_code, response.content)
+        events = ics_parse_pool.parse_feed(response.content, _charset(response.headers)) if version else None
+        _store_feed(source, response.headers, version, events)
+    return source
+
+
+async def _refresh_indexed_feed_async(client, url):
+    url = _normalize_ics_url(url)
+    source = occurrence_index.webcal_source(url)
+    state = occurrence_index.source_state(source)
+    response = await _request_feed_async(client, url, occurrence_index.conditional_headers(state))
+    if response is None:
+        return _stale_source(source, state, url)
+    version = _feed_version(state, response.status_code, response.content)
+    events = await ics_parse_pool.parse_feed_async(response.content, _charset(response.headers)) if version else None
+    # Never held across an await: the lock is shared with worker threads
+    with occurrence_index.source_lock(source):
+        _store_feed(source, response.headers, version, events)
+    return source
+
+
+def _indexed_events_today(source, timezone, today, url):
+    if source is None:
+        return []
+    result = events_today(occurrence_index.events_between([source], today), timezone)
     short_url = url[:60] + "..." if len(url) > 60 else url
-    logging.info(f"iCal {short_url}: {len(converted)} total events, {len(result)} today")
-    return result
\ No newline at end of file
+    logging.info(f"iCal {short_url}: {len(result)} events today (indexed)")
+    return result
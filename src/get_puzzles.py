@@ -27,7 +27,8 @@ def get_puzzles():
         for letter in line:
             word_search_string += letter + " "
         word_search_string += "\n"
-    for word in word_search.words:
+    # Words the generator could not fit are not in the grid; leave them out
+    for word in word_search.placed_words:
         word_search_string_words += f"{word.text.capitalize()}, "
         word_search_ans_string += f"{word.text.capitalize()} ({word.coordinates[0]}, {word.direction.name}), "
 
@@ -1,10 +1,38 @@
+import logging
+
+import httpx
 import requests
 
+import circuit_breaker
+
+_QOTD_URL = "https://zenquotes.io/api/today"
+
+
 def get_qotd():
-    url = "https://zenquotes.io/api/today"
-    text = ""
+    try:
+        with circuit_breaker.guard(_QOTD_URL):
+            response = requests.get(_QOTD_URL, timeout=10)
+            response.raise_for_status()
+    except requests.RequestException as e:
+        logging.warning(f"Quote of the Day unavailable: {e}")
+        return ""
+    return _format_qotd(response.json())
 
-    response = requests.get(url).json()
+
+async def get_qotd_async(client):
+    """Coroutine counterpart of get_qotd() for an httpx.AsyncClient."""
+    try:
+        with circuit_breaker.guard(_QOTD_URL):
+            response = await client.get(_QOTD_URL, timeout=10)
+            response.raise_for_status()
+    except (httpx.HTTPError, requests.RequestException) as e:
+        logging.warning(f"Quote of the Day unavailable: {e}")
+        return ""
+    return _format_qotd(response.json())
+
+
+def _format_qotd(response):
+    text = ""
 
     text += "\n\n# Quote of the Day"
     text += f"\n{response[0]['q']}"
@@ -1,20 +1,43 @@
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 
 import feedparser
+import httpx
 import requests
 
+from timestamps import output_format
+
 
 def parse_recent_feed(feed_url):
     logging.debug(f"Fetching feed from URL: {feed_url}")
     try:
         response = requests.get(feed_url, timeout=10)
         response.raise_for_status()
-        feed = feedparser.parse(response.content)
     except requests.RequestException as e:
         logging.error(f"Error fetching feed from {feed_url}: {e}")
         return []
 
+    return _recent_entries(response.content, feed_url)
+
+
+async def parse_recent_feed_async(client, feed_url):
+    """Coroutine counterpart of parse_recent_feed() for an httpx.AsyncClient."""
+    logging.debug(f"Fetching feed from URL: {feed_url}")
+    try:
+        response = await client.get(feed_url, timeout=10, follow_redirects=True)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logging.error(f"Error fetching feed from {feed_url}: {e}")
+        return []
+
+    return _recent_entries(response.content, feed_url)
+
+
+def _recent_entries(content, feed_url):
+    """Parse a downloaded feed and keep the entries published in the last 24 hours."""
+    feed = feedparser.parse(content)
+
     if not feed or not hasattr(feed, "entries") or not feed.entries:
         logging.warning(f"The feed from {feed_url} is empty or invalid.")
         return []
@@ -67,6 +90,24 @@ def get_rss(url_string, tz, TIME_SYSTEM):
         entries = parse_recent_feed(url)
         all_entries.extend(entries)
 
+    return format_rss(all_entries, tz, TIME_SYSTEM)
+
+
+async def get_rss_async(client, url_string, tz, TIME_SYSTEM):
+    """Coroutine counterpart of get_rss(); all feeds are fetched concurrently."""
+    if not url_string:
+        logging.error("The provided URL string is null or empty.")
+        return ""
+
+    url_list = [url.strip() for url in url_string.split(",")]
+    results = await asyncio.gather(*(parse_recent_feed_async(client, url) for url in url_list))
+    all_entries = [entry for entries in results for entry in entries]
+
+    return format_rss(all_entries, tz, TIME_SYSTEM)
+
+
+def format_rss(all_entries, tz, TIME_SYSTEM):
+    """Sort the collected feed entries newest first and format them as the feed section."""
     # Sort all entries by published date
     all_entries.sort(key=lambda x: x["published"], reverse=True)
 
@@ -76,9 +117,7 @@ def get_rss(url_string, tz, TIME_SYSTEM):
     logging.debug(f"Current time (UTC): {now.isoformat()}")
     logging.debug(f"Filtering entries published after: {time_24_hours_ago.isoformat()}")
     output = []
-    date_time_format = (
-        "%I:%M %p on %A, %B %d, %Y" if TIME_SYSTEM == "12HR" else "%H:%M on %A, %B %d, %Y"
-    )
+    date_time_format = output_format(TIME_SYSTEM, "datetime")
 
     if all_entries:
         output.append("# Feed Entries\n\n")
@@ -1,8 +1,9 @@
+import asyncio
 import logging
 import datetime
 import pytz
 from get_todoist_tasks import get_todoist_tasks
-from get_vikunja_tasks import get_vikunja_tasks
+from get_vikunja_tasks import get_vikunja_tasks, get_vikunja_tasks_async
 
 
 def format_time(datetime_obj, time_system):
@@ -19,21 +20,65 @@ def get_todo_tasks(
         VIKUNJA_API_KEY=None,
         VIKUNJA_BASE_URL=None,
 ):
+    raw_todoist_data = get_todoist_tasks(TODOIST_API_KEY) if TODOIST_API_KEY else None
+    raw_vikunja_data = (
+        get_vikunja_tasks(VIKUNJA_API_KEY, VIKUNJA_BASE_URL)
+        if VIKUNJA_API_KEY and VIKUNJA_BASE_URL
+        else None
+    )
+    return format_todo_tasks(
+        timezone, TIME_SYSTEM, raw_todoist_data, raw_vikunja_data, VIKUNJA_BASE_URL
+    )
+
+
+async def get_todo_tasks_async(
+        client,
+        timezone,
+        TIME_SYSTEM,
+        TODOIST_API_KEY=None,
+        VIKUNJA_API_KEY=None,
+        VIKUNJA_BASE_URL=None,
+):
+    """
+    Coroutine counterpart of get_todo_tasks().  Vikunja is fetched natively
+    with the httpx.AsyncClient; the Todoist SDK is blocking, so it runs in a
+    worker thread alongside it.
+    """
+    async def _none():
+        return None
+
+    raw_todoist_data, raw_vikunja_data = await asyncio.gather(
+        asyncio.to_thread(get_todoist_tasks, TODOIST_API_KEY) if TODOIST_API_KEY else _none(),
+        get_vikunja_tasks_async(client, VIKUNJA_API_KEY, VIKUNJA_BASE_URL)
+        if VIKUNJA_API_KEY and VIKUNJA_BASE_URL
+        else _none(),
+    )
+    return format_todo_tasks(
+        timezone, TIME_SYSTEM, raw_todoist_data, raw_vikunja_data, VIKUNJA_BASE_URL
+    )
+
+
+def format_todo_tasks(
+        timezone,
+        TIME_SYSTEM,
+        raw_todoist_data=None,
+        raw_vikunja_data=None,
+        VIKUNJA_BASE_URL=None,
+):
+    """Format already-fetched Todoist / Vikunja tasks into (HTML, plain text) sections."""
     html_text = ""
     plain_text = ""
 
-    if TODOIST_API_KEY or VIKUNJA_API_KEY:
+    if raw_todoist_data is not None or raw_vikunja_data is not None:
         html_text += "\n\n# Tasks"
         plain_text += "\n\n# Tasks"
 
-    if TODOIST_API_KEY:
-        raw_todoist_data = get_todoist_tasks(TODOIST_API_KEY)
+    if raw_todoist_data is not None:
         h, p = process_tasks(raw_todoist_data, timezone, TIME_SYSTEM, source="todoist")
         html_text += h
         plain_text += p
 
-    if VIKUNJA_API_KEY and VIKUNJA_BASE_URL:
-        raw_vikunja_data = get_vikunja_tasks(VIKUNJA_API_KEY, VIKUNJA_BASE_URL)
+    if raw_vikunja_data is not None:
         h, p = process_tasks(
             raw_vikunja_data,
             timezone,
@@ -1,5 +1,6 @@
 import logging
 import feedparser
+import requests
 from bs4 import BeautifulSoup
 
 # Set up logging
@@ -9,9 +10,12 @@ logging.basicConfig(level=logging.DEBUG)
 rss_feed_url = "https://www.merriam-webster.com/wotd/feed/rss2"
 
 
-def get_word_of_the_day():
-    # Parse the RSS feed
-    feed = feedparser.parse(rss_feed_url)
+def get_word_of_the_day(feed=None):
+    # Download and parse the RSS feed, unless the caller already did
+    if feed is None:
+        response = requests.get(rss_feed_url, timeout=10)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
     logging.debug(f"Feed parsed. Feed: {feed}")
 
     # Get the first entry from the feed
@@ -55,8 +59,15 @@ def get_word_of_the_day():
     return second_paragraph
 
 
-def get_wotd():
-    second_paragraph = get_word_of_the_day()
+async def get_wotd_async(client):
+    """Coroutine counterpart of get_wotd(); the feed is downloaded with an httpx.AsyncClient."""
+    response = await client.get(rss_feed_url, timeout=10, follow_redirects=True)
+    response.raise_for_status()
+    return get_wotd(feedparser.parse(response.content))
+
+
+def get_wotd(feed=None):
+    second_paragraph = get_word_of_the_day(feed)
     wotd_string = ""
     wotd_string += "\n\n# Word of the Day"
     wotd_string += f"\n\n{second_paragraph}"
@@ -0,0 +1,96 @@
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python path gives the same results
+    np = None
+
+# Per-day aggregation of open-meteo "hourly" blocks.
+#
+# The hourly timestamps are walked once to build a day index of
+# (start, stop) offsets per local date; every series is then aggregated by
+# slicing those ranges instead of re-filtering the timestamps with
+# startswith() for each series.  Missing (null) readings are skipped.
+
+
+def day_index(times):
+    """
+    Map each local date in a chronological list of ISO timestamps
+    ("YYYY-MM-DDTHH:MM") to the (start, stop) slice of its hours.
+    """
+    index = {}
+    current = None
+    start = 0
+    for i, timestamp in enumerate(times):
+        day = timestamp[:10]
+        if day != current:
+            if current is not None:
+                index[current] = (start, i)
+            current, start = day, i
+    if current is not None:
+        index[current] = (start, len(times))
+    return index
+
+
+def _stats_python(values, times, start, stop):
+    best = None
+    total = 0.0
+    count = 0
+    low = high = None
+    for offset in range(start, min(stop, len(values))):
+        value = values[offset]
+        if value is None:
+            continue
+        total += value
+        count += 1
+        if low is None or value < low:
+            low = value
+        if high is None or value > high:
+            high, best = value, offset
+    if count == 0:
+        return None
+    return {"min": float(low), "max": float(high), "mean": total / count, "peak_time": times[best]}
+
+
+def _stats_numpy(array, times, start, stop):
+    window = array[start:stop]
+    valid = ~np.isnan(window)
+    if not valid.any():
+        return None
+    peak = int(np.nanargmax(window))
+    return {
+        "min": float(np.nanmin(window)),
+        "max": float(window[peak]),
+        "mean": float(window[valid].sum() / valid.sum()),
+        "peak_time": times[start + peak],
+    }
+
+
+def daily_stats(hourly, keys, use_numpy=None):
+    """
+    Aggregate the named series of an open-meteo hourly block per local date.
+
+    Returns {date: {key: {"min", "max", "mean", "peak_time"}}}, where
+    peak_time is the timestamp of the (first) maximum.  Series that are
+    absent, or have no readings on a date, are left out for that date.
+    NumPy is used when installed unless `use_numpy` is False.
+    """
+    hourly = hourly or {}
+    times = hourly.get("time", [])
+    index = day_index(times)
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    result = {day: {} for day in index}
+    for key in keys:
+        values = hourly.get(key)
+        if not values:
+            continue
+        if use_numpy:
+            array = np.array(values, dtype=float)  # null readings become NaN
+        for day, (start, stop) in index.items():
+            if use_numpy:
+                stats = _stats_numpy(array, times, start, stop)
+            else:
+                stats = _stats_python(values, times, start, stop)
+            if stats is not None:
+                result[day][key] = stats
+    return result
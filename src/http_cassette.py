@@ -0,0 +1,327 @@
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+import requests.adapters
+
+# Record/replay of upstream HTTP traffic, for deterministic offline runs.
+#
+# install(RECORD, directory) captures every response that goes through the
+# requests, niquests (caldav) and httpx transports into a cassette: one
+# JSON line per response in <directory>/interactions.jsonl.  install(REPLAY,
+# directory) serves those responses back without touching the network,
+# after the recorded latency multiplied by `latency_scale` (0 replays
+# instantly).  A request is matched on method, URL and body hash; requests
+# whose body changed (e.g. a summary prompt built from today's date) fall
+# back to method and URL.  Identical requests are answered in recorded
+# order, the last one repeating, so a recording can be replayed many times.
+# Anything not in the cassette fails like an unreachable host.
+#
+# Cassettes must be safe to keep as test fixtures, so secrets are removed
+# before anything is written: request headers are never stored, response
+# headers that carry credentials (Set-Cookie, Authorization, tokens) are
+# dropped, and every query-string value and URL password is replaced by a
+# placeholder (webcal feed tokens and API keys travel in the query).  The
+# placeholder carries a short hash of the value, so requests that differ
+# only in their query still replay separately; replay matches on the same
+# redacted URL.  Response bodies are the user's real data all the same.
+CASSETTE_DIR = "./data/cassette"
+RECORD = "RECORD"
+REPLAY = "REPLAY"
+
+_INTERACTIONS_FILE = "interactions.jsonl"
+_META_FILE = "cassette.json"
+# Stored bodies are already decoded, so these no longer describe them.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+_SECRET_HEADERS = {"set-cookie", "set-cookie2", "cookie", "authorization", "proxy-authorization"}
+_SECRET_HEADER_WORDS = ("token", "secret", "api-key", "apikey", "session")
+_URL_HEADERS = {"location", "content-location"}
+
+_active = None
+_originals = {}
+_install_lock = threading.Lock()
+
+
+def _body_hash(body):
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, bytes):
+        return ""  # streamed upload; match on method and URL only
+    return hashlib.sha256(body).hexdigest()
+
+
+def _placeholder(value):
+    return f"REDACTED-{hashlib.sha256(value.encode('utf-8')).hexdigest()[:8]}"
+
+
+def redact_url(url):
+    """`url` with each query-string value and any password replaced by a placeholder."""
+    parts = urlsplit(str(url))
+    netloc = parts.netloc
+    if parts.password is not None:
+        netloc = netloc.replace(f":{parts.password}@", f":{_placeholder(parts.password)}@", 1)
+    query = parts.query
+    if query:
+        query = urlencode(
+            [(key, _placeholder(value)) for key, value in parse_qsl(query, keep_blank_values=True)], safe="-"
+        )
+    return urlunsplit((parts.scheme, netloc, parts.path, query, parts.fragment))
+
+
+def _is_secret_header(name):
+    name = name.lower()
+    return name in _SECRET_HEADERS or any(word in name for word in _SECRET_HEADER_WORDS)
+
+
+def _stored_headers(headers):
+    stored = {}
+    for name, value in headers.items():
+        if name.lower() in _DROPPED_HEADERS or _is_secret_header(name):
+            continue
+        stored[name] = redact_url(value) if name.lower() in _URL_HEADERS else value
+    return stored
+
+
+class Cassette:
+    def __init__(self, directory, mode, latency_scale=1.0):
+        self.directory = directory
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries = {}  # (method, url, body hash) -> [entry, ...]
+        self._by_url = {}  # (method, url) -> [entry, ...]
+        self._cursors = {}
+        path = os.path.join(directory, _INTERACTIONS_FILE)
+        if mode == RECORD:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, _META_FILE), "w") as f:
+                json.dump({"recorded_at": datetime.now(timezone.utc).isoformat()}, f)
+            open(path, "w").close()
+        else:
+            self._load(path)
+
+    def _load(self, path):
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault((entry["method"], entry["url"], entry["body_sha"]), []).append(entry)
+                        self._by_url.setdefault((entry["method"], entry["url"]), []).append(entry)
+        except FileNotFoundError:
+            logging.warning(f"HTTP cassette: nothing recorded in '{self.directory}'.")
+        logging.info(f"HTTP cassette: replaying {sum(map(len, self._entries.values()))} response(s).")
+
+    def record(self, method, url, body, status, reason, headers, content, elapsed):
+        entry = {
+            "method": method,
+            "url": redact_url(url),
+            "body_sha": _body_hash(body),
+            "status": status,
+            "reason": reason or "",
+            "headers": _stored_headers(headers),
+            "body": base64.b64encode(content or b"").decode("ascii"),
+            "elapsed": elapsed,
+        }
+        with self._lock:
+            with open(os.path.join(self.directory, _INTERACTIONS_FILE), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def lookup(self, method, url, body):
+        """The next recorded entry for a request, or None."""
+        url = redact_url(url)
+        for key, table in (
+            ((method, url, _body_hash(body)), self._entries),
+            ((method, url), self._by_url),
+        ):
+            entries = table.get(key)
+            if entries:
+                with self._lock:
+                    index = self._cursors.get(key, 0)
+                    self._cursors[key] = index + 1
+                return entries[min(index, len(entries) - 1)]
+        return None
+
+    def delay(self, entry):
+        return entry["elapsed"] * self.latency_scale
+
+
+def _missing(url):
+    return f"HTTP cassette: no recorded response for '{url}'"
+
+
+# ── requests / niquests ────────────────────────────────────────────────────────
+
+def _replayed_response(module, entry, request):
+    """A requests- or niquests-style Response built from a cassette entry."""
+    content = base64.b64decode(entry["body"])
+    response = module.Response()
+    response.status_code = entry["status"]
+    response.reason = entry["reason"]
+    response.headers = module.structures.CaseInsensitiveDict(entry["headers"])
+    response._content = content
+    response._content_consumed = True
+    response.raw = io.BytesIO(content)
+    response.url = request.url
+    response.request = request
+    response.encoding = module.utils.get_encoding_from_headers(response.headers)
+    response.elapsed = timedelta(seconds=entry["elapsed"])
+    return response
+
+
+def _patched_send(module, original):
+    def send(adapter, request, *args, **kwargs):
+        cassette = _active
+        if cassette is None:
+            return original(adapter, request, *args, **kwargs)
+        if cassette.mode == REPLAY:
+            entry = cassette.lookup(request.method, request.url, request.body)
+            if entry is None:
+                raise module.exceptions.ConnectionError(_missing(request.url), request=request)
+            time.sleep(cassette.delay(entry))
+            return _replayed_response(module, entry, request)
+
+        # Read before sending: an adapter further down may rewrite the request
+        method, url, body = request.method, request.url, request.body
+        start = time.perf_counter()
+        response = original(adapter, request, *args, **kwargs)
+        content = response.content
+        # Streaming callers (MeteoAlarm) read .raw, which .content has drained
+        response.raw = io.BytesIO(content)
+        cassette.record(
+            method, url, body, response.status_code, response.reason,
+            response.headers, content, time.perf_counter() - start,
+        )
+        return response
+
+    return send
+
+
+# ── httpx ──────────────────────────────────────────────────────────────────────
+
+def _request_body(request):
+    try:
+        return request.content
+    except httpx.RequestNotRead:
+        return None
+
+
+def _replayed_httpx_response(request):
+    cassette = _active
+    entry = cassette.lookup(request.method, str(request.url), _request_body(request))
+    if entry is None:
+        raise httpx.ConnectError(_missing(request.url), request=request)
+    response = httpx.Response(
+        entry["status"], headers=entry["headers"], content=base64.b64decode(entry["body"]), request=request
+    )
+    return entry, response
+
+
+def _record_httpx(method, url, body, response, elapsed):
+    _active.record(
+        method, url, body, response.status_code, response.reason_phrase, response.headers, response.content, elapsed,
+    )
+
+
+def _patched_handle_request(original):
+    def handle_request(transport, request):
+        if _active is None:
+            return original(transport, request)
+        if _active.mode == REPLAY:
+            entry, response = _replayed_httpx_response(request)
+            time.sleep(_active.delay(entry))
+            return response
+        method, url, body = request.method, str(request.url), _request_body(request)
+        start = time.perf_counter()
+        response = original(transport, request)
+        response.read()
+        _record_httpx(method, url, body, response, time.perf_counter() - start)
+        return response
+
+    return handle_request
+
+
+def _patched_handle_async_request(original):
+    async def handle_async_request(transport, request):
+        if _active is None:
+            return await original(transport, request)
+        if _active.mode == REPLAY:
+            entry, response = _replayed_httpx_response(request)
+            await asyncio.sleep(_active.delay(entry))
+            return response
+        method, url, body = request.method, str(request.url), _request_body(request)
+        start = time.perf_counter()
+        response = await original(transport, request)
+        await response.aread()
+        _record_httpx(method, url, body, response, time.perf_counter() - start)
+        return response
+
+    return handle_async_request
+
+
+# ── installation ───────────────────────────────────────────────────────────────
+
+def _targets():
+    """(owner, attribute, patch factory) for every transport we hook."""
+    targets = [
+        (requests.adapters.HTTPAdapter, "send", lambda original: _patched_send(requests, original)),
+        (httpx.HTTPTransport, "handle_request", _patched_handle_request),
+        (httpx.AsyncHTTPTransport, "handle_async_request", _patched_handle_async_request),
+    ]
+    try:
+        import niquests
+    except ImportError:
+        pass
+    else:
+        targets.append((niquests.adapters.HTTPAdapter, "send", lambda original: _patched_send(niquests, original)))
+    return targets
+
+
+def install(mode, directory=CASSETTE_DIR, latency_scale=1.0):
+    """Start recording to, or replaying from, the cassette in `directory`."""
+    global _active
+    mode = mode.upper()
+    if mode not in (RECORD, REPLAY):
+        raise ValueError(f"Unknown HTTP cassette mode '{mode}'; expected {RECORD} or {REPLAY}.")
+    with _install_lock:
+        if not _originals:
+            for owner, attribute, factory in _targets():
+                original = getattr(owner, attribute)
+                _originals[(owner, attribute)] = original
+                setattr(owner, attribute, factory(original))
+        _active = Cassette(directory, mode, latency_scale)
+    logging.info(f"HTTP cassette: {mode.lower()} mode, directory '{directory}'.")
+    return _active
+
+
+def uninstall():
+    """Stop recording or replaying and restore the real transports."""
+    global _active
+    with _install_lock:
+        _active = None
+        for (owner, attribute), original in _originals.items():
+            setattr(owner, attribute, original)
+        _originals.clear()
+
+
+@contextmanager
+def cassette(mode, directory=CASSETTE_DIR, latency_scale=1.0):
+    """install() for the duration of a with-block."""
+    active = install(mode, directory, latency_scale)
+    try:
+        yield active
+    finally:
+        uninstall()
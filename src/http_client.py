@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+import requests
+
+import circuit_breaker
+import request_budget
+
+# Shared HTTP path for upstream providers.  get_with_retry() is the blocking
+# client used by the threaded pipeline; async_get_with_retry() is the same
+# retry policy on top of an httpx.AsyncClient for the asyncio engine.  Both
+# honour the per-build budget from request_budget when one is set, and every
+# attempt goes through the host's circuit breaker.
+
+_HTTP_TIMEOUT_SECONDS = 10
+_HTTP_INITIAL_RETRY_DELAY_SECONDS = 10
+_HTTP_MAX_RETRY_DELAY_SECONDS = 60
+_HTTP_MAX_ELAPSED_SECONDS = 300  # give up after 5 minutes total
+_TRANSIENT_HTTP_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# An attempt isn't worth starting with less of the build budget left than this.
+_HTTP_MIN_ATTEMPT_SECONDS = 2
+
+
+class RequestBudgetExhausted(requests.exceptions.Timeout):
+    """Raised instead of making a request when the build's budget has run out."""
+
+
+def _budget_limit(url, start_time, max_elapsed_seconds):
+    """
+    The elapsed cap for this call: `max_elapsed_seconds`, lowered to what is
+    left of the build budget.  Returns (limit, limited_by_budget).  Raises
+    RequestBudgetExhausted when not even one attempt fits any more.
+    """
+    remaining = request_budget.remaining()
+    if remaining is None:
+        return max_elapsed_seconds, False
+    if remaining < _HTTP_MIN_ATTEMPT_SECONDS:
+        request_budget.record_cut_short(url, "skipped, budget exhausted")
+        raise RequestBudgetExhausted(f"Request budget exhausted before '{url}'")
+    elapsed = time.monotonic() - start_time
+    if elapsed + remaining < max_elapsed_seconds:
+        return elapsed + remaining, True
+    return max_elapsed_seconds, False
+
+
+def _attempt_timeout(timeout):
+    """Per-attempt timeout, shortened so an attempt can't outlive the build budget."""
+    remaining = request_budget.remaining()
+    return timeout if remaining is None else min(timeout, remaining)
+
+
+def _give_up_on_retry(url, start_time, sleep_time, limit, limited_by_budget, last_exc):
+    """
+    Decide whether to stop retrying.  Besides running out of time, a retry
+    is skipped when the budget would leave less than one minimal attempt
+    after the back-off sleep.
+    """
+    left_after_sleep = limit - (time.monotonic() - start_time) - max(sleep_time, 0)
+    if sleep_time > 0 and not (limited_by_budget and left_after_sleep < _HTTP_MIN_ATTEMPT_SECONDS):
+        return False
+    if limited_by_budget:
+        request_budget.record_cut_short(url, f"retry skipped after: {last_exc}")
+    logging.error(
+        f"Giving up on '{url}' after {time.monotonic() - start_time:.0f}s "
+        f"({limit:.0f}s limit). Last error: {last_exc}"
+    )
+    return True
+
+
+def _next_sleep(delay, start_time, max_retry_delay, max_elapsed_seconds):
+    """
+    Return how long to sleep before the next attempt: the current delay with
+    ±20 % jitter, capped at `max_retry_delay` and at the time left before
+    `max_elapsed_seconds`.  A result <= 0 means the caller should give up.
+    """
+    # Jitter: ±20 % of current delay
+    jitter = delay * 0.2 * (2 * random.random() - 1)
+    sleep_time = min(delay + jitter, max_retry_delay)
+
+    # Don't sleep past the overall deadline
+    remaining = max_elapsed_seconds - (time.monotonic() - start_time)
+    return min(sleep_time, remaining)
+
+
+def get_with_retry(
+    url,
+    headers=None,
+    timeout=_HTTP_TIMEOUT_SECONDS,
+    initial_retry_delay=_HTTP_INITIAL_RETRY_DELAY_SECONDS,
+    max_retry_delay=_HTTP_MAX_RETRY_DELAY_SECONDS,
+    max_elapsed_seconds=_HTTP_MAX_ELAPSED_SECONDS,
+    stream=False,
+):
+    """
+    Run an HTTP GET with exponential backoff + jitter on transient failures.
+
+    Retries on timeouts, connection errors, and 408/429/5xx responses.
+    Fails fast on non-transient HTTP errors (e.g. 400, 404).
+
+    The delay sequence starts at `initial_retry_delay`, doubles each attempt,
+    caps at `max_retry_delay`, and adds ±20 % jitter to spread concurrent
+    callers.  Gives up entirely once `max_elapsed_seconds` have passed since
+    the first attempt.
+
+    With `stream=True` the body is not downloaded up front: the caller reads
+    it from `response.raw` and must close the response.
+
+    Inside a request_budget() block the timeout, the sleeps and the elapsed
+    cap are all shortened to what is left of the budget; retries that no
+    longer fit, and requests started after it has run out, are skipped and
+    recorded on the budget.
+
+    Each attempt first checks the host's circuit breaker and reports its
+    outcome to it; once the breaker is open, CircuitOpenError (a
+    ConnectionError) is raised without contacting the host.
+    """
+    start_time = time.monotonic()
+    delay = initial_retry_delay
+    last_exc = None
+
+    while True:
+        limit, limited_by_budget = _budget_limit(url, start_time, max_elapsed_seconds)
+        elapsed = time.monotonic() - start_time
+        if last_exc is not None and elapsed >= limit:
+            if limited_by_budget:
+                request_budget.record_cut_short(url, f"retry skipped after: {last_exc}")
+            logging.error(
+                f"Giving up on '{url}' after {elapsed:.0f}s ({limit:.0f}s limit). "
+                f"Last error: {last_exc}"
+            )
+            raise last_exc
+
+        circuit_breaker.check(url)
+        try:
+            response = requests.get(url, headers=headers, timeout=_attempt_timeout(timeout), stream=stream)
+            response.raise_for_status()
+            circuit_breaker.record_success(url)
+            return response
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code is None or status_code in _TRANSIENT_HTTP_STATUS_CODES:
+                last_exc = e
+                circuit_breaker.record_failure(url)
+            else:
+                circuit_breaker.record_success(url)
+                raise
+        except (
+            requests.exceptions.Timeout,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            last_exc = e
+            circuit_breaker.record_failure(url)
+
+        sleep_time = _next_sleep(delay, start_time, max_retry_delay, limit)
+        if _give_up_on_retry(url, start_time, sleep_time, limit, limited_by_budget, last_exc):
+            raise last_exc
+
+        logging.warning(
+            f"Transient error for '{url}'. "
+            f"Retrying in {sleep_time:.1f}s (elapsed {time.monotonic() - start_time:.0f}s / "
+            f"{limit:.0f}s). Last error: {last_exc}"
+        )
+        time.sleep(sleep_time)
+        delay = min(delay * 2, max_retry_delay)
+
+
+async def async_get_with_retry(
+    client,
+    url,
+    headers=None,
+    timeout=_HTTP_TIMEOUT_SECONDS,
+    initial_retry_delay=_HTTP_INITIAL_RETRY_DELAY_SECONDS,
+    max_retry_delay=_HTTP_MAX_RETRY_DELAY_SECONDS,
+    max_elapsed_seconds=_HTTP_MAX_ELAPSED_SECONDS,
+):
+    """
+    Coroutine counterpart of get_with_retry() for an httpx.AsyncClient.
+
+    Same retry policy and request budget; waiting between attempts yields
+    to the event loop so other providers keep making progress.  Returns the
+    httpx.Response.
+    """
+    start_time = time.monotonic()
+    delay = initial_retry_delay
+    last_exc = None
+
+    while True:
+        limit, limited_by_budget = _budget_limit(url, start_time, max_elapsed_seconds)
+        elapsed = time.monotonic() - start_time
+        if last_exc is not None and elapsed >= limit:
+            if limited_by_budget:
+                request_budget.record_cut_short(url, f"retry skipped after: {last_exc}")
+            logging.error(
+                f"Giving up on '{url}' after {elapsed:.0f}s ({limit:.0f}s limit). "
+                f"Last error: {last_exc}"
+            )
+            raise last_exc
+
+        circuit_breaker.check(url)
+        try:
+            response = await client.get(
+                url, headers=headers, timeout=_attempt_timeout(timeout), follow_redirects=True
+            )
+            if response.is_error:
+                # Like requests, only 4xx/5xx are errors (304 Not Modified is not)
+                response.raise_for_status()
+            circuit_breaker.record_success(url)
+            return response
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in _TRANSIENT_HTTP_STATUS_CODES:
+                last_exc = e
+                circuit_breaker.record_failure(url)
+            else:
+                circuit_breaker.record_success(url)
+                raise
+        except httpx.TransportError as e:
+            # Timeouts, connection errors and dropped bodies
+            last_exc = e
+            circuit_breaker.record_failure(url)
+
+        sleep_time = _next_sleep(delay, start_time, max_retry_delay, limit)
+        if _give_up_on_retry(url, start_time, sleep_time, limit, limited_by_budget, last_exc):
+            raise last_exc
+
+        logging.warning(
+            f"Transient error for '{url}'. "
+            f"Retrying in {sleep_time:.1f}s (elapsed {time.monotonic() - start_time:.0f}s / "
+            f"{limit:.0f}s). Last error: {last_exc}"
+        )
+        await asyncio.sleep(sleep_time)
+        delay = min(delay * 2, max_retry_delay)
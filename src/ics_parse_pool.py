@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import get_ical_events
+from calendar_event import Event
+
+# Optional worker processes for parsing large iCalendar feeds.
+#
+# parse_icalendar() (icalendar plus dateutil RRULE expansion) is pure-Python
+# CPU work, so feeds that are downloaded side by side are still parsed one
+# at a time under the GIL.  With configure(n) > 0, feeds of at least
+# _IN_PROCESS_BYTES are parsed in a pool of n processes instead: the raw
+# bytes go in and each occurrence comes back as a flat tuple (text as str
+# rather than icalendar's vText), which pickles small.  Smaller feeds are
+# cheaper to parse than to ship across, and stay in-process.
+#
+# The pool is started on first use, when the scheduler and web server
+# threads are already running, so workers come from a "forkserver" rather
+# than a fork of this (threaded) process.  The fork server preloads this
+# module instead of main.py, so workers never run the app's start-up code.
+# If the pool breaks, that feed is parsed in-process and a new pool is
+# started for the next one; a result that cannot be pickled is likewise
+# parsed in-process.
+_IN_PROCESS_BYTES = 32 * 1024
+
+_TEXT_FIELDS = {"location", "uid"}
+
+_lock = threading.Lock()
+_executor = None
+_workers = 0
+
+
+def configure(workers):
+    """Parse large feeds in `workers` processes (started on first use); 0 parses everything in-process."""
+    global _workers
+    shutdown()
+    with _lock:
+        _workers = max(0, int(workers))
+    if _workers:
+        logging.info(f"Parsing large calendar feeds in {_workers} worker processes.")
+
+
+def _start():
+    """Start the pool; called with _lock held."""
+    global _executor
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    _executor = ProcessPoolExecutor(max_workers=_workers, mp_context=context)
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _decoded(data, encoding):
+    if isinstance(data, (bytes, bytearray)):
+        return data.decode(encoding, errors="replace")
+    return data
+
+
+def _compact(event):
+    """An Event as a tuple in Event.FIELDS order."""
+    values = []
+    for field in Event.FIELDS:
+        value = getattr(event, field)
+        values.append(str(value) if field in _TEXT_FIELDS and value is not None else value)
+    return tuple(values)
+
+
+def _parse_compact(data, encoding):
+    """Worker side: parse a feed into one tuple per occurrence."""
+    return [_compact(event) for event in get_ical_events.parse_icalendar(_decoded(data, encoding))]
+
+
+def _expand(rows):
+    return [Event(*row) for row in rows]
+
+
+def _submit(data, encoding):
+    """A future for parsing `data` in the pool, or None to parse it in-process."""
+    global _executor
+    if not data or len(data) < _IN_PROCESS_BYTES:
+        return None
+    with _lock:
+        if not _workers:
+            return None
+        try:
+            if _executor is None:
+                _start()
+            return _executor.submit(_parse_compact, data, encoding)
+        except (BrokenProcessPool, RuntimeError, OSError) as e:
+            logging.warning(f"Calendar parse pool unavailable, parsing in-process: {e}")
+            _executor = None  # started again for the next feed
+            return None
+
+
+def _pool_failed(e):
+    global _executor
+    logging.warning(f"Calendar feed could not be parsed in a worker process, parsing in-process: {e}")
+    if isinstance(e, BrokenProcessPool):
+        with _lock:
+            broken, _executor = _executor, None  # started again for the next feed
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_feed(data, encoding="utf-8"):
+    """parse_icalendar() of a feed given as bytes or str, in a worker process if it is large."""
+    future = _submit(data, encoding)
+    if future is not None:
+        try:
+            return _expand(future.result())
+        except Exception as e:
+            _pool_failed(e)
+    return get_ical_events.parse_icalendar(_decoded(data, encoding))
+
+
+async def parse_feed_async(data, encoding="utf-8"):
+    """Coroutine counterpart of parse_feed(); the event loop keeps running while a worker parses."""
+    future = _submit(data, encoding)
+    if future is not None:
+        try:
+            return _expand(await asyncio.wrap_future(future))
+        except Exception as e:
+            _pool_failed(e)
+    return get_ical_events.parse_icalendar(_decoded(data, encoding))
@@ -0,0 +1,231 @@
+import codecs
+import io
+from datetime import date, timedelta
+
+# Streaming pre-filter for large iCalendar feeds.
+#
+# Calendar.from_ical() materialises every component of a feed, so a feed
+# holding years of past events is fully parsed just to find today's few.
+# ICSScanner instead unfolds content lines as the bytes arrive, buffers one
+# VEVENT at a time and decides from its raw DTSTART / DTEND / RRULE /
+# RECURRENCE-ID values whether it can touch the window.  Only candidate
+# events, and the VTIMEZONEs they reference, are passed on to the real
+# parser as a much smaller calendar.
+#
+# Dates are compared on their YYYYMMDD part with a day of slack either side,
+# which covers any UTC offset without resolving time zones here.  The
+# decision errs towards keeping an event: anything it cannot read is kept.
+# Recurring series that cannot occur in the window are held back (not
+# parsed) until the end of the feed, in case one of their overrides moves
+# an occurrence into the window; they are the only out-of-window
+# components kept in memory.
+
+_SLACK = timedelta(days=1)
+_CHUNK_SIZE = 64 * 1024
+
+
+def _split_property(line):
+    """(NAME, {PARAM: value}, value) of an unfolded content line."""
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        head, value = line, ""
+    name, *params = head.split(";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+
+def _day(value):
+    """The calendar date of a DATE / DATE-TIME value, or None if unreadable."""
+    try:
+        return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    except (ValueError, IndexError):
+        return None
+
+
+def _until_day(rrule):
+    for part in rrule.split(";"):
+        key, _, value = part.partition("=")
+        if key.upper() == "UNTIL":
+            return _day(value)
+    return None
+
+
+class _Component:
+    """The raw lines of one VEVENT plus the properties the scanner looks at."""
+
+    def __init__(self):
+        self.lines = ["BEGIN:VEVENT"]
+        self.properties = {}
+        self.tzids = set()
+        self.depth = 0  # nested components (VALARM)
+
+    def add(self, name, parameters, value):
+        if self.depth == 0:
+            self.properties.setdefault(name, value)
+        if "TZID" in parameters:
+            self.tzids.add(parameters["TZID"])
+
+
+class ICSScanner:
+    """
+    Incremental iCalendar filter.  feed() it the feed as bytes (or str) in
+    chunks of any size, then close() returns a calendar containing only the
+    VEVENTs that may fall between `first_day` and `last_day` (inclusive).
+    """
+
+    def __init__(self, first_day, last_day=None, encoding="utf-8"):
+        self.low = first_day - _SLACK
+        self.high = (last_day or first_day) + _SLACK
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._partial = ""
+        self._pending = None
+        self._header = []
+        self._timezones = {}  # TZID -> lines
+        self._timezone = None  # lines of the VTIMEZONE being read
+        self._skip_depth = 0  # inside a component we do not keep
+        self._event = None
+        self._candidates = []
+        self._needed_uids = set()
+        self._dormant = {}  # UID -> series that cannot occur in the window by itself
+        self.scanned = 0  # VEVENTs read
+        self.kept = 0  # VEVENTs passed on, set by close()
+
+    # ── input ──────────────────────────────────────────────────────────────────
+
+    def feed(self, data):
+        if isinstance(data, (bytes, bytearray)):
+            data = self._decoder.decode(data)
+        lines = (self._partial + data).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._physical_line(line)
+
+    def close(self):
+        """Finish the feed and return the filtered calendar text."""
+        self.feed(self._decoder.decode(b"", final=True))
+        if self._partial:
+            self._physical_line(self._partial)
+            self._partial = ""
+        if self._pending is not None:
+            self._logical_line(self._pending)
+            self._pending = None
+        return self._calendar()
+
+    def _physical_line(self, line):
+        line = line.rstrip("\r")
+        if line[:1] in (" ", "\t"):
+            if self._pending is not None:
+                self._pending += line[1:]
+            return
+        if self._pending is not None:
+            self._logical_line(self._pending)
+        self._pending = line if line else None
+
+    # ── components ─────────────────────────────────────────────────────────────
+
+    def _logical_line(self, line):
+        name, parameters, value = _split_property(line)
+        event = self._event
+        if event is not None:
+            event.lines.append(line)
+            if name == "BEGIN":
+                event.depth += 1
+            elif name == "END" and event.depth:
+                event.depth -= 1
+            elif name == "END":
+                self._event = None
+                self._finish_event(event)
+            else:
+                event.add(name, parameters, value)
+        elif self._timezone is not None:
+            self._timezone.append(line)
+            if name == "END" and value.upper() == "VTIMEZONE":
+                lines, self._timezone = self._timezone, None
+                tzid = next((_split_property(l)[2] for l in lines if l.upper().startswith("TZID")), None)
+                if tzid:
+                    self._timezones[tzid] = lines
+        elif self._skip_depth:
+            if name == "BEGIN":
+                self._skip_depth += 1
+            elif name == "END":
+                self._skip_depth -= 1
+        elif name == "BEGIN" and value.upper() == "VEVENT":
+            self._event = _Component()
+        elif name == "BEGIN" and value.upper() == "VTIMEZONE":
+            self._timezone = [line]
+        elif name == "BEGIN" and value.upper() != "VCALENDAR":
+            self._skip_depth = 1  # VTODO, VJOURNAL, ...: never parsed
+        elif name not in ("BEGIN", "END"):
+            self._header.append(line)
+
+    def _finish_event(self, event):
+        self.scanned += 1
+        properties = event.properties
+        uid = properties.get("UID")
+        start = _day(properties.get("DTSTART", ""))
+
+        if "RECURRENCE-ID" in properties:
+            # An override matters if it moves an occurrence into or out of the window
+            replaced = _day(properties["RECURRENCE-ID"])
+            if self._overlaps(replaced, replaced) or self._overlaps(start, _day(properties.get("DTEND", ""))):
+                self._candidates.append(event)
+                self._needed_uids.add(uid)
+            return
+
+        if "DTSTART" not in properties or "DTEND" not in properties:
+            return  # parse_icalendar() skips events without both
+
+        if "RRULE" in properties:
+            until = _until_day(properties["RRULE"])
+            if (start is not None and start > self.high) or (until is not None and until < self.low):
+                self._dormant[uid] = event
+            else:
+                self._candidates.append(event)
+            return
+
+        if self._overlaps(start, _day(properties["DTEND"])):
+            self._candidates.append(event)
+
+    def _overlaps(self, start, end):
+        if start is None or end is None:
+            return True
+        return start <= self.high and end >= self.low
+
+    # ── output ─────────────────────────────────────────────────────────────────
+
+    def _calendar(self):
+        events = self._candidates + [
+            event for uid, event in self._dormant.items() if uid in self._needed_uids
+        ]
+        tzids = set().union(*(event.tzids for event in events))
+        lines = ["BEGIN:VCALENDAR", *self._header]
+        for tzid in sorted(tzids & self._timezones.keys()):
+            lines.extend(self._timezones[tzid])
+        for event in events:
+            lines.extend(event.lines)
+        lines.append("END:VCALENDAR")
+        self.kept = len(events)
+        return "\r\n".join(lines) + "\r\n"
+
+
+def scan_calendar(source, first_day, last_day=None, encoding="utf-8"):
+    """
+    Filter a feed given as str, bytes or a binary file-like object (e.g. a
+    streamed HTTP response body) down to the events that may fall between
+    `first_day` and `last_day`; see ICSScanner.
+    """
+    scanner = ICSScanner(first_day, last_day, encoding)
+    if isinstance(source, (str, bytes, bytearray)):
+        source = io.StringIO(source) if isinstance(source, str) else io.BytesIO(source)
+    while chunk := source.read(_CHUNK_SIZE):
+        scanner.feed(chunk)
+    return scanner.close()
@@ -20,7 +20,14 @@ from flask.logging import default_handler
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from get_cal_data import get_cal_data
+import http_cassette
+import ics_parse_pool
+import nws_cache
+from async_engine import run_digests
+from circuit_breaker import breaker_status
+from forecast_cache import grid_degrees
+from generate_summary import start_summary
+from get_cal_data import DEFAULT_PRECEDENCE, get_cal_data
 from get_caldav_events import list_caldav_calendars
 from get_coordinates import get_coordinates
 from get_date import get_current_date_in_timezone
@@ -31,13 +38,16 @@ from get_rss import get_rss
 from get_timezone import get_timezone
 from get_todo_tasks import get_todo_tasks
 from get_wotd import get_wotd
-from send_email import send_email
+from outbox import OUTBOX_DIR, deliver_pending, outbox_status
+from request_budget import request_budget
+from send_email import send_email, summary_input_text
 
 
 def ensure_directories_and_files_exist():
     """Ensure required directories and files exist."""
     os.makedirs("./data", exist_ok=True)
     os.makedirs("./cache", exist_ok=True)
+    os.makedirs(OUTBOX_DIR, exist_ok=True)
     if not os.path.exists(CONFIG_FILE_PATH):
         with open(CONFIG_FILE_PATH, "w") as f:
             json.dump({}, f)
@@ -107,6 +117,8 @@ def initialize_config():
         "VIKUNJA_BASE_URL",
         "WEBCAL_LINKS",
         "CALDAV_ACCOUNTS",
+        "CALENDAR_INDEX",
+        "CALENDAR_PRECEDENCE",
         "RSS_LINKS",
         "PUZZLES",
         "PUZZLES_ANSWERS",
@@ -117,6 +129,10 @@ def initialize_config():
         "MINUTE",
         "LOGGING_LEVEL",
         "DISABLE_SCHEDULE",
+        "EXECUTION_MODE",
+        "FORECAST_CACHE_GRID",
+        "FORECAST_OUTLOOK",
+        "WEATHER_ALERTS_MODE",
     ]
 
     existing_config = load_config_from_json()
@@ -153,7 +169,8 @@ def refresh_configuration_variables():
     global LATITUDE, LONGITUDE, ADDRESS, WEATHER, TODOIST_API_KEY, VIKUNJA_API_KEY
     global VIKUNJA_BASE_URL, WEBCAL_LINKS, CALDAV_ACCOUNTS, RSS_LINKS, PUZZLES, PUZZLES_ANSWERS, WOTD, QOTD
     global TIMEZONE, HOUR, MINUTE, LOGGING_LEVEL, timezone, scheduler, DISABLE_SCHEDULE
-    global city_state_str, country_code
+    global city_state_str, country_code, EXECUTION_MODE, FORECAST_CACHE_GRID, FORECAST_OUTLOOK
+    global WEATHER_ALERTS_MODE, CALENDAR_INDEX, CALENDAR_PRECEDENCE
 
     # Keep old values to detect changes
     logging_level_old = LOGGING_LEVEL
@@ -186,6 +203,8 @@ def refresh_configuration_variables():
     VIKUNJA_BASE_URL = config.get("VIKUNJA_BASE_URL")
     WEBCAL_LINKS = config.get("WEBCAL_LINKS")
     CALDAV_ACCOUNTS = config.get("CALDAV_ACCOUNTS")
+    CALENDAR_INDEX = config.get("CALENDAR_INDEX") or "False"
+    CALENDAR_PRECEDENCE = config.get("CALENDAR_PRECEDENCE") or DEFAULT_PRECEDENCE
     RSS_LINKS = config.get("RSS_LINKS", "False")
     PUZZLES = config.get("PUZZLES", "False")
     PUZZLES_ANSWERS = config.get("PUZZLES_ANSWERS", "False")
@@ -196,6 +215,10 @@ def refresh_configuration_variables():
     MINUTE = config.get("MINUTE")
     LOGGING_LEVEL = config.get("LOGGING_LEVEL", "INFO").upper()
     DISABLE_SCHEDULE = config.get("DISABLE_SCHEDULE", "False")
+    EXECUTION_MODE = (config.get("EXECUTION_MODE") or "THREADED").upper()
+    FORECAST_CACHE_GRID = grid_degrees(config.get("FORECAST_CACHE_GRID"))
+    FORECAST_OUTLOOK = config.get("FORECAST_OUTLOOK", "")
+    WEATHER_ALERTS_MODE = (config.get("WEATHER_ALERTS_MODE") or "FULL").upper()
 
     new_lat = float(LATITUDE) if LATITUDE not in [None, ""] else None
     new_lng = float(LONGITUDE) if LONGITUDE not in [None, ""] else None
@@ -358,7 +381,8 @@ def change_logging_level():
 def get_weather():
     if WEATHER in ["True", "true", True]:
         weather = get_forecast(
-            LATITUDE, LONGITUDE, country_code, city_state_str, UNIT_SYSTEM, TIME_SYSTEM, timezone
+            LATITUDE, LONGITUDE, country_code, city_state_str, UNIT_SYSTEM, TIME_SYSTEM, timezone,
+            VERSION, FORECAST_CACHE_GRID, FORECAST_OUTLOOK, WEATHER_ALERTS_MODE
         )
         logging.debug("Weather data obtained.")
         logging.debug(f"Weather data: {weather}")
@@ -412,59 +436,122 @@ def get_puzzles_of_the_day():
     return "", ""
 
 
+def start_summary_if_enabled(weather_string, todo_plain_string, calendar_events):
+    """
+    Start the AI summary in the background as soon as its inputs are ready,
+    so it overlaps with fetching the remaining sections.  Returns the Future,
+    or None when summaries are disabled.
+    """
+    if OPENAI_API_KEY is not None and ENABLE_SUMMARY in ["True", "true", True]:
+        return start_summary(summary_input_text(weather_string, todo_plain_string, calendar_events), OPENAI_API_KEY)
+    return None
+
+
+def _digest_settings(latitude, longitude, country, city_state, tz):
+    """Snapshot the current configuration as a settings dict for the async engine."""
+    return {
+        "VERSION": VERSION,
+        "timezone": tz,
+        "RECIPIENT_EMAIL": RECIPIENT_EMAIL,
+        "RECIPIENT_NAME": RECIPIENT_NAME,
+        "SENDER_EMAIL": SENDER_EMAIL,
+        "SMTP_USERNAME": SMTP_USERNAME,
+        "SMTP_PASSWORD": SMTP_PASSWORD,
+        "SMTP_HOST": SMTP_HOST,
+        "SMTP_PORT": SMTP_PORT,
+        "OPENAI_API_KEY": OPENAI_API_KEY,
+        "ENABLE_SUMMARY": ENABLE_SUMMARY,
+        "ENABLE_EMOJIS": ENABLE_EMOJIS,
+        "UNIT_SYSTEM": UNIT_SYSTEM,
+        "TIME_SYSTEM": TIME_SYSTEM,
+        "LATITUDE": latitude,
+        "LONGITUDE": longitude,
+        "country_code": country,
+        "city_state_str": city_state,
+        "WEATHER": WEATHER,
+        "FORECAST_CACHE_GRID": FORECAST_CACHE_GRID,
+        "FORECAST_OUTLOOK": FORECAST_OUTLOOK,
+        "WEATHER_ALERTS_MODE": WEATHER_ALERTS_MODE,
+        "TODOIST_API_KEY": TODOIST_API_KEY,
+        "VIKUNJA_API_KEY": VIKUNJA_API_KEY,
+        "VIKUNJA_BASE_URL": VIKUNJA_BASE_URL,
+        "WEBCAL_LINKS": WEBCAL_LINKS,
+        "CALDAV_ACCOUNTS": CALDAV_ACCOUNTS,
+        "CALENDAR_INDEX": CALENDAR_INDEX in ["True", "true", True],
+        "CALENDAR_PRECEDENCE": CALENDAR_PRECEDENCE,
+        "RSS_LINKS": RSS_LINKS if RSS_LINKS not in ["False", "false", False] else None,
+        "PUZZLES": PUZZLES,
+        "PUZZLES_ANSWERS": PUZZLES_ANSWERS,
+        "WOTD": WOTD,
+        "QOTD": QOTD,
+    }
+
+
 def prepare_send_email():
     """Gather all content and send the daily summary email."""
     try:
         logging.debug("prepare_send_email called.")
 
-        date_string = get_current_date_in_timezone(timezone)
-        logging.debug("Date string obtained.")
-
-        weather_string = get_weather() or ""
-        logging.debug("Weather string obtained.")
-
-        todo_html_string, todo_plain_string = get_todo()
-        logging.debug("Todo string obtained.")
-
-        calendar_events = get_cal_data(WEBCAL_LINKS, timezone, TIME_SYSTEM, CALDAV_ACCOUNTS)
-        logging.debug("Calendar events obtained.")
-
-        rss_string = get_rss_feed() or ""
-        logging.debug("RSS string obtained.")
-
-        wotd_string = get_word_of_the_day() or ""
-        logging.debug("Word of the Day string obtained.")
-
-        quote_string = get_quote_of_the_day() or ""
-        logging.debug("Quote of the Day string obtained.")
-
-        puzzles_string, puzzles_ans_string = get_puzzles_of_the_day() or ("", "")
-        logging.debug("Puzzles strings obtained.")
-
-        send_email(
-            VERSION,
-            timezone,
-            RECIPIENT_EMAIL,
-            RECIPIENT_NAME,
-            SENDER_EMAIL,
-            SMTP_USERNAME,
-            SMTP_PASSWORD,
-            SMTP_HOST,
-            SMTP_PORT,
-            OPENAI_API_KEY,
-            ENABLE_SUMMARY,
-            ENABLE_EMOJIS,
-            date_string,
-            weather_string,
-            todo_html_string,
-            todo_plain_string,
-            calendar_events,
-            rss_string,
-            puzzles_string,
-            wotd_string,
-            quote_string,
-            puzzles_ans_string,
-        )
+        if EXECUTION_MODE == "ASYNC":
+            run_digests([_digest_settings(LATITUDE, LONGITUDE, country_code, city_state_str, timezone)])
+            return
+
+        with request_budget(), nws_cache.digest_alerts(RECIPIENT_EMAIL) as shown_alerts:
+            date_string = get_current_date_in_timezone(timezone)
+            logging.debug("Date string obtained.")
+
+            weather_string = get_weather() or ""
+            logging.debug("Weather string obtained.")
+
+            todo_html_string, todo_plain_string = get_todo()
+            logging.debug("Todo string obtained.")
+
+            calendar_events = get_cal_data(
+                WEBCAL_LINKS, timezone, TIME_SYSTEM, CALDAV_ACCOUNTS, CALENDAR_INDEX in ["True", "true", True],
+                CALENDAR_PRECEDENCE,
+            )
+            logging.debug("Calendar events obtained.")
+
+            summary = start_summary_if_enabled(weather_string, todo_plain_string, calendar_events)
+
+            rss_string = get_rss_feed() or ""
+            logging.debug("RSS string obtained.")
+
+            wotd_string = get_word_of_the_day() or ""
+            logging.debug("Word of the Day string obtained.")
+
+            quote_string = get_quote_of_the_day() or ""
+            logging.debug("Quote of the Day string obtained.")
+
+            puzzles_string, puzzles_ans_string = get_puzzles_of_the_day() or ("", "")
+            logging.debug("Puzzles strings obtained.")
+
+            send_email(
+                VERSION,
+                timezone,
+                RECIPIENT_EMAIL,
+                RECIPIENT_NAME,
+                SENDER_EMAIL,
+                SMTP_USERNAME,
+                SMTP_PASSWORD,
+                SMTP_HOST,
+                SMTP_PORT,
+                OPENAI_API_KEY,
+                ENABLE_SUMMARY,
+                ENABLE_EMOJIS,
+                date_string,
+                weather_string,
+                todo_html_string,
+                todo_plain_string,
+                calendar_events,
+                rss_string,
+                puzzles_string,
+                wotd_string,
+                quote_string,
+                puzzles_ans_string,
+                summary=summary,
+            )
+            shown_alerts.commit()
 
     except Exception as e:
         logging.critical(f"Error sending email: {e}")
@@ -494,60 +581,75 @@ def prepare_send_email_with_location(lat, lng):
             logging.warning(f"Could not derive timezone for provided location: {e}. Using configured timezone.")
             loc_timezone = timezone
 
-        date_string = get_current_date_in_timezone(loc_timezone)
-        logging.debug("Date string obtained.")
-
-        if WEATHER in ["True", "true", True]:
-            weather_string = get_forecast(
-                resolved_lat, resolved_lng, resolved_country, resolved_city_state,
-                UNIT_SYSTEM, TIME_SYSTEM, loc_timezone
-            ) or ""
-        else:
-            weather_string = ""
-        logging.debug("Weather string obtained.")
-
-        todo_html_string, todo_plain_string = get_todo()
-        logging.debug("Todo string obtained.")
-
-        calendar_events = get_cal_data(WEBCAL_LINKS, loc_timezone, TIME_SYSTEM, CALDAV_ACCOUNTS)
-        logging.debug("Calendar events obtained.")
-
-        rss_string = get_rss_feed() or ""
-        logging.debug("RSS string obtained.")
-
-        wotd_string = get_word_of_the_day() or ""
-        logging.debug("Word of the Day string obtained.")
-
-        quote_string = get_quote_of_the_day() or ""
-        logging.debug("Quote of the Day string obtained.")
-
-        puzzles_string, puzzles_ans_string = get_puzzles_of_the_day() or ("", "")
-        logging.debug("Puzzles strings obtained.")
-
-        send_email(
-            VERSION,
-            loc_timezone,
-            RECIPIENT_EMAIL,
-            RECIPIENT_NAME,
-            SENDER_EMAIL,
-            SMTP_USERNAME,
-            SMTP_PASSWORD,
-            SMTP_HOST,
-            SMTP_PORT,
-            OPENAI_API_KEY,
-            ENABLE_SUMMARY,
-            ENABLE_EMOJIS,
-            date_string,
-            weather_string,
-            todo_html_string,
-            todo_plain_string,
-            calendar_events,
-            rss_string,
-            puzzles_string,
-            wotd_string,
-            quote_string,
-            puzzles_ans_string,
-        )
+        if EXECUTION_MODE == "ASYNC":
+            run_digests([
+                _digest_settings(resolved_lat, resolved_lng, resolved_country, resolved_city_state, loc_timezone)
+            ])
+            return
+
+        with request_budget(), nws_cache.digest_alerts(RECIPIENT_EMAIL) as shown_alerts:
+            date_string = get_current_date_in_timezone(loc_timezone)
+            logging.debug("Date string obtained.")
+
+            if WEATHER in ["True", "true", True]:
+                weather_string = get_forecast(
+                    resolved_lat, resolved_lng, resolved_country, resolved_city_state,
+                    UNIT_SYSTEM, TIME_SYSTEM, loc_timezone, VERSION, FORECAST_CACHE_GRID, FORECAST_OUTLOOK,
+                    WEATHER_ALERTS_MODE,
+                ) or ""
+            else:
+                weather_string = ""
+            logging.debug("Weather string obtained.")
+
+            todo_html_string, todo_plain_string = get_todo()
+            logging.debug("Todo string obtained.")
+
+            calendar_events = get_cal_data(
+                WEBCAL_LINKS, loc_timezone, TIME_SYSTEM, CALDAV_ACCOUNTS, CALENDAR_INDEX in ["True", "true", True],
+                CALENDAR_PRECEDENCE,
+            )
+            logging.debug("Calendar events obtained.")
+
+            summary = start_summary_if_enabled(weather_string, todo_plain_string, calendar_events)
+
+            rss_string = get_rss_feed() or ""
+            logging.debug("RSS string obtained.")
+
+            wotd_string = get_word_of_the_day() or ""
+            logging.debug("Word of the Day string obtained.")
+
+            quote_string = get_quote_of_the_day() or ""
+            logging.debug("Quote of the Day string obtained.")
+
+            puzzles_string, puzzles_ans_string = get_puzzles_of_the_day() or ("", "")
+            logging.debug("Puzzles strings obtained.")
+
+            send_email(
+                VERSION,
+                loc_timezone,
+                RECIPIENT_EMAIL,
+                RECIPIENT_NAME,
+                SENDER_EMAIL,
+                SMTP_USERNAME,
+                SMTP_PASSWORD,
+                SMTP_HOST,
+                SMTP_PORT,
+                OPENAI_API_KEY,
+                ENABLE_SUMMARY,
+                ENABLE_EMOJIS,
+                date_string,
+                weather_string,
+                todo_html_string,
+                todo_plain_string,
+                calendar_events,
+                rss_string,
+                puzzles_string,
+                wotd_string,
+                quote_string,
+                puzzles_ans_string,
+                summary=summary,
+            )
+            shown_alerts.commit()
 
     except Exception as e:
         logging.critical(f"Error sending email with location: {e}")
@@ -570,6 +672,15 @@ def scheduled_email_job():
         logging.error(traceback.format_exc())
 
 
+def drain_outbox_job():
+    """Retry delivery of any digests still waiting in the outbox."""
+    try:
+        deliver_pending(SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD)
+    except Exception as e:
+        logging.error(f"Error draining outbox: {e}")
+        logging.error(traceback.format_exc())
+
+
 def reschedule_email_job():
     if DISABLE_SCHEDULE in ["True", "true", True]:
         logging.info("Scheduling is disabled. Skipping reschedule.")
@@ -615,6 +726,7 @@ def get_seconds_until_next_schedule(hour, minute, timezone):
 
 CONFIG_FILE_PATH = "./data/config.json"
 CACHE_FILE_PATH = "./cache/location_cache.json"
+OUTBOX_DRAIN_INTERVAL_SECONDS = 60
 
 app = Flask(__name__, template_folder="../templates", static_folder="../static")
 CORS(app)
@@ -671,6 +783,8 @@ VIKUNJA_API_KEY = get_config_value("VIKUNJA_API_KEY")
 VIKUNJA_BASE_URL = get_config_value("VIKUNJA_BASE_URL")
 WEBCAL_LINKS = get_config_value("WEBCAL_LINKS")
 CALDAV_ACCOUNTS = get_config_value("CALDAV_ACCOUNTS")
+CALENDAR_INDEX = get_config_value("CALENDAR_INDEX") or "False"
+CALENDAR_PRECEDENCE = get_config_value("CALENDAR_PRECEDENCE") or DEFAULT_PRECEDENCE
 RSS_LINKS = get_config_value("RSS_LINKS", "False")
 PUZZLES = get_config_value("PUZZLES", "False")
 PUZZLES_ANSWERS = get_config_value("PUZZLES_ANSWERS", "False")
@@ -681,6 +795,10 @@ HOUR = get_config_value("HOUR")
 MINUTE = get_config_value("MINUTE")
 LOGGING_LEVEL = get_config_value("LOGGING_LEVEL", "INFO").upper()
 DISABLE_SCHEDULE = get_config_value("DISABLE_SCHEDULE", "False")
+EXECUTION_MODE = (get_config_value("EXECUTION_MODE") or "THREADED").upper()
+FORECAST_CACHE_GRID = grid_degrees(get_config_value("FORECAST_CACHE_GRID"))
+FORECAST_OUTLOOK = get_config_value("FORECAST_OUTLOOK", "")
+WEATHER_ALERTS_MODE = (get_config_value("WEATHER_ALERTS_MODE") or "FULL").upper()
 
 API_TOKEN = os.getenv("API_TOKEN")
 
@@ -693,6 +811,20 @@ if LOGGING_LEVEL not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
 logging.basicConfig(level=getattr(logging, LOGGING_LEVEL), force=True)
 logging.info(f"Logging level set to: {LOGGING_LEVEL}")
 
+# Development aid: record every upstream response, or replay a recording
+# offline (see http_cassette.py).  Not exposed in the settings UI.
+HTTP_CASSETTE_MODE = (os.getenv("HTTP_CASSETTE_MODE") or "").upper()
+if HTTP_CASSETTE_MODE:
+    http_cassette.install(
+        HTTP_CASSETTE_MODE,
+        os.getenv("HTTP_CASSETTE_DIR") or http_cassette.CASSETTE_DIR,
+        float(os.getenv("HTTP_CASSETTE_LATENCY_SCALE") or 1),
+    )
+
+# Worker processes for parsing large webcal feeds (see ics_parse_pool.py);
+# started on first use.
+ics_parse_pool.configure(int(os.getenv("ICS_PARSE_PROCESSES") or 0))
+
 # Ensure timezone is correctly loaded
 try:
     if LATITUDE and LONGITUDE:
@@ -814,6 +946,28 @@ def interrupt_schedule():
         return jsonify({"message": f"Failed to interrupt schedule: {e}"}), 500
 
 
+@app.route("/api/outbox", methods=["GET"])
+@login_required
+def api_outbox_status():
+    """Return delivery status for every message in the outbox."""
+    try:
+        return jsonify(outbox_status())
+    except Exception as e:
+        logging.error(f"Error reading outbox: {e}")
+        return jsonify({"error": "Failed to read outbox"}), 500
+
+
+@app.route("/api/circuit-breakers", methods=["GET"])
+@login_required
+def api_circuit_breaker_status():
+    """Return the circuit-breaker state of every upstream host seen so far."""
+    try:
+        return jsonify(breaker_status())
+    except Exception as e:
+        logging.error(f"Error reading circuit breaker state: {e}")
+        return jsonify({"error": "Failed to read circuit breaker state"}), 500
+
+
 @app.route("/api/caldav-calendars", methods=["POST"])
 @login_required
 def api_caldav_calendar_list():
@@ -909,6 +1063,17 @@ if __name__ == "__main__":
     scheduler.start()
     logging.info("Scheduler started.")
 
+    # Background sender for the outbox, independent of DISABLE_SCHEDULE so
+    # API- and UI-triggered digests are retried too.
+    scheduler.add_job(
+        drain_outbox_job,
+        "interval",
+        seconds=OUTBOX_DRAIN_INTERVAL_SECONDS,
+        id="outbox_drain_job",
+        replace_existing=True,
+    )
+    logging.info(f"Outbox sender scheduled every {OUTBOX_DRAIN_INTERVAL_SECONDS}s.")
+
     def run_flask():
         global _waitress_server
         SECRET_KEY = os.getenv("SECRET_KEY")
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+# Per-country cache of parsed MeteoAlarm feeds.
+#
+# A country feed is downloaded and parsed once and then shared by every
+# recipient in that country.  Each entry keeps the feed's ETag and
+# Last-Modified validators so refreshes are conditional GETs (a 304 costs
+# no download or parse), plus an index from lowercase region tokens and
+# CAP area names to item positions so matching a location is usually a
+# handful of dictionary lookups instead of a scan over every item title.
+#
+# Feeds longer than the parser's item cap are cut short, so an entry also
+# records whether it was truncated and which locations' items were kept
+# past the cap: every location that has read the country's feed in this
+# process.  A location the truncated entry does not cover triggers a full
+# (unconditional) download, which then keeps its items as well.
+METEOALARM_CACHE_DIR = "./cache/meteoalarm"
+
+# Serve a feed without revalidating for this long; after that a conditional
+# GET is made (alerts change, so this is kept short).
+_METEOALARM_FRESH_SECONDS = 5 * 60
+
+_entries = {}
+_lock = threading.Lock()
+_slug_locks = {}
+_locations = {}  # slug -> locations that have read the feed
+
+
+def location_tokens(text):
+    """Lowercase words of more than two characters, as used for region matching."""
+    return {w.lower() for w in re.split(r"[\s,;/()]+", text or "") if len(w) > 2}
+
+
+def _item_keys(item):
+    keys = location_tokens(item.get("title"))
+    for area in item.get("areas", []):
+        keys.add(area.lower())
+        keys |= location_tokens(area)
+    return keys
+
+
+def _location_keys(city_state_str):
+    keys = location_tokens(city_state_str)
+    if city_state_str:
+        keys.add(city_state_str.strip().lower())
+    return keys
+
+
+def _title_mentions(item, words):
+    title = (item.get("title") or "").lower()
+    return any(word in title for word in words)
+
+
+def build_index(items):
+    """
+    Map every region token of each item's title, and each full CAP area
+    name, to the positions of the items that mention it.
+    """
+    index = {}
+    for position, item in enumerate(items):
+        for key in _item_keys(item):
+            index.setdefault(key, []).append(position)
+    return index
+
+
+def mentions(item, city_state_str):
+    """Whether one item matches the location the way lookup() would match it."""
+    if not city_state_str:
+        return False
+    return bool(_item_keys(item) & _location_keys(city_state_str)) or _title_mentions(
+        item, location_tokens(city_state_str)
+    )
+
+
+def _normalized(city_state_str):
+    return " ".join((city_state_str or "").split()).lower()
+
+
+def note_location(slug, city_state_str):
+    """Record that a location reads this country's feed; returns every location noted for it."""
+    with _lock:
+        locations = _locations.setdefault(slug, set())
+        if _normalized(city_state_str):
+            locations.add(_normalized(city_state_str))
+        return sorted(locations)
+
+
+def covers(entry, city_state_str):
+    """Whether a cached parse holds all of a location's items (untruncated, or kept past the cap for it)."""
+    if entry is None or not entry.get("truncated") or not _normalized(city_state_str):
+        return True
+    return _normalized(city_state_str) in entry.get("locations", ())
+
+
+def slug_lock(slug):
+    """Per-country lock so concurrent recipients trigger a single download."""
+    with _lock:
+        return _slug_locks.setdefault(slug, threading.Lock())
+
+
+def _path(slug):
+    return os.path.join(METEOALARM_CACHE_DIR, f"{slug}.json")
+
+
+def get(slug):
+    """Return the cached entry for a country feed (memory, then disk), or None."""
+    with _lock:
+        entry = _entries.get(slug)
+    if entry is not None:
+        return entry
+    try:
+        with open(_path(slug), "r") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"MeteoAlarm cache: unreadable entry for '{slug}': {e}")
+        return None
+    entry["index"] = build_index(entry.get("items", []))
+    with _lock:
+        _entries[slug] = entry
+    return entry
+
+
+def is_fresh(entry):
+    return entry is not None and time.time() - entry.get("checked_at", 0) < _METEOALARM_FRESH_SECONDS
+
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since headers for revalidating an entry."""
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def put(slug, items, etag=None, last_modified=None, truncated=False, locations=()):
+    """
+    Store a freshly parsed feed and return the new entry.  `truncated` marks a
+    feed cut short by the item cap, `locations` those whose items were kept.
+    """
+    entry = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "checked_at": time.time(),
+        "items": items,
+        "truncated": truncated,
+        "locations": [_normalized(location) for location in locations],
+    }
+    _write(slug, entry)
+    entry["index"] = build_index(items)
+    with _lock:
+        _entries[slug] = entry
+    return entry
+
+
+def mark_not_modified(slug, entry):
+    """Record a 304 response: the cached parse stays valid for another period."""
+    entry["checked_at"] = time.time()
+    _write(slug, {k: v for k, v in entry.items() if k != "index"})
+    return entry
+
+
+def _write(slug, entry):
+    try:
+        os.makedirs(METEOALARM_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{_path(slug)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, _path(slug))
+    except OSError as e:
+        logging.warning(f"MeteoAlarm cache: could not write entry for '{slug}': {e}")
+
+
+def lookup(entry, city_state_str):
+    """
+    Return the items of a cached feed that mention the location.  The index
+    finds whole region names; when it has none, titles are scanned for the
+    location's words as substrings, which also catches compound names such
+    as "Berlin-Mitte".  Falls back to every item when the location is empty
+    or nothing matches, so alerts are never silently dropped.
+    """
+    items = entry.get("items", [])
+    positions = set()
+    for token in _location_keys(city_state_str):
+        positions.update(entry["index"].get(token, ()))
+    if positions:
+        return [items[p] for p in sorted(positions)]
+    words = location_tokens(city_state_str)
+    matched = [item for item in items if _title_mentions(item, words)]
+    return matched or items
+
+
+def clear():
+    """Forget every in-memory entry."""
+    with _lock:
+        _entries.clear()
+        _locations.clear()
@@ -0,0 +1,201 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Caches for NWS (api.weather.gov) alerts.
+#
+# A point is resolved to its forecast zone and county once (the UGC codes
+# alerts are issued against) and the mapping is kept on disk.  Active alerts
+# are then fetched per set of zones with a short TTL, so every recipient in
+# the same zones shares one request.  For the "new since last email" mode
+# the IDs of the alerts already included in the email to a recipient for a
+# location are kept on disk as well.
+#
+# Rendering an email is not delivering it: a build opens digest_alerts() for
+# its recipient, the alert renderer reads the recipient's seen IDs and notes
+# the ones it shows, and the caller commit()s them only once the email has
+# been sent or spooled to the outbox.  A build that fails (or a render
+# outside of one) leaves the record untouched, so the next email still
+# carries the full text.  Like request_budget, the record is found through
+# a context variable that asyncio tasks and copy_context() workers inherit.
+NWS_CACHE_DIR = "./cache/nws"
+
+# Zone boundaries change a few times a year at most.
+_NWS_ZONE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Alerts are re-fetched after this long (alerts change, so this is kept short).
+_NWS_ALERTS_TTL_SECONDS = 5 * 60
+
+_lock = threading.Lock()
+_zones = None  # point key -> {"zones": [...], "resolved_at": ts}; loaded lazily
+_seen = None  # "recipient|location" key -> [alert id, ...]; loaded lazily
+_alerts = {}  # zone key -> {"fetched_at": ts, "data": GeoJSON payload}
+_zone_locks = {}
+
+_current = contextvars.ContextVar("nws_shown_alerts", default=None)
+
+
+def point_key(latitude, longitude):
+    return f"{float(latitude):.4f},{float(longitude):.4f}"
+
+
+def zone_key(zones):
+    return ",".join(sorted(zones))
+
+
+def _path(name):
+    return os.path.join(NWS_CACHE_DIR, f"{name}.json")
+
+
+def _load(name):
+    try:
+        with open(_path(name), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"NWS cache: unreadable {name} file: {e}")
+        return {}
+
+
+def _write(name, data):
+    try:
+        os.makedirs(NWS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{_path(name)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, _path(name))
+    except OSError as e:
+        logging.warning(f"NWS cache: could not write {name} file: {e}")
+
+
+def get_zones(latitude, longitude):
+    """Return the cached zone IDs for a point, or None if unknown or stale."""
+    global _zones
+    with _lock:
+        if _zones is None:
+            _zones = _load("zones")
+        entry = _zones.get(point_key(latitude, longitude))
+    if entry is None or time.time() - entry.get("resolved_at", 0) >= _NWS_ZONE_TTL_SECONDS:
+        return None
+    return entry["zones"]
+
+
+def put_zones(latitude, longitude, zones):
+    global _zones
+    with _lock:
+        if _zones is None:
+            _zones = _load("zones")
+        _zones[point_key(latitude, longitude)] = {"zones": list(zones), "resolved_at": time.time()}
+        snapshot = dict(_zones)
+    _write("zones", snapshot)
+
+
+def zone_lock(key):
+    """Per-zone lock so concurrent recipients trigger a single request."""
+    with _lock:
+        return _zone_locks.setdefault(key, threading.Lock())
+
+
+def get_alerts(key):
+    """Return the cached alerts payload for a zone key while it is fresh, else None."""
+    with _lock:
+        entry = _alerts.get(key)
+    if entry is None or time.time() - entry["fetched_at"] >= _NWS_ALERTS_TTL_SECONDS:
+        return None
+    return entry["data"]
+
+
+def put_alerts(key, data):
+    with _lock:
+        _alerts[key] = {"fetched_at": time.time(), "data": data}
+    return data
+
+
+class ShownAlerts:
+    def __init__(self, recipient):
+        self.recipient = str(recipient or "").strip().lower()
+        self.by_location = {}  # location key -> set of alert IDs shown in this email
+        self._lock = threading.Lock()
+
+    def add(self, location, ids):
+        with self._lock:
+            self.by_location.setdefault(location, set()).update(ids)
+
+    def commit(self):
+        """Record the shown alerts as seen; call once the email is sent or enqueued."""
+        with self._lock:
+            shown = {location: set(ids) for location, ids in self.by_location.items()}
+        if shown:
+            remember(self.recipient, shown)
+
+
+@contextmanager
+def digest_alerts(recipient):
+    """Collect the alerts shown in the enclosed build for `recipient`; yields the ShownAlerts."""
+    shown = ShownAlerts(recipient)
+    token = _current.set(shown)
+    try:
+        yield shown
+    finally:
+        _current.reset(token)
+
+
+def _seen_key(recipient, location):
+    return f"{recipient}|{location}"
+
+
+def _load_seen():
+    # Keys without a recipient predate per-recipient records and are dropped.
+    return {key: ids for key, ids in _load("seen").items() if "|" in key}
+
+
+def seen_ids(location):
+    """
+    IDs of the alerts included in the last email delivered to the current
+    build's recipient for a location; empty outside of digest_alerts().
+    """
+    global _seen
+    shown = _current.get()
+    if shown is None:
+        return set()
+    with _lock:
+        if _seen is None:
+            _seen = _load_seen()
+        return set(_seen.get(_seen_key(shown.recipient, location), ()))
+
+
+def note_shown(location, ids):
+    """Note alerts shown for a location in the current build (no-op outside of one)."""
+    shown = _current.get()
+    if shown is not None:
+        shown.add(location, ids)
+
+
+def remember(recipient, shown):
+    """
+    Record the alerts included in an email delivered to `recipient`, given as
+    {location: ids}.  Only the currently active IDs are kept, so expired
+    alerts drop out of the file by themselves.
+    """
+    global _seen
+    with _lock:
+        if _seen is None:
+            _seen = _load_seen()
+        for location, ids in shown.items():
+            _seen[_seen_key(recipient, location)] = sorted(ids)
+        snapshot = dict(_seen)
+    _write("seen", snapshot)
+
+
+def clear():
+    """Forget every in-memory entry (disk files are reloaded on next use)."""
+    global _zones, _seen
+    with _lock:
+        _zones = None
+        _seen = None
+        _alerts.clear()
@@ -0,0 +1,276 @@
+import calendar
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import date, datetime, timedelta
+
+from calendar_event import Event
+
+# Persistent index of expanded calendar occurrences.
+#
+# Every subscribed calendar (a webcal feed or a CalDAV collection) is a
+# "source".  Its events are expanded once by parse_icalendar() and stored
+# one row per occurrence, keyed by (source, UID, recurrence-id), with
+# start/end sort keys.  A source is only re-expanded when its version
+# changes: the content hash of a webcal feed (ignoring DTSTAMP, which some
+# providers set to the time of the download), or the sync-token of a CalDAV
+# collection, whose changes are applied per calendar object.  Finding the
+# events of a day is then one indexed range query, however many years of
+# events the calendars hold.
+#
+# Sort keys are epoch seconds, with floating times and all-day dates read
+# as UTC; queries widen the window by a day on each side and callers apply
+# the exact, timezone-aware test to the few rows returned.
+#
+# Events without a UID are keyed by a hash of their calendar object and
+# content instead, so several of them in one feed do not overwrite each
+# other.  The index is only a cache: a database from an older schema
+# version is dropped and rebuilt.
+INDEX_PATH = "./cache/occurrences.sqlite3"
+
+_SLACK = timedelta(days=1)
+_DTSTAMP_LINE = re.compile(rb"^DTSTAMP[;:][^\n]*\n?", re.MULTILINE)
+
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    version TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    max_span REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS occurrences (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    recurrence_id TEXT NOT NULL,
+    href TEXT NOT NULL DEFAULT '',
+    start_key REAL NOT NULL,
+    end_key REAL NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    summary TEXT,
+    location TEXT,
+    description TEXT,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS occurrences_by_start ON occurrences (source, start_key);
+CREATE INDEX IF NOT EXISTS occurrences_by_href ON occurrences (source, href);
+"""
+
+_lock = threading.Lock()
+_source_locks = {}
+
+
+def webcal_source(url):
+    return f"webcal:{url}"
+
+
+def caldav_source(calendar_url):
+    return f"caldav:{calendar_url}"
+
+
+@contextmanager
+def source_lock(source):
+    """Serialise refreshes of one source, so concurrent builds download it once."""
+    with _lock:
+        lock = _source_locks.setdefault(source, threading.Lock())
+    with lock:
+        yield
+
+
+@contextmanager
+def _connect():
+    os.makedirs(os.path.dirname(INDEX_PATH) or ".", exist_ok=True)
+    with closing(sqlite3.connect(INDEX_PATH, timeout=30)) as conn:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS occurrences; DROP TABLE IF EXISTS sources;")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        with conn:  # one transaction, committed on success
+            yield conn
+
+
+def content_version(body):
+    """Hash of a feed's bytes, ignoring DTSTAMP lines."""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha256(_DTSTAMP_LINE.sub(b"", body.replace(b"\r\n", b"\n"))).hexdigest()
+
+
+# ── values ─────────────────────────────────────────────────────────────────────
+
+def _sort_key(value):
+    """Epoch seconds of a date or datetime; naive values and dates read as UTC."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset() is not None:
+            return value.timestamp()
+        return calendar.timegm(value.timetuple()) + value.microsecond / 1e6
+    return calendar.timegm(value.timetuple())
+
+
+def _decode(value):
+    if len(value) == 10:
+        return date.fromisoformat(value)
+    return datetime.fromisoformat(value)
+
+
+def _key(href, uid, recurrence_id, start, end, summary, location):
+    """(UID, recurrence-id), or a content hash for an event without a UID."""
+    if uid:
+        return f"{uid}\x1f{recurrence_id}"
+    material = "\x1f".join((href, start, end, summary or "", location or ""))
+    return "#" + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _rows(source, href, events):
+    for event in events:
+        start, end = event["start"], event["end"]
+        start_text, end_text = start.isoformat(), end.isoformat()
+        uid = str(event.get("uid") or "")
+        recurrence_id = event.get("recurrence_id")
+        recurrence_id = recurrence_id.isoformat() if recurrence_id is not None else ""
+        summary = event.get("summary")
+        location = str(event["location"]) if event.get("location") else None
+        yield (
+            source,
+            _key(href, uid, recurrence_id, start_text, end_text, summary, location),
+            uid,
+            recurrence_id,
+            href,
+            _sort_key(start),
+            _sort_key(end),
+            start_text,
+            end_text,
+            summary,
+            location,
+            event.get("description"),
+        )
+
+
+def _insert(conn, rows):
+    """Insert occurrence rows; returns the longest span among them in seconds."""
+    rows = list(rows)
+    conn.executemany("INSERT OR REPLACE INTO occurrences VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return max((row[6] - row[5] for row in rows), default=0)
+
+
+# ── sources ────────────────────────────────────────────────────────────────────
+
+def source_state(source):
+    """{"version", "etag", "last_modified", ...} of an indexed source, or None."""
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM sources WHERE source = ?", (source,)).fetchone()
+    return dict(row) if row else None
+
+
+def conditional_headers(state):
+    """If-None-Match / If-Modified-Since for re-downloading an indexed feed."""
+    headers = {}
+    if state and state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state and state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+
+def replace_source(source, objects, version, etag=None, last_modified=None):
+    """
+    Replace everything indexed for a source.  `objects` maps a calendar
+    object href ("" for a webcal feed) to its parsed events.
+    """
+    with _connect() as conn:
+        conn.execute("DELETE FROM occurrences WHERE source = ?", (source,))
+        max_span = 0
+        for href, events in objects.items():
+            max_span = max(max_span, _insert(conn, _rows(source, href, events)))
+        conn.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+            (source, version, etag, last_modified, max_span, time.time()),
+        )
+    logging.info(f"Calendar index: re-indexed {source} ({sum(map(len, objects.values()))} occurrences).")
+
+
+def update_objects(source, objects, version):
+    """
+    Apply changed calendar objects to an indexed source: each href's
+    occurrences are replaced by its new events, or removed if they are None.
+    """
+    with _connect() as conn:
+        max_span = conn.execute("SELECT max_span FROM sources WHERE source = ?", (source,)).fetchone()[0]
+        for href, events in objects.items():
+            conn.execute("DELETE FROM occurrences WHERE source = ? AND href = ?", (source, href))
+            if events:
+                max_span = max(max_span, _insert(conn, _rows(source, href, events)))
+        conn.execute(
+            "UPDATE sources SET version = ?, max_span = ?, updated_at = ? WHERE source = ?",
+            (version, max_span, time.time(), source),
+        )
+    logging.info(f"Calendar index: applied {len(objects)} changed object(s) to {source}.")
+
+
+def mark_unchanged(source, etag=None, last_modified=None):
+    """Record a check that found the source unchanged, keeping new validators."""
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE sources SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), "
+            "updated_at = ? WHERE source = ?",
+            (etag, last_modified, time.time(), source),
+        )
+
+
+# ── queries ────────────────────────────────────────────────────────────────────
+
+def events_between(sources, first_day, last_day=None):
+    """
+    Occurrences from `sources` that may overlap first_day..last_day, as the
+    Events parse_icalendar() returns.  May include events up to a day
+    either side; callers filter with the exact timezone-aware test.
+    """
+    if not sources:
+        return []
+    low = calendar.timegm((first_day - _SLACK).timetuple())
+    high = calendar.timegm(((last_day or first_day) + 2 * _SLACK).timetuple())
+    placeholders = ", ".join("?" * len(sources))
+    with _connect() as conn:
+        max_span = conn.execute(
+            f"SELECT COALESCE(MAX(max_span), 0) FROM sources WHERE source IN ({placeholders})", sources
+        ).fetchone()[0]
+        # Bounded on start_key at both ends so the (source, start_key) index
+        # serves the whole query; max_span brings in long events begun earlier.
+        rows = conn.execute(
+            f"SELECT * FROM occurrences WHERE source IN ({placeholders}) "
+            "AND start_key >= ? AND start_key < ? AND end_key >= ?",
+            (*sources, low - max_span, high, low),
+        ).fetchall()
+    return [
+        Event(
+            _decode(row["start"]),
+            _decode(row["end"]),
+            row["summary"],
+            row["location"],
+            row["uid"] or None,
+            row["description"],
+            _decode(row["recurrence_id"]) if row["recurrence_id"] else None,
+        )
+        for row in rows
+    ]
+
+
+def clear():
+    with _lock:
+        _source_locks.clear()
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(INDEX_PATH + suffix)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+import uuid
+
+from smtp_session import send_batch
+
+# Rendered messages are spooled here before delivery so an SMTP outage never
+# loses a fully built digest.  Each message is two files:
+#   <id>.eml   – the serialised MIME message
+#   <id>.json  – delivery metadata (status, attempts, next attempt, last error)
+OUTBOX_DIR = "./data/outbox"
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+_INITIAL_RETRY_DELAY_SECONDS = 60
+_MAX_RETRY_DELAY_SECONDS = 3600
+_MAX_ATTEMPTS = 12  # ~9 hours of retries with the delays above
+_RETENTION_SECONDS = 7 * 24 * 3600  # sent and failed entries are kept this long
+
+# Serialises drains so the scheduled sender and an immediate send never
+# deliver the same message twice.
+_drain_lock = threading.Lock()
+
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _meta_path(outbox_dir, message_id):
+    return os.path.join(outbox_dir, f"{message_id}.json")
+
+
+def _body_path(outbox_dir, message_id):
+    return os.path.join(outbox_dir, f"{message_id}.eml")
+
+
+def _retry_delay(attempts):
+    """Exponential backoff: 1 min, 2 min, 4 min, … capped at one hour."""
+    return min(_INITIAL_RETRY_DELAY_SECONDS * (2 ** max(attempts - 1, 0)), _MAX_RETRY_DELAY_SECONDS)
+
+
+def enqueue(message, sender, recipients, outbox_dir=OUTBOX_DIR):
+    """
+    Durably spool a rendered message for delivery and return its id.
+
+    The body is written before the metadata so a crash mid-write never leaves
+    a pending entry without a message to send.
+    """
+    os.makedirs(outbox_dir, exist_ok=True)
+    if isinstance(recipients, str):
+        recipients = [recipients]
+
+    message_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:12]}"
+    payload = message if isinstance(message, str) else message.as_string()
+
+    body_path = _body_path(outbox_dir, message_id)
+    with open(f"{body_path}.tmp", "w") as f:
+        f.write(payload)
+    os.replace(f"{body_path}.tmp", body_path)
+
+    now = time.time()
+    _write_json_atomic(
+        _meta_path(outbox_dir, message_id),
+        {
+            "id": message_id,
+            "sender": sender,
+            "recipients": list(recipients),
+            "status": STATUS_PENDING,
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": now,
+            "last_attempt_at": None,
+            "sent_at": None,
+            "last_error": None,
+        },
+    )
+    logging.debug(f"Outbox: queued message {message_id} for {recipients}.")
+    return message_id
+
+
+def _load_all_metadata(outbox_dir):
+    if not os.path.isdir(outbox_dir):
+        return []
+    entries = []
+    for name in os.listdir(outbox_dir):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(outbox_dir, name), "r") as f:
+                entries.append(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"Outbox: unreadable metadata file '{name}': {e}")
+    entries.sort(key=lambda m: m.get("created_at", 0))
+    return entries
+
+
+def _is_permanent(error):
+    """
+    Whether retrying cannot help: the server refused the sender or the
+    recipients, or answered with a 5xx reply code.  A 5xx at LOGIN is left to
+    the retries, since fixing the account settings lets the message through.
+    """
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return not codes or any(code >= 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):  # includes SMTPSenderRefused
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+def _finished_at(meta):
+    if meta["status"] == STATUS_SENT:
+        return meta.get("sent_at")
+    if meta["status"] == STATUS_FAILED:
+        return meta.get("last_attempt_at") or meta.get("created_at")
+    return None
+
+
+def _prune_finished(outbox_dir, entries, now):
+    """Remove sent and failed entries (metadata and any body) older than _RETENTION_SECONDS."""
+    for meta in entries:
+        finished_at = _finished_at(meta)
+        if finished_at is None or now - finished_at <= _RETENTION_SECONDS:
+            continue
+        for path in (_meta_path(outbox_dir, meta["id"]), _body_path(outbox_dir, meta["id"])):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def deliver_pending(
+    smtp_host,
+    smtp_port,
+    smtp_username,
+    smtp_password,
+    message_ids=None,
+    outbox_dir=OUTBOX_DIR,
+):
+    """
+    Deliver every pending message whose retry time has come, over one SMTP
+    session per sender.  When `message_ids` is given, only those messages are
+    considered (used for the immediate send right after enqueueing).
+
+    Successful messages are marked sent and their body removed; failures are
+    rescheduled with exponential backoff and marked failed after
+    _MAX_ATTEMPTS attempts, or straight away when the server rejected the
+    message permanently (see _is_permanent).  Sent and failed entries are
+    pruned after _RETENTION_SECONDS.
+
+    Returns a dict of counts: {"sent": n, "retrying": n, "failed": n}.
+    """
+    counts = {"sent": 0, "retrying": 0, "failed": 0}
+    with _drain_lock:
+        now = time.time()
+        entries = _load_all_metadata(outbox_dir)
+        _prune_finished(outbox_dir, entries, now)
+
+        due_by_sender = {}
+        for meta in entries:
+            if meta["status"] != STATUS_PENDING:
+                continue
+            if message_ids is not None and meta["id"] not in message_ids:
+                continue
+            if meta.get("next_attempt_at", 0) > now:
+                continue
+            try:
+                with open(_body_path(outbox_dir, meta["id"]), "r") as f:
+                    body = f.read()
+            except OSError as e:
+                meta["status"] = STATUS_FAILED
+                meta["last_error"] = f"Message body missing: {e}"
+                _write_json_atomic(_meta_path(outbox_dir, meta["id"]), meta)
+                counts["failed"] += 1
+                continue
+            due_by_sender.setdefault(meta["sender"], []).append((meta, body))
+
+        for sender, batch in due_by_sender.items():
+            results = send_batch(
+                smtp_host,
+                smtp_port,
+                smtp_username,
+                smtp_password,
+                sender,
+                [(meta["recipients"], body) for meta, body in batch],
+            )
+            attempt_time = time.time()
+            for (meta, _), (_, error) in zip(batch, results):
+                meta["attempts"] += 1
+                meta["last_attempt_at"] = attempt_time
+                if error is None:
+                    meta["status"] = STATUS_SENT
+                    meta["sent_at"] = attempt_time
+                    meta["last_error"] = None
+                    try:
+                        os.remove(_body_path(outbox_dir, meta["id"]))
+                    except OSError:
+                        pass
+                    counts["sent"] += 1
+                elif _is_permanent(error):
+                    meta["status"] = STATUS_FAILED
+                    meta["last_error"] = str(error)
+                    logging.critical(f"Outbox: message {meta['id']} rejected by the server, not retrying: {error}")
+                    counts["failed"] += 1
+                elif meta["attempts"] >= _MAX_ATTEMPTS:
+                    meta["status"] = STATUS_FAILED
+                    meta["last_error"] = str(error)
+                    logging.critical(
+                        f"Outbox: giving up on message {meta['id']} after {meta['attempts']} attempts: {error}"
+                    )
+                    counts["failed"] += 1
+                else:
+                    delay = _retry_delay(meta["attempts"])
+                    meta["next_attempt_at"] = attempt_time + delay
+                    meta["last_error"] = str(error)
+                    logging.warning(
+                        f"Outbox: delivery of {meta['id']} failed ({error}). "
+                        f"Retrying in {delay}s (attempt {meta['attempts']}/{_MAX_ATTEMPTS})."
+                    )
+                    counts["retrying"] += 1
+                _write_json_atomic(_meta_path(outbox_dir, meta["id"]), meta)
+
+    if any(counts.values()):
+        logging.info(
+            f"Outbox: {counts['sent']} sent, {counts['retrying']} awaiting retry, {counts['failed']} failed."
+        )
+    return counts
+
+
+def outbox_status(outbox_dir=OUTBOX_DIR):
+    """Return delivery metadata for every message in the outbox, oldest first."""
+    entries = _load_all_metadata(outbox_dir)
+    return {
+        "pending": sum(1 for m in entries if m["status"] == STATUS_PENDING),
+        "sent": sum(1 for m in entries if m["status"] == STATUS_SENT),
+        "failed": sum(1 for m in entries if m["status"] == STATUS_FAILED),
+        "messages": entries,
+    }
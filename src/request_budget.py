@@ -0,0 +1,69 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-build request budget.
+#
+# Each retrying HTTP call has its own elapsed cap, but several of them in one
+# build can still add up to many minutes.  A build opens a budget ("this
+# email must be assembled within N seconds") with request_budget(); the
+# retry helpers in http_client read it through a context variable, shorten
+# their timeouts and back-off sleeps to fit, skip retries (or the request
+# itself) once too little time is left, and record each call they cut short.
+#
+# asyncio tasks inherit the budget automatically.  Work handed to a thread
+# pool must be submitted through contextvars.copy_context().run to see it.
+DEFAULT_BUILD_BUDGET_SECONDS = 90
+
+_current = contextvars.ContextVar("request_budget", default=None)
+
+
+class RequestBudget:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.cut_short = []  # (url, reason) for every call the budget shortened
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def record(self, url, reason):
+        with self._lock:
+            self.cut_short.append((url, reason))
+        logging.warning(f"Request budget: {reason} for '{url}'.")
+
+
+@contextmanager
+def request_budget(seconds=DEFAULT_BUILD_BUDGET_SECONDS):
+    """Run the enclosed build under a budget of `seconds`; yields the RequestBudget."""
+    budget = RequestBudget(seconds)
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+        if budget.cut_short:
+            logging.warning(
+                f"Request budget of {seconds}s cut {len(budget.cut_short)} call(s) short: "
+                + "; ".join(f"{url} ({reason})" for url, reason in budget.cut_short)
+            )
+
+
+def current():
+    """The budget of the build in progress, or None outside of one."""
+    return _current.get()
+
+
+def remaining():
+    """Seconds left in the current budget, or None when no budget is set."""
+    budget = _current.get()
+    return None if budget is None else budget.remaining()
+
+
+def record_cut_short(url, reason):
+    budget = _current.get()
+    if budget is not None:
+        budget.record(url, reason)
@@ -1,7 +1,6 @@
 import logging
-import smtplib
-import ssl
 import traceback
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -10,7 +9,12 @@ import markdown
 import pytz
 
 from add_emojis import add_emojis
-from generate_summary import generate_summary
+from generate_summary import start_summary
+from outbox import enqueue, deliver_pending
+
+# Longest the email waits for the AI summary once every other section is
+# rendered.  Past this the email goes out with the error placeholder instead.
+SUMMARY_DEADLINE_SECONDS = 20
 
 
 def convert_section(markdown_string):
@@ -40,16 +44,67 @@ def append_section(text, html_text, markdown_string, section_class, text_format=
         logging.warning(f"{section_class} content is None, empty, or whitespace.")
     return text, html_text
 
-def send_email(
+def parse_recipients(recipient_email, recipient_name):
+    """
+    Split comma-separated RECIPIENT_EMAIL / RECIPIENT_NAME values into
+    [(email, name), ...].  Names are matched to addresses by position; any
+    address without its own name reuses the last name given.
+    """
+    emails = [e.strip() for e in (recipient_email or "").split(",") if e.strip()]
+    names = [n.strip() for n in (recipient_name or "").split(",") if n.strip()]
+    recipients = []
+    for i, email in enumerate(emails):
+        if i < len(names):
+            name = names[i]
+        else:
+            name = names[-1] if names else email
+        recipients.append((email, name))
+    return recipients
+
+
+def summary_input_text(weather_string="", todo_plain_string="", cal_string=""):
+    """
+    The plain text a summary is generated from: the weather, task and
+    calendar sections, exactly as render_email lays them out.
+    """
+    text = ""
+    for section in (weather_string, todo_plain_string, cal_string):
+        if section and section.strip():
+            text += section + "\n\n"
+    return text
+
+
+def resolve_summary(summary, timeout=SUMMARY_DEADLINE_SECONDS):
+    """
+    Return the summary text from a string or a Future started by
+    start_summary(), waiting at most `timeout` seconds for the latter.
+    Returns None when the summary failed or missed its deadline.
+    """
+    if not isinstance(summary, Future):
+        return summary
+    try:
+        return summary.result(timeout=timeout)
+    except FutureTimeoutError:
+        logging.warning(f"Summary generation exceeded its {timeout}s deadline.")
+    except Exception as e:
+        logging.error(f"Error generating summary: {e}")
+    return None
+
+
+def build_message(text, html, recipient_email, recipient_name, date_string, smtp_username):
+    """Wrap rendered plain-text and HTML bodies in a MIME message for one recipient."""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = f"Daily Summary for {recipient_name}: {date_string}"
+    message["From"] = f"Daily Summary <{smtp_username}>"
+    message["To"] = recipient_email
+    message.attach(MIMEText(text, "plain"))
+    message.attach(MIMEText(html, "html"))
+    return message
+
+
+def render_email(
         version,
         timezone,
-        recipient_email,
-        recipient_name,
-        sender_email,
-        smtp_username,
-        smtp_password,
-        smtp_host,
-        smtp_port,
         openai_api_key="",
         enable_summary="",
         enable_emjois="",
@@ -63,233 +118,308 @@ def send_email(
         wotd_string="",
         quote_string="",
         puzzles_ans_string="",
-) -> None:
-    try:
-        # Ensure timezone is a valid pytz timezone object
-        if isinstance(timezone, str):
-            timezone = pytz.timezone(timezone)
-            logging.debug(f"Converted timezone string to pytz timezone object: {timezone}")
-
-        message = MIMEMultipart("alternative")
-        message["Subject"] = f"Daily Summary for {recipient_name}: {date_string}"
-        message["From"] = f"Daily Summary <{smtp_username}>"
-        message["To"] = recipient_email
-
-        text = ""  # Initialize the plain text content
-        html_text = ""  # Initialize the HTML content
-
-        # Apply emojis to each section
-        #weather_string = add_emojis(weather_string)
-        #todo_string = add_emojis(todo_string)
-        #cal_string = add_emojis(cal_string)
-        #rss_string = add_emojis(rss_string)
-        #puzzles_string = add_emojis(puzzles_string)
-        #wotd_string = add_emojis(wotd_string)
-        #quote_string = add_emojis(quote_string)
-        #puzzles_ans_string = add_emojis(puzzles_ans_string)
-
-        # Append sections
-        if weather_string: text, html_text = append_section(text, html_text, weather_string, "weather")
-
-        # Todo: plain text and HTML are separate strings
-        if todo_plain_string and todo_plain_string.strip():
-            text += todo_plain_string + "\n\n"
-        if todo_string and todo_string.strip():
-            converted = convert_section(todo_string)
-            if converted:
-                html_text += f"<div class='section todo'>{converted}</div>"
-
-        if cal_string: text, html_text = append_section(text, html_text, cal_string, "calendar")
-
-        # Get summary
-        if openai_api_key is not None and enable_summary in ["True", "true", True]:
-            summary = generate_summary(text, openai_api_key)
-            if summary is None: summary = "Error generating summary."
-            summary = add_emojis(summary) if enable_emjois in ["True", "true", True] else summary
-            logging.debug(f"enable_emojis is set to {enable_emjois}")
-            logging.debug("Summary obtained")
-
-            text = (summary + text) if summary else text
-            summary_html = f"<div class='section summary'>{convert_section(summary)}</div>" if summary else ""
-            html_text = summary_html + html_text
-
-        if rss_string: text, html_text = append_section(text, html_text, rss_string, "rss")
-        if puzzles_string: text, html_text = append_section(text, html_text, puzzles_string, "puzzles")
-        if wotd_string: text, html_text = append_section(text, html_text, wotd_string, "wotd")
-        if quote_string: text, html_text = append_section(text, html_text, quote_string, "quote")
-        if puzzles_ans_string: text, html_text = append_section(text, html_text, puzzles_ans_string, "puzzles-ans")
-
-        # Append date section
-        if date_string:
-            text = "# " + date_string + "\n\n" + text
-        else:
-            logging.warning("date_string is None, empty, or whitespace.")
-            text = "# Date Not Available\n\n" + text
-
-        html_content = markdown.markdown(html_text, extensions=["markdown.extensions.fenced_code"])
-        html_content = html_text if html_text else "<div class='section'>No additional content available</div>"
-        current_datetime = datetime.now(timezone).strftime("%Y-%m-%d %H:%M:%S %z")
-        logging.debug(f"Current datetime: {current_datetime}")
-
-        html = f"""
-        <html>
-        <head>
-            <style>
-                html {{
-                    font-size: 18px;
+        summary=None,
+):
+    """
+    Assemble the digest sections and return the (plain text, HTML) bodies.
+
+    `summary` may be the finished summary, a Future from start_summary()
+    that was started while the other sections were fetched, or None to
+    start generation here.  Either way the remaining sections are rendered
+    before the summary is waited on, for at most SUMMARY_DEADLINE_SECONDS.
+    """
+    # Ensure timezone is a valid pytz timezone object
+    if isinstance(timezone, str):
+        timezone = pytz.timezone(timezone)
+        logging.debug(f"Converted timezone string to pytz timezone object: {timezone}")
+
+    text = ""  # Initialize the plain text content
+    html_text = ""  # Initialize the HTML content
+
+    # Apply emojis to each section
+    #weather_string = add_emojis(weather_string)
+    #todo_string = add_emojis(todo_string)
+    #cal_string = add_emojis(cal_string)
+    #rss_string = add_emojis(rss_string)
+    #puzzles_string = add_emojis(puzzles_string)
+    #wotd_string = add_emojis(wotd_string)
+    #quote_string = add_emojis(quote_string)
+    #puzzles_ans_string = add_emojis(puzzles_ans_string)
+
+    # Append sections
+    if weather_string: text, html_text = append_section(text, html_text, weather_string, "weather")
+
+    # Todo: plain text and HTML are separate strings
+    if todo_plain_string and todo_plain_string.strip():
+        text += todo_plain_string + "\n\n"
+    if todo_string and todo_string.strip():
+        converted = convert_section(todo_string)
+        if converted:
+            html_text += f"<div class='section todo'>{converted}</div>"
+
+    if cal_string: text, html_text = append_section(text, html_text, cal_string, "calendar")
+
+    # Start the summary (unless the caller already did) and keep rendering
+    summary_enabled = openai_api_key is not None and enable_summary in ["True", "true", True]
+    if summary_enabled and summary is None:
+        summary = start_summary(text, openai_api_key)
+
+    if rss_string: text, html_text = append_section(text, html_text, rss_string, "rss")
+    if puzzles_string: text, html_text = append_section(text, html_text, puzzles_string, "puzzles")
+    if wotd_string: text, html_text = append_section(text, html_text, wotd_string, "wotd")
+    if quote_string: text, html_text = append_section(text, html_text, quote_string, "quote")
+    if puzzles_ans_string: text, html_text = append_section(text, html_text, puzzles_ans_string, "puzzles-ans")
+
+    # Get summary
+    if summary_enabled:
+        summary = resolve_summary(summary)
+        if summary is None: summary = "Error generating summary."
+        summary = add_emojis(summary) if enable_emjois in ["True", "true", True] else summary
+        logging.debug(f"enable_emojis is set to {enable_emjois}")
+        logging.debug("Summary obtained")
+
+        text = (summary + text) if summary else text
+        summary_html = f"<div class='section summary'>{convert_section(summary)}</div>" if summary else ""
+        html_text = summary_html + html_text
+
+    # Append date section
+    if date_string:
+        text = "# " + date_string + "\n\n" + text
+    else:
+        logging.warning("date_string is None, empty, or whitespace.")
+        text = "# Date Not Available\n\n" + text
+
+    html_content = html_text if html_text else "<div class='section'>No additional content available</div>"
+    current_datetime = datetime.now(timezone).strftime("%Y-%m-%d %H:%M:%S %z")
+    logging.debug(f"Current datetime: {current_datetime}")
+
+    html = f"""
+    <html>
+    <head>
+        <style>
+            html {{
+                font-size: 18px;
+            }}
+    
+            body {{
+                background: linear-gradient(135deg, #e3f2fd, #bbdefb);
+                font-family: 'Georgia', 'Times', serif;
+                color: #000000;
+                margin: 0;
+                padding: 0;
+            }}
+    
+            .container {{
+                background: #ffffff;
+                color: #000000;
+                box-shadow: 4px 4px 12px rgba(0, 0, 0, 0.2);
+                max-width: 750px;
+                margin: 40px auto;
+                padding: 30px;
+                animation: slideUp 0.6s ease-out;
+                border-radius: 12px;
+            }}
+    
+            .section {{
+                background-color: #f7f7f7;
+                padding: 20px;
+                border-radius: 10px;
+                box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
+                margin-top: 20px;
+                margin-bottom: 20px;
+            }}
+    
+            .section h1 {{
+                font-size: 1.5rem;
+                font-weight: 600;
+                color: #003366;
+            }}
+    
+            .section h2 {{
+                font-size: 1.25rem;
+                font-weight: 500;
+                color: #000;
+            }}
+    
+            .section p, .section pre {{
+                font-size: 1rem;
+                line-height: 1.6;
+                color: #000;
+                margin-bottom: 16px;
+            }}
+    
+            .section puzzles {{
+                white-space: nowrap;
+                overflow-x: auto;
+            }}
+    
+            .header {{
+                background: linear-gradient(135deg, #1e88e5, #42a5f5);
+                color: white;
+                padding: 20px;
+                text-align: center;
+                font-size: 2rem;
+                font-weight: 600;
+                text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
+                animation: slideUp 1s ease-out;
+                border-radius: 12px;
+            }}
+    
+            .header .date {{
+                font-size: 1.125rem;
+                font-weight: 300;
+                color: #e3f2fd;
+            }}
+    
+            @media (max-width: 768px) {{
+                .container {{
+                    border-radius: 0;
                 }}
-
+            }}
+    
+            @media (prefers-color-scheme: dark) {{
                 body {{
-                    background: linear-gradient(135deg, #e3f2fd, #bbdefb);
-                    font-family: 'Georgia', 'Times', serif;
-                    color: #000000;
-                    margin: 0;
-                    padding: 0;
+                    background: linear-gradient(135deg, #2a3c57, #1e2a3f);
+                    color: #ffffff;
                 }}
-
+    
                 .container {{
-                    background: #ffffff;
-                    color: #000000;
-                    box-shadow: 4px 4px 12px rgba(0, 0, 0, 0.2);
-                    max-width: 750px;
-                    margin: 40px auto;
-                    padding: 30px;
-                    animation: slideUp 0.6s ease-out;
-                    border-radius: 12px;
+                    background: #1b263b;
+                    color: #ffffff;
+                    box-shadow: 4px 4px 12px rgba(0, 0, 0, 0.5);
                 }}
-
+    
+                .header {{
+                    background: linear-gradient(135deg, #0a3d62, #1e5799);
+                }}
+    
+                .header .date {{
+                    color: #bbdefb;
+                }}
+    
                 .section {{
-                    background-color: #f7f7f7;
-                    padding: 20px;
-                    border-radius: 10px;
-                    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-                    margin-top: 20px;
-                    margin-bottom: 20px;
+                    background-color: #2e3b4e;
+                    color: #e0e0e0;
+                    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.3);
                 }}
-
+    
                 .section h1 {{
-                    font-size: 1.5rem;
-                    font-weight: 600;
-                    color: #003366;
+                    color: #bbdefb;
                 }}
-                
+    
                 .section h2 {{
-                    font-size: 1.25rem;
-                    font-weight: 500;
-                    color: #000;
+                    color: #fff;
                 }}
-
+    
                 .section p, .section pre {{
-                    font-size: 1rem;
-                    line-height: 1.6;
-                    color: #000;
-                    margin-bottom: 16px;
+                    color: #e0e0e0;
                 }}
-                
-                .section puzzles {{
-                    white-space: nowrap;
-                    overflow-x: auto;
-                }}
-
-                .header {{
-                    background: linear-gradient(135deg, #1e88e5, #42a5f5);
-                    color: white;
-                    padding: 20px;
-                    text-align: center;
-                    font-size: 2rem;
-                    font-weight: 600;
-                    text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
-                    animation: slideUp 1s ease-out;
-                    border-radius: 12px;
-                }}
-
-                .header .date {{
-                    font-size: 1.125rem;
-                    font-weight: 300;
-                    color: #e3f2fd;
-                }}
-
-                @media (max-width: 768px) {{
-                    .container {{
-                        border-radius: 0;
-                    }}
-                }}
-
-                @media (prefers-color-scheme: dark) {{
-                    body {{
-                        background: linear-gradient(135deg, #2a3c57, #1e2a3f);
-                        color: #ffffff;
-                    }}
-
-                    .container {{
-                        background: #1b263b;
-                        color: #ffffff;
-                        box-shadow: 4px 4px 12px rgba(0, 0, 0, 0.5);
-                    }}
+            }}
+    
+            .footer {{
+                text-align: center;
+                margin-top: 20px;
+            }}
+        </style>
+        <meta name="color-scheme" content="light dark">
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                Daily Summary
+                <div class="date">{date_string}</div>
+            </div>
+            {html_content}
+            <div class="footer">
+                <p style="font-size: 14px; color: inherit;">
+                    View the project here:  
+                    <a href="https://git.tylerdavis.net/tyler/dailySummaryEmail" target="_blank" style="color: inherit; text-decoration: underline;">Forgejo</a>
+                </p>
+                <p style="font-size: 12px; color: inherit;">
+                    📋 Version: {version} | Sent at: {current_datetime}
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
 
-                    .header {{
-                        background: linear-gradient(135deg, #0a3d62, #1e5799);
-                    }}
+    return text, html
 
-                    .header .date {{
-                        color: #bbdefb;
-                    }}
 
-                    .section {{
-                        background-color: #2e3b4e;
-                        color: #e0e0e0;
-                        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.3);
-                    }}
+def send_email(
+        version,
+        timezone,
+        recipient_email,
+        recipient_name,
+        sender_email,
+        smtp_username,
+        smtp_password,
+        smtp_host,
+        smtp_port,
+        openai_api_key="",
+        enable_summary="",
+        enable_emjois="",
+        date_string="",
+        weather_string="",
+        todo_string="",
+        todo_plain_string="",
+        cal_string="",
+        rss_string="",
+        puzzles_string="",
+        wotd_string="",
+        quote_string="",
+        puzzles_ans_string="",
+        summary=None,
+) -> None:
+    """
+    Render the digest once, spool a personalised copy for every recipient in
+    the outbox and deliver them over a single SMTP session.  recipient_email /
+    recipient_name may be comma-separated lists.  Copies that cannot be
+    delivered now stay in the outbox for the background sender to retry.
+    `summary` is passed through to render_email().
+    """
+    try:
+        text, html = render_email(
+            version,
+            timezone,
+            openai_api_key,
+            enable_summary,
+            enable_emjois,
+            date_string,
+            weather_string,
+            todo_string,
+            todo_plain_string,
+            cal_string,
+            rss_string,
+            puzzles_string,
+            wotd_string,
+            quote_string,
+            puzzles_ans_string,
+            summary=summary,
+        )
 
-                    .section h1 {{
-                        color: #bbdefb;
-                    }}
-                    
-                    .section h2 {{
-                        color: #fff;
-                    }}
-                    
-                    .section p, .section pre {{
-                        color: #e0e0e0;
-                    }}
-                }}
+        recipients = parse_recipients(recipient_email, recipient_name)
+        if not recipients:
+            raise ValueError("No recipient email address configured.")
+
+        # Spool every message before delivery so an SMTP outage never loses
+        # the digest; the background outbox sender retries what fails here.
+        message_ids = {
+            enqueue(build_message(text, html, email, name, date_string, smtp_username), sender_email, [email])
+            for email, name in recipients
+        }
+        counts = deliver_pending(
+            smtp_host, smtp_port, smtp_username, smtp_password, message_ids=message_ids
+        )
 
-                .footer {{
-                    text-align: center;
-                    margin-top: 20px;
-                }}
-            </style>
-            <meta name="color-scheme" content="light dark">
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    Daily Summary
-                    <div class="date">{date_string}</div>
-                </div>
-                {html_content}
-                <div class="footer">
-                    <p style="font-size: 14px; color: inherit;">
-                        View the project here:  
-                        <a href="https://git.tylerdavis.net/tyler/dailySummaryEmail" target="_blank" style="color: inherit; text-decoration: underline;">Forgejo</a>
-                    </p>
-                    <p style="font-size: 12px; color: inherit;">
-                        📋 Version: {version} | Sent at: {current_datetime}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        message.attach(MIMEText(text, "plain"))
-        message.attach(MIMEText(html, "html"))
-
-        context = ssl.create_default_context()
-        with smtplib.SMTP_SSL(smtp_host, smtp_port, context=context) as server:
-            server.login(smtp_username, smtp_password)
-            server.sendmail(sender_email, recipient_email, message.as_string())
-        logging.info(f"Email sent successfully on {current_datetime}.")
+        if counts["sent"] == len(message_ids):
+            logging.info(f"Email sent successfully to {counts['sent']} recipient(s).")
+        else:
+            logging.error(
+                f"Email delivered to {counts['sent']} of {len(message_ids)} recipient(s); "
+                f"{counts['retrying']} queued in the outbox for retry, {counts['failed']} failed."
+            )
     except Exception as e:
         logging.critical(f"Error sending email: {e}")
         logging.critical(traceback.format_exc())
@@ -0,0 +1,160 @@
+import logging
+import smtplib
+import ssl
+
+_MAX_MESSAGES_PER_SESSION = 50
+_MAX_RECONNECT_ATTEMPTS = 2
+_SMTP_TIMEOUT_SECONDS = 30
+
+
+class SMTPSession:
+    """
+    An authenticated SMTP_SSL connection that is reused for every message
+    sent through it, so a batch pays for one TLS handshake and one LOGIN.
+
+    The connection is opened lazily on the first send.  If the server drops
+    it (SMTPServerDisconnected) it is reopened and the message retried, and
+    once `max_messages_per_session` messages have gone through, the session
+    is recycled so long batches stay under per-connection server limits.
+
+    Usable as a context manager:
+
+        with SMTPSession(host, port, username, password) as session:
+            session.send(sender, [recipient], message)
+    """
+
+    def __init__(
+        self,
+        host,
+        port,
+        username,
+        password,
+        max_messages_per_session=_MAX_MESSAGES_PER_SESSION,
+        timeout=_SMTP_TIMEOUT_SECONDS,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_messages_per_session = max(1, int(max_messages_per_session))
+        self.timeout = timeout
+        self._context = ssl.create_default_context()
+        self._server = None
+        self._sent_in_session = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def connected(self):
+        return self._server is not None
+
+    def _connect(self):
+        logging.debug(f"Opening SMTP session to {self.host}:{self.port}.")
+        server = smtplib.SMTP_SSL(
+            self.host, self.port, context=self._context, timeout=self.timeout
+        )
+        try:
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._sent_in_session = 0
+
+    def close(self):
+        """Politely end the session (QUIT), falling back to a hard close."""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        finally:
+            logging.debug(
+                f"Closed SMTP session to {self.host}:{self.port} "
+                f"after {self._sent_in_session} message(s)."
+            )
+            self._server = None
+            self._sent_in_session = 0
+
+    def send(self, sender, recipients, message):
+        """
+        Send one message over the shared connection.
+
+        `message` may be an email.message.Message or an already-serialised
+        string.  Reconnects (up to _MAX_RECONNECT_ATTEMPTS times) when the
+        server has hung up; any other SMTP error is raised to the caller.
+        """
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        payload = message if isinstance(message, str) else message.as_string()
+
+        if self._server is not None and self._sent_in_session >= self.max_messages_per_session:
+            logging.debug("SMTP session message cap reached. Recycling connection.")
+            self.close()
+
+        for attempt in range(_MAX_RECONNECT_ATTEMPTS + 1):
+            if self._server is None:
+                self._connect()
+            try:
+                self._server.sendmail(sender, recipients, payload)
+                self._sent_in_session += 1
+                return
+            except smtplib.SMTPServerDisconnected as e:
+                # Release the dead connection's socket before reconnecting.
+                try:
+                    self._server.close()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._server = None
+                self._sent_in_session = 0
+                if attempt >= _MAX_RECONNECT_ATTEMPTS:
+                    raise
+                logging.warning(
+                    f"SMTP server {self.host} disconnected ({e}). "
+                    f"Reconnecting (attempt {attempt + 1}/{_MAX_RECONNECT_ATTEMPTS})."
+                )
+
+
+def send_batch(
+    host,
+    port,
+    username,
+    password,
+    sender,
+    messages,
+    max_messages_per_session=_MAX_MESSAGES_PER_SESSION,
+):
+    """
+    Deliver many messages over one reusable SMTP session.
+
+    `messages` is an iterable of (recipients, message) pairs.  A failure on
+    one message (e.g. a refused recipient) does not abort the batch.
+
+    Returns a list of (recipients, error) tuples in input order, where error
+    is None for messages that were accepted by the server.
+    """
+    results = []
+    session_error = None
+    with SMTPSession(host, port, username, password, max_messages_per_session) as session:
+        for recipients, message in messages:
+            if session_error is not None:
+                # Reconnecting (or retrying LOGIN) for every remaining message
+                # would only slow the batch down or get the account locked.
+                results.append((recipients, session_error))
+                continue
+            try:
+                session.send(sender, recipients, message)
+                results.append((recipients, None))
+            except Exception as e:
+                logging.error(f"Failed to send message to {recipients}: {e}")
+                results.append((recipients, e))
+                if not session.connected:
+                    # Connection-level failure (connect, LOGIN, repeated hang-ups)
+                    session_error = e
+    return results
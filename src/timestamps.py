@@ -0,0 +1,69 @@
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+# Timestamp parsing and formatting shared by the forecast, RSS and calendar
+# sections.
+#
+# Instead of trying a cascade of strptime() formats, parse_timestamp() looks
+# at the shape of the string: ISO 8601 ("2026-01-15T08:30:00+00:00", as used
+# by CAP and the NWS) goes straight to datetime.fromisoformat(), anything
+# starting with a letter is treated as RFC 2822 (RSS pubDate).  Output
+# formats are looked up once per (style, time system).
+
+# style -> (24-hour format, 12-hour format)
+_OUTPUT_FORMATS = {
+    "alert": ("%Y-%m-%d %H:%M %Z", "%Y-%m-%d %I:%M %p %Z"),
+    "time": ("%H:%M", "%-I:%M %p"),
+    "datetime": ("%H:%M on %A, %B %d, %Y", "%-I:%M %p on %A, %B %d, %Y"),
+}
+
+
+@lru_cache(maxsize=None)
+def output_format(time_system, style="alert"):
+    """strftime format for a style ("alert", "time" or "datetime") in 24HR or 12HR."""
+    twenty_four, twelve = _OUTPUT_FORMATS[style]
+    return twelve if str(time_system).upper() == "12HR" else twenty_four
+
+
+def _parse(ts):
+    """(datetime or None, whether the string is ISO 8601)."""
+    if _is_iso_shaped(ts):
+        try:
+            return datetime.fromisoformat(ts), True
+        except ValueError:
+            return None, True
+    try:
+        return parsedate_to_datetime(ts), False
+    except (TypeError, ValueError, IndexError):
+        return None, False
+
+
+def _is_iso_shaped(ts):
+    return len(ts) >= 10 and ts[4] == "-" and ts[7] == "-" and ts[:4].isdigit()
+
+
+def parse_timestamp(ts):
+    """
+    Parse an ISO 8601 or RFC 2822 timestamp.  Returns a datetime (aware when
+    the string carries an offset), or None when the string is neither.
+    """
+    if not ts:
+        return None
+    return _parse(ts.strip())[0]
+
+
+def format_timestamp(ts, time_system, timezone, style="alert"):
+    """
+    Format a timestamp string in the user's time system and timezone.
+    Returns "" for an empty string and the raw string if it can't be parsed.
+    """
+    if not ts:
+        return ""
+    dt, is_iso = _parse(ts.strip())
+    if dt is None:
+        return ts
+    if dt.tzinfo is not None or not is_iso:
+        # RFC 2822 without an offset ("-0000") is naive and taken as local time
+        dt = dt.astimezone(timezone)
+    return dt.strftime(output_format(time_system, style))
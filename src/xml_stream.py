@@ -0,0 +1,45 @@
+import io
+import xml.etree.ElementTree as ET
+
+# Streaming access to large XML feeds.
+#
+# ET.fromstring() holds the whole document tree in memory.  iter_elements()
+# instead parses incrementally from a file-like object (e.g. a streamed HTTP
+# response), hands over each completed element of interest and then detaches
+# it from the tree, so peak memory is bounded by the largest single element
+# rather than the size of the feed.
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_elements(source, tag, limit=None):
+    """
+    Yield every complete <tag> element (namespace-agnostic) from `source`,
+    which may be bytes or a binary file-like object.
+
+    Each element is removed from its parent once the caller has finished
+    with it, so callers must extract what they need before asking for the
+    next one.  Parsing stops after `limit` elements, without reading the
+    rest of the stream.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    stack = []
+    count = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if _local_name(elem.tag) != tag:
+            continue
+        yield elem
+        if stack:
+            stack[-1].remove(elem)
+        elem.clear()
+        count += 1
+        if limit is not None and count >= limit:
+            return
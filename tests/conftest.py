@@ -1,5 +1,18 @@
 import sys
 import os
 
+import pytest
+
 # Make src/ importable without a package install
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import circuit_breaker  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _isolated_circuit_breakers(tmp_path, monkeypatch):
+    """Every test starts with closed breakers and never touches ./cache."""
+    monkeypatch.setattr(circuit_breaker, "CIRCUIT_STATE_PATH", str(tmp_path / "circuit_breakers.json"))
+    circuit_breaker.clear()
+    yield
+    circuit_breaker.clear()
@@ -0,0 +1,96 @@
+"""Tests for src/calendar_event.py — the slotted Event passed through the calendar pipeline."""
+
+import pickle
+from datetime import date, datetime
+
+import pytest
+import pytz
+
+from calendar_event import Event
+
+TZ = pytz.timezone("America/New_York")
+
+
+# ── localize ───────────────────────────────────────────────────────────────────
+
+class TestLocalize:
+    def test_all_day_dates_become_midnight_in_the_timezone(self):
+        event = Event(date(2026, 3, 10), date(2026, 3, 11)).localize(TZ)
+        assert event.all_day is True
+        assert event.start == TZ.localize(datetime(2026, 3, 10))
+        assert event.end == TZ.localize(datetime(2026, 3, 11))
+
+    def test_floating_times_are_localized_and_aware_times_converted(self):
+        event = Event(datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 15, tzinfo=pytz.UTC)).localize(TZ)
+        assert event.all_day is False
+        assert event.start == TZ.localize(datetime(2026, 3, 10, 9))
+        assert (event.end.hour, event.end.tzinfo.zone) == (11, "America/New_York")
+
+    def test_aware_time_in_the_same_timezone_is_unchanged(self):
+        start = TZ.localize(datetime(2026, 3, 10, 9))
+        event = Event(start, start).localize(TZ)
+        assert event.start == start and event.start.tzinfo.zone == "America/New_York"
+
+    def test_localizing_twice_in_the_same_timezone_keeps_the_values(self):
+        event = Event(datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10)).localize(TZ)
+        start = event.start
+        assert event.localize(TZ).start is start
+
+    def test_setting_start_recomputes_all_day(self):
+        event = Event(datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10)).localize(TZ)
+        event["start"] = date(2026, 3, 10)
+        assert event.all_day is True
+        assert event.localize(TZ).start == TZ.localize(datetime(2026, 3, 10))
+
+
+# ── occurs_on ──────────────────────────────────────────────────────────────────
+
+class TestOccursOn:
+    def test_all_day_end_date_is_exclusive(self):
+        event = Event(date(2026, 3, 10), date(2026, 3, 11)).localize(TZ)
+        assert event.occurs_on(date(2026, 3, 10))
+        assert not event.occurs_on(date(2026, 3, 11))
+
+    def test_day_is_taken_in_the_localized_timezone(self):
+        # 02:00 UTC on the 11th is 22:00 on the 10th in New York
+        event = Event(datetime(2026, 3, 11, 2, tzinfo=pytz.UTC), datetime(2026, 3, 11, 3, tzinfo=pytz.UTC))
+        assert event.localize(TZ).occurs_on(date(2026, 3, 10))
+
+    def test_events_on_other_days(self):
+        event = Event(datetime(2026, 3, 10, 10), datetime(2026, 3, 10, 11)).localize(TZ)
+        assert event.occurs_on(date(2026, 3, 10))
+        assert not event.occurs_on(date(2026, 3, 9))
+        assert not event.occurs_on(date(2026, 3, 11))
+
+    def test_multi_day_event_covers_the_days_between(self):
+        event = Event(datetime(2026, 3, 9, 18), datetime(2026, 3, 11, 9)).localize(TZ)
+        assert event.occurs_on(date(2026, 3, 10))
+
+
+# ── dict compatibility ─────────────────────────────────────────────────────────
+
+class TestDictAccess:
+    def test_item_access_and_get(self):
+        event = Event(date(2026, 3, 10), date(2026, 3, 11), "Holiday", uid="h1")
+        assert event["summary"] == "Holiday"
+        assert event.get("location") is None
+        assert event.get("unknown", "default") == "default"
+        assert "start" in event and "unknown" not in event
+        with pytest.raises(KeyError):
+            event["unknown"]
+
+    def test_dict_conversion_and_equality(self):
+        event = Event(date(2026, 3, 10), date(2026, 3, 11), "Holiday", uid="h1")
+        assert dict(event)["uid"] == "h1"
+        assert set(dict(event)) == set(Event.FIELDS)
+        assert event == Event(date(2026, 3, 10), date(2026, 3, 11), "Holiday", uid="h1")
+
+    def test_has_no_instance_dict(self):
+        event = Event(date(2026, 3, 10), date(2026, 3, 11))
+        with pytest.raises(AttributeError):
+            event.extra = 1
+
+    def test_pickles(self):
+        event = Event(TZ.localize(datetime(2026, 3, 10, 9)), TZ.localize(datetime(2026, 3, 10, 10)), "Standup")
+        copy = pickle.loads(pickle.dumps(event))
+        assert copy == event and copy.all_day is False
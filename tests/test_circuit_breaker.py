@@ -0,0 +1,140 @@
+"""Tests for src/circuit_breaker.py and the fallbacks of the providers behind it."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import circuit_breaker
+import forecast_cache
+from get_forecast import _cached_json
+from get_qotd import get_qotd
+from http_client import get_with_retry
+
+URL = "https://api.open-meteo.com/v1/forecast?latitude=1"
+
+
+def _trip(url=URL):
+    for _ in range(circuit_breaker._FAILURE_THRESHOLD):
+        circuit_breaker.record_failure(url)
+
+
+def _ok(payload=None):
+    resp = MagicMock()
+    resp.raise_for_status.return_value = None
+    resp.json.return_value = payload
+    return resp
+
+
+# ── state machine ──────────────────────────────────────────────────────────────
+
+class TestStateMachine:
+    def test_closed_by_default(self):
+        assert circuit_breaker.allow(URL)
+
+    def test_opens_after_threshold_failures(self):
+        for _ in range(circuit_breaker._FAILURE_THRESHOLD - 1):
+            circuit_breaker.record_failure(URL)
+        assert circuit_breaker.allow(URL)
+        circuit_breaker.record_failure(URL)
+        assert not circuit_breaker.allow(URL)
+
+    def test_breakers_are_per_host(self):
+        _trip()
+        assert circuit_breaker.allow("https://air-quality-api.open-meteo.com/v1/air-quality")
+
+    def test_success_resets_failure_count(self):
+        for _ in range(circuit_breaker._FAILURE_THRESHOLD - 1):
+            circuit_breaker.record_failure(URL)
+        circuit_breaker.record_success(URL)
+        circuit_breaker.record_failure(URL)
+        assert circuit_breaker.allow(URL)
+
+    def test_half_open_admits_single_probe_after_cooldown(self, monkeypatch):
+        _trip()
+        monkeypatch.setattr(circuit_breaker, "_COOLDOWN_SECONDS", 0)
+        assert circuit_breaker.allow(URL)
+        monkeypatch.setattr(circuit_breaker, "_COOLDOWN_SECONDS", 300)
+        assert not circuit_breaker.allow(URL)  # probe still in flight
+        assert circuit_breaker.breaker_status()["api.open-meteo.com"]["state"] == circuit_breaker.HALF_OPEN
+
+    def test_successful_probe_closes(self, monkeypatch):
+        _trip()
+        monkeypatch.setattr(circuit_breaker, "_COOLDOWN_SECONDS", 0)
+        assert circuit_breaker.allow(URL)
+        circuit_breaker.record_success(URL)
+        assert circuit_breaker.breaker_status()["api.open-meteo.com"]["state"] == circuit_breaker.CLOSED
+
+    def test_failed_probe_reopens(self, monkeypatch):
+        _trip()
+        monkeypatch.setattr(circuit_breaker, "_COOLDOWN_SECONDS", 0)
+        assert circuit_breaker.allow(URL)
+        circuit_breaker.record_failure(URL)
+        monkeypatch.setattr(circuit_breaker, "_COOLDOWN_SECONDS", 300)
+        assert not circuit_breaker.allow(URL)
+        assert circuit_breaker.breaker_status()["api.open-meteo.com"]["state"] == circuit_breaker.OPEN
+
+    def test_state_persists_across_restart(self):
+        _trip()
+        circuit_breaker.clear()
+        assert not circuit_breaker.allow(URL)
+        assert circuit_breaker.breaker_status()["api.open-meteo.com"]["retry_at"] is not None
+
+    def test_guard_ignores_non_host_errors(self):
+        not_found = MagicMock(status_code=404)
+        for _ in range(circuit_breaker._FAILURE_THRESHOLD):
+            with pytest.raises(requests.HTTPError):
+                with circuit_breaker.guard(URL):
+                    raise requests.HTTPError("404", response=not_found)
+        assert circuit_breaker.allow(URL)
+
+
+# ── retry helper and fallbacks ─────────────────────────────────────────────────
+
+class TestFallbacks:
+    def test_open_breaker_skips_request(self):
+        _trip()
+        with patch("http_client.requests.get") as mock_get:
+            with pytest.raises(circuit_breaker.CircuitOpenError):
+                get_with_retry(URL)
+        mock_get.assert_not_called()
+
+    def test_retry_ladder_stops_once_breaker_opens(self):
+        calls = []
+
+        def fake_get(url, **kwargs):
+            calls.append(url)
+            raise requests.ConnectionError("refused")
+
+        with patch("http_client.requests.get", side_effect=fake_get), patch("http_client.time.sleep"):
+            with pytest.raises(requests.ConnectionError):
+                get_with_retry(URL, initial_retry_delay=0.01, max_retry_delay=0.01)
+        assert len(calls) == circuit_breaker._FAILURE_THRESHOLD
+
+    def test_forecast_falls_back_to_stale_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(forecast_cache, "FORECAST_CACHE_DIR", str(tmp_path))
+        forecast_cache.clear()
+        monkeypatch.setattr(forecast_cache, "_expiry", lambda now: now - 1)
+        forecast_cache.put("key", {"stale": True})
+        forecast_cache.clear()
+        _trip()
+        assert _cached_json("key", URL, 10) == {"stale": True}
+        forecast_cache.clear()
+
+    def test_forecast_without_cache_still_fails(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(forecast_cache, "FORECAST_CACHE_DIR", str(tmp_path))
+        forecast_cache.clear()
+        _trip()
+        with pytest.raises(circuit_breaker.CircuitOpenError):
+            _cached_json("missing", URL, 10)
+
+    def test_qotd_placeholder_when_host_down(self):
+        _trip("https://zenquotes.io/api/today")
+        with patch("get_qotd.requests.get") as mock_get:
+            assert get_qotd() == ""
+        mock_get.assert_not_called()
+
+    def test_qotd_success_recorded(self):
+        with patch("get_qotd.requests.get", return_value=_ok([{"q": "Quote", "a": "Author"}])):
+            assert "Quote" in get_qotd()
+        assert circuit_breaker.breaker_status().get("zenquotes.io", {"state": "closed"})["state"] == "closed"
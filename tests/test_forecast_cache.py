@@ -0,0 +1,84 @@
+"""Tests for src/forecast_cache.py — grid snapping, keys and hourly expiry."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+import forecast_cache
+from forecast_cache import cache_key, grid_degrees, snap_to_grid
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_cache, "FORECAST_CACHE_DIR", str(tmp_path))
+    forecast_cache.clear()
+    yield
+    forecast_cache.clear()
+
+
+# ── snap_to_grid / grid_degrees ────────────────────────────────────────────────
+
+class TestSnapToGrid:
+    def test_rounds_to_grid(self):
+        assert snap_to_grid(40.7128, -74.0060, 0.05) == (40.7, -74.0)
+
+    def test_zero_grid_keeps_coordinates(self):
+        assert snap_to_grid("40.71284", "-74.00601", 0) == (40.7128, -74.006)
+
+    def test_nearby_points_share_cell(self):
+        assert snap_to_grid(51.501, -0.142, 0.05) == snap_to_grid(51.509, -0.129, 0.05)
+
+    def test_grid_degrees_parses_and_defaults(self):
+        assert grid_degrees("0.1") == 0.1
+        assert grid_degrees("") == forecast_cache.DEFAULT_GRID_DEGREES
+        assert grid_degrees(None) == forecast_cache.DEFAULT_GRID_DEGREES
+        assert grid_degrees("-1") == 0.0
+
+
+# ── get / put ──────────────────────────────────────────────────────────────────
+
+class TestCacheEntries:
+    def test_round_trip(self):
+        key = cache_key("forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-15")
+        forecast_cache.put(key, {"daily": {}})
+        assert forecast_cache.get(key) == {"daily": {}}
+
+    def test_key_depends_on_local_date(self):
+        assert cache_key("forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-15") != cache_key(
+            "forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-16"
+        )
+
+    def test_expires_at_top_of_hour(self):
+        key = cache_key("forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-15")
+        fetched_at = 1_768_474_500  # 10:55 UTC
+        with patch("forecast_cache.time.time", return_value=fetched_at):
+            forecast_cache.put(key, {"daily": {}})
+        with patch("forecast_cache.time.time", return_value=fetched_at + 240):
+            assert forecast_cache.get(key) is not None
+        with patch("forecast_cache.time.time", return_value=fetched_at + 301):
+            assert forecast_cache.get(key) is None
+
+    def test_ttl_caps_entries_early_in_the_hour(self):
+        key = cache_key("forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-15")
+        fetched_at = 1_768_471_200  # 10:00 UTC
+        with patch("forecast_cache.time.time", return_value=fetched_at):
+            forecast_cache.put(key, {"daily": {}})
+        with patch("forecast_cache.time.time", return_value=fetched_at + forecast_cache._FORECAST_CACHE_TTL_SECONDS + 1):
+            assert forecast_cache.get(key) is None
+
+    def test_missing_entry(self):
+        assert forecast_cache.get("nope") is None
+
+    def test_entries_from_past_days_are_swept(self, tmp_path):
+        old_key = cache_key("forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-13")
+        forecast_cache.put(old_key, {"daily": {}})
+        two_days_ago = forecast_cache.time.time() - 2 * 24 * 60 * 60
+        os.utime(tmp_path / f"{old_key}.json", (two_days_ago, two_days_ago))
+        recent_key = cache_key("forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-14")
+        forecast_cache.put(recent_key, {"daily": {}})
+
+        forecast_cache.clear()  # allow the next put() to sweep
+        forecast_cache.put(cache_key("forecast", 40.7, -74.0, "METRIC", "UTC", "2026-01-15"), {"daily": {}})
+        assert not (tmp_path / f"{old_key}.json").exists()
+        assert (tmp_path / f"{recent_key}.json").exists()
@@ -0,0 +1,78 @@
+"""Tests for src/generate_summary.py — client reuse and the persistent summary cache."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import generate_summary
+from generate_summary import generate_summary as summarize
+
+
+def _completion(content):
+    completion = MagicMock()
+    completion.choices[0].message.content = content
+    return completion
+
+
+@pytest.fixture
+def openai_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_summary, "SUMMARY_CACHE_PATH", str(tmp_path / "summary_cache.json"))
+    monkeypatch.setattr(generate_summary, "_clients", {})
+    client = MagicMock()
+    client.chat.completions.create.return_value = _completion("Sunny day, two meetings.")
+    with patch("generate_summary.OpenAI", return_value=client) as mock_cls:
+        yield client, mock_cls
+
+
+# ── generate_summary ───────────────────────────────────────────────────────────
+
+class TestGenerateSummary:
+    def test_formats_completion(self, openai_client):
+        assert summarize("weather and tasks", "key") == "# Summary\n\nSunny day, two meetings.\n\n"
+
+    def test_identical_input_skips_model(self, openai_client):
+        client, _ = openai_client
+        first = summarize("weather  and\ntasks", "key")
+        second = summarize("weather and tasks", "key")
+        assert first == second
+        assert client.chat.completions.create.call_count == 1
+
+    def test_different_input_calls_model(self, openai_client):
+        client, _ = openai_client
+        summarize("monday", "key")
+        summarize("tuesday", "key")
+        assert client.chat.completions.create.call_count == 2
+
+    def test_client_reused_across_calls(self, openai_client):
+        _, mock_cls = openai_client
+        summarize("monday", "key")
+        summarize("tuesday", "key")
+        assert mock_cls.call_count == 1
+
+    def test_expired_entry_is_regenerated(self, openai_client, monkeypatch):
+        client, _ = openai_client
+        summarize("monday", "key")
+        monkeypatch.setattr(generate_summary, "_SUMMARY_CACHE_TTL_SECONDS", 0)
+        summarize("monday", "key")
+        assert client.chat.completions.create.call_count == 2
+
+    def test_prompt_version_changes_key(self, openai_client, monkeypatch):
+        key = generate_summary._cache_key("monday")
+        monkeypatch.setattr(generate_summary, "_SUMMARY_PROMPT_VERSION", 2)
+        assert generate_summary._cache_key("monday") != key
+
+    def test_failure_is_not_cached(self, openai_client):
+        client, _ = openai_client
+        client.chat.completions.create.side_effect = RuntimeError("boom")
+        assert summarize("monday", "key") is None
+        client.chat.completions.create.side_effect = None
+        assert summarize("monday", "key") is not None
+        assert client.chat.completions.create.call_count == 2
+
+    def test_cache_is_capped(self, openai_client, monkeypatch):
+        monkeypatch.setattr(generate_summary, "_SUMMARY_CACHE_MAX_ENTRIES", 2)
+        for day in ["monday", "tuesday", "wednesday"]:
+            summarize(day, "key")
+        with open(generate_summary.SUMMARY_CACHE_PATH) as f:
+            assert len(json.load(f)) == 2
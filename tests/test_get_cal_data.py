@@ -1,9 +1,15 @@
-"""Tests for src/get_cal_data.py — ensure_datetime, localize_or_convert, handle_all_day_event."""
+"""Tests for src/get_cal_data.py — ensure_datetime, localize_or_convert, handle_all_day_event, deduplicate_events,
+get_cal_data."""
 
 import pytz
 from datetime import datetime, date, timedelta
+from unittest.mock import patch
 
-from get_cal_data import ensure_datetime, localize_or_convert, handle_all_day_event
+import request_budget
+from calendar_event import Event
+from get_cal_data import (
+    deduplicate_events, ensure_datetime, get_cal_data, localize_or_convert, handle_all_day_event,
+)
 
 
 # ── ensure_datetime ────────────────────────────────────────────────────────────
@@ -69,3 +75,64 @@ class TestHandleAllDayEvent:
         end = datetime(2026, 1, 17, 0, 0, tzinfo=pytz.UTC)
         result = handle_all_day_event(self._make_event(start, end))
         assert "January 16, 2026" in result
+
+
+# ── deduplicate_events ─────────────────────────────────────────────────────────
+
+class TestDeduplicateEvents:
+    TZ = pytz.timezone("America/New_York")
+
+    def _event(self, summary, hour=9, uid=None, recurrence_id=None, description=None):
+        start = self.TZ.localize(datetime(2026, 1, 15, hour))
+        return Event(start, start + timedelta(hours=1), summary, uid=uid, description=description,
+                     recurrence_id=recurrence_id)
+
+    def test_same_uid_from_two_sources_keeps_the_preferred_copy(self):
+        webcal = self._event("Busy", uid="e1")
+        caldav = self._event("Design review", uid="e1", description="Agenda")
+        merged = deduplicate_events({"webcal": [webcal], "caldav": [caldav]})
+        assert merged == [caldav]
+        assert deduplicate_events({"webcal": [webcal], "caldav": [caldav]}, "webcal,caldav") == [webcal]
+
+    def test_occurrences_of_a_series_are_kept_apart(self):
+        first = self._event("Standup", 9, uid="s", recurrence_id=datetime(2026, 1, 15, 9))
+        second = self._event("Standup", 9, uid="s", recurrence_id=datetime(2026, 1, 16, 9))
+        assert len(deduplicate_events({"webcal": [first, second]})) == 2
+
+    def test_events_without_uid_match_on_normalized_summary_and_times(self):
+        a = self._event("Lunch  with Sam")
+        b = self._event("lunch with sam")
+        later = self._event("Lunch with Sam", hour=13)
+        assert deduplicate_events({"webcal": [a], "caldav": [b, later]}) == [b, later]
+
+    def test_floating_and_zoned_copies_without_uid_match(self):
+        floating = Event(datetime(2026, 1, 15, 9), datetime(2026, 1, 15, 10), "Dentist")
+        zoned = Event(
+            pytz.UTC.localize(datetime(2026, 1, 15, 14)), pytz.UTC.localize(datetime(2026, 1, 15, 15)), "Dentist"
+        )
+        assert deduplicate_events({"webcal": [floating], "caldav": [zoned]}, timezone=self.TZ) == [zoned]
+
+    def test_duplicate_invite_in_two_feeds_is_listed_once(self):
+        invite = self._event("Offsite", uid="invite-1")
+        assert deduplicate_events({"webcal": [invite, self._event("Offsite", uid="invite-1")]}) == [invite]
+
+    def test_unnamed_sources_follow_the_named_ones(self):
+        other = self._event("Other", uid="x")
+        webcal = self._event("Webcal", uid="x")
+        assert deduplicate_events({"other": [other], "webcal": [webcal]}, "webcal") == [webcal]
+
+
+# ── get_cal_data ───────────────────────────────────────────────────────────────
+
+class TestGetCalData:
+    def test_feed_workers_see_the_request_budget(self):
+        seen = []
+
+        def fake_get_ics_events(link, timezone, use_index):
+            seen.append(request_budget.current())
+            return []
+
+        with patch("get_cal_data.get_ics_events", side_effect=fake_get_ics_events):
+            with request_budget.request_budget(30) as budget:
+                get_cal_data("https://a.example/cal.ics,https://b.example/cal.ics", pytz.UTC, "24HR")
+        assert seen == [budget, budget]
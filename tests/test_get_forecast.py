@@ -7,23 +7,44 @@ Covers:
   - _get_with_timeout_retry — HTTP retry logic (including recent fixes)
   - Outfit suggestions — temperature tiers, morning-low note, wind tiers,
                          precipitation codes (via mocked get_forecast())
+  - Concurrent fetch   — forecast/AQI/alerts overlap and degrade independently
+  - Forecast cache     — repeated and nearby requests served without network
+  - Outlook            — N-day / weekend table from the same payload
+  - Hourly outlook     — rain windows, warmest hour and the compact timeline
+  - Batched forecasts  — many locations in one open-meteo request per chunk
 """
 
+import threading
 import pytest
 import requests
 import pytz
 from datetime import datetime as real_datetime
 from unittest.mock import patch, MagicMock
 
+import forecast_cache
 from get_forecast import (
     _strip_html,
     _fmt_timestamp,
+    _format_hourly_outlook,
+    _format_outlook,
     _get_with_timeout_retry,
+    _outlook_indices,
+    _rain_windows,
     get_forecast,
+    prefetch_forecasts,
 )
 
 # ── Shared test fixtures ───────────────────────────────────────────────────────
 
+@pytest.fixture(autouse=True)
+def _isolated_forecast_cache(tmp_path, monkeypatch):
+    """Each test starts with an empty forecast cache in its own directory."""
+    monkeypatch.setattr(forecast_cache, "FORECAST_CACHE_DIR", str(tmp_path / "forecast"))
+    forecast_cache.clear()
+    yield
+    forecast_cache.clear()
+
+
 FIXED_DATE = "2026-01-15"
 FIXED_TZ = pytz.UTC
 
@@ -70,14 +91,10 @@ def _run_forecast(max_temp, min_temp, wind_speed=5, weathercode=0, unit_system="
     """
     weather_json = _make_weather_json(max_temp, min_temp, wind_speed, weathercode)
 
-    call_count = 0
-
     def fake_retry(url, **kwargs):
-        nonlocal call_count
-        call_count += 1
         resp = MagicMock()
-        # First call → weather; second call → AQI (empty is fine)
-        resp.json.return_value = weather_json if call_count == 1 else {}
+        # Forecast and AQI are fetched concurrently, so route by URL (empty AQI is fine)
+        resp.json.return_value = {} if "air-quality" in url else weather_json
         return resp
 
     with (
@@ -386,3 +403,362 @@ class TestOutfitSuggestionsMetric:
         # max=15 > chilly(10), min=5 <= chilly(10)
         result = _run_forecast(max_temp=15, min_temp=5, unit_system="METRIC")
         assert "Temperatures drop to" in result
+
+
+# ── Concurrent fetch ───────────────────────────────────────────────────────────
+
+def _call_get_forecast():
+    return get_forecast(
+        latitude=40.7128,
+        longitude=-74.0060,
+        country_code="us",
+        city_state_str="New York, NY",
+        unit_system="IMPERIAL",
+        time_system="12HR",
+        timezone=FIXED_TZ,
+        version="test",
+    )
+
+
+class TestConcurrentFetch:
+    def _patches(self, fake_retry, fake_alerts=lambda *args: ""):
+        return (
+            patch("get_forecast._get_with_timeout_retry", side_effect=fake_retry),
+            patch("get_forecast.datetime", _FixedDatetime),
+            patch("get_forecast._fetch_alerts_us", side_effect=fake_alerts),
+        )
+
+    def test_requests_overlap(self):
+        weather_json = _make_weather_json(70, 55)
+        barrier = threading.Barrier(2, timeout=2)
+
+        def fake_retry(url, **kwargs):
+            barrier.wait()  # both requests must be in flight at once
+            resp = MagicMock()
+            resp.json.return_value = {} if "air-quality" in url else weather_json
+            return resp
+
+        p1, p2, p3 = self._patches(fake_retry)
+        with p1, p2, p3:
+            result = _call_get_forecast()
+        assert "Failed to retrieve" not in result
+
+    def test_aqi_failure_does_not_drop_forecast(self):
+        weather_json = _make_weather_json(70, 55)
+
+        def fake_retry(url, **kwargs):
+            if "air-quality" in url:
+                raise requests.exceptions.ConnectionError("down")
+            resp = MagicMock()
+            resp.json.return_value = weather_json
+            return resp
+
+        p1, p2, p3 = self._patches(fake_retry)
+        with p1, p2, p3:
+            result = _call_get_forecast()
+        assert "Failed to retrieve" not in result
+
+    def test_slow_alerts_miss_deadline(self):
+        weather_json = _make_weather_json(70, 55)
+        release = threading.Event()
+
+        def fake_retry(url, **kwargs):
+            resp = MagicMock()
+            resp.json.return_value = {} if "air-quality" in url else weather_json
+            return resp
+
+        def slow_alerts(*args):
+            release.wait(2)
+            return "**Tornado Warning**"
+
+        p1, p2, p3 = self._patches(fake_retry, slow_alerts)
+        with p1, p2, p3, patch("get_forecast._ALERTS_DEADLINE_SECONDS", 0.05):
+            result = _call_get_forecast()
+        release.set()
+        assert "Tornado Warning" not in result
+        assert "Failed to retrieve" not in result
+
+    def test_forecast_failure_reported(self):
+        def fake_retry(url, **kwargs):
+            raise requests.exceptions.ConnectionError("down")
+
+        p1, p2, p3 = self._patches(fake_retry)
+        with p1, p2, p3:
+            result = _call_get_forecast()
+        assert result.startswith("Failed to retrieve forecast data")
+
+
+# ── Forecast cache ─────────────────────────────────────────────────────────────
+
+class TestForecastCaching:
+    def _counting_retry(self, urls):
+        weather_json = _make_weather_json(70, 55)
+
+        def fake_retry(url, **kwargs):
+            urls.append(url)
+            resp = MagicMock()
+            resp.json.return_value = {} if "air-quality" in url else weather_json
+            return resp
+
+        return fake_retry
+
+    def _forecast_at(self, fake_retry, latitude, longitude, unit_system="IMPERIAL"):
+        with (
+            patch("get_forecast._get_with_timeout_retry", side_effect=fake_retry),
+            patch("get_forecast.datetime", _FixedDatetime),
+            patch("get_forecast._fetch_alerts_us", return_value=""),
+        ):
+            return get_forecast(
+                latitude, longitude, "us", "New York, NY", unit_system, "12HR", FIXED_TZ, "test"
+            )
+
+    def test_repeat_request_served_from_cache(self):
+        urls = []
+        fake_retry = self._counting_retry(urls)
+        first = self._forecast_at(fake_retry, 40.7128, -74.0060)
+        second = self._forecast_at(fake_retry, 40.7128, -74.0060)
+        assert first == second
+        assert len(urls) == 2  # one forecast + one AQI download
+
+    def test_nearby_point_shares_grid_cell(self):
+        urls = []
+        fake_retry = self._counting_retry(urls)
+        self._forecast_at(fake_retry, 40.7128, -74.0060)
+        self._forecast_at(fake_retry, 40.7201, -74.0011)
+        assert len(urls) == 2
+        assert "latitude=40.7&longitude=-74.0" in urls[0]
+
+    def test_unit_system_is_part_of_key(self):
+        urls = []
+        fake_retry = self._counting_retry(urls)
+        self._forecast_at(fake_retry, 40.7128, -74.0060, "IMPERIAL")
+        self._forecast_at(fake_retry, 40.7128, -74.0060, "METRIC")
+        forecast_urls = [u for u in urls if "air-quality" not in u]
+        assert len(forecast_urls) == 2
+
+    def test_disk_entry_survives_memory_clear(self):
+        urls = []
+        fake_retry = self._counting_retry(urls)
+        self._forecast_at(fake_retry, 40.7128, -74.0060)
+        forecast_cache.clear()
+        self._forecast_at(fake_retry, 40.7128, -74.0060)
+        assert len(urls) == 2
+
+
+# ── Outlook ────────────────────────────────────────────────────────────────────
+
+def _week_json():
+    """Seven-day payload starting on FIXED_DATE (a Thursday)."""
+    days = [f"2026-01-{d}" for d in range(15, 22)]
+    return {
+        "daily": {
+            "time": days,
+            "temperature_2m_max": [10 + i for i in range(7)],
+            "temperature_2m_min": [0 + i for i in range(7)],
+            "apparent_temperature_max": [10] * 7,
+            "apparent_temperature_min": [0] * 7,
+            "precipitation_sum": [0.0, 1.5, 0.0, 0.0, 0.0, 0.0, 0.0],
+            "windspeed_10m_max": [5] * 7,
+            "uv_index_max": [3] * 7,
+            "sunrise": [f"{d}T07:00" for d in days],
+            "sunset": [f"{d}T17:00" for d in days],
+            "weathercode": [0, 61, 0, 3, 0, 0, 0],
+        },
+        "hourly": {"time": [], "relativehumidity_2m": []},
+    }
+
+
+class TestOutlook:
+    def test_indices_for_n_days(self):
+        dates = _week_json()["daily"]["time"]
+        assert _outlook_indices(dates, 0, "3") == [1, 2, 3]
+        assert _outlook_indices(dates, 0, 10) == [1, 2, 3, 4, 5, 6]
+
+    # Sixteen days from Thursday 15th: weekends at 2-3 (17th/18th) and 9-10 (24th/25th)
+    FORTNIGHT = [f"2026-01-{d}" for d in range(15, 31)]
+
+    def test_indices_for_weekend(self):
+        assert _outlook_indices(self.FORTNIGHT, 0, "weekend") == [2, 3]  # Sat 17th, Sun 18th
+
+    def test_weekend_on_friday_is_the_coming_pair(self):
+        assert _outlook_indices(self.FORTNIGHT, 1, "WEEKEND") == [2, 3]
+
+    def test_weekend_on_saturday_is_today_and_tomorrow(self):
+        assert _outlook_indices(self.FORTNIGHT, 2, "WEEKEND") == [2, 3]
+
+    def test_weekend_on_sunday_is_only_today(self):
+        assert _outlook_indices(self.FORTNIGHT, 3, "WEEKEND") == [3]
+
+    def test_weekend_cut_off_by_the_forecast_range(self):
+        assert _outlook_indices(self.FORTNIGHT[:3], 0, "WEEKEND") == [2]
+        assert _outlook_indices(self.FORTNIGHT[:2], 0, "WEEKEND") == []
+
+    def test_disabled_values(self):
+        dates = _week_json()["daily"]["time"]
+        for value in (None, "", "0", "nonsense"):
+            assert _outlook_indices(dates, 0, value) == []
+
+    def test_outlook_rendered_from_same_payload(self):
+        urls = []
+
+        def fake_retry(url, **kwargs):
+            urls.append(url)
+            resp = MagicMock()
+            resp.json.return_value = {} if "air-quality" in url else _week_json()
+            return resp
+
+        with (
+            patch("get_forecast._get_with_timeout_retry", side_effect=fake_retry),
+            patch("get_forecast.datetime", _FixedDatetime),
+            patch("get_forecast._fetch_alerts_us", return_value=""),
+        ):
+            result = get_forecast(
+                40.7128, -74.0060, "us", "New York, NY", "METRIC", "24HR", FIXED_TZ, "test", outlook="2"
+            )
+        assert len(urls) == 2
+        assert "## Outlook" in result
+        assert "Fri Jan 16" in result and "Slight rain" in result
+        assert "Sat Jan 17" in result
+        assert "Sun Jan 18" not in result
+
+    def test_missing_values_render_as_not_available(self):
+        daily = _week_json()["daily"]
+        daily["temperature_2m_max"][1] = None
+        daily["precipitation_sum"][1] = None
+        table = _format_outlook(daily, [1, 2], {"temp_unit": "°C", "precip_unit": "mm"})
+        assert "None" not in table
+        assert "1°C to n/a" in table
+        assert "n/a  " in table.splitlines()[1]
+
+    def test_no_outlook_by_default(self):
+        result = _run_forecast(max_temp=70, min_temp=55)
+        assert "Outlook" not in result
+
+
+# ── Hourly rain windows / timeline ─────────────────────────────────────────────
+
+HOURS = [f"{FIXED_DATE}T{h:02d}:00" for h in range(24)] + [f"2026-01-16T{h:02d}:00" for h in range(24)]
+
+
+class TestRainWindows:
+    def test_contiguous_runs_with_peak(self):
+        probs = [0] * 13 + [55, 70, 80, 40] + [0] * 7 + [0] * 24
+        assert _rain_windows(HOURS, probs, 0, 24) == [
+            (f"{FIXED_DATE}T13:00", f"{FIXED_DATE}T16:00", 80)
+        ]
+
+    def test_run_until_end_of_day(self):
+        probs = [0] * 22 + [60, 90] + [100] * 24
+        windows = _rain_windows(HOURS, probs, 0, 24)
+        assert windows == [(f"{FIXED_DATE}T22:00", "2026-01-16T00:00", 90)]
+
+    def test_nulls_and_dry_day(self):
+        assert _rain_windows(HOURS, [None] * 48, 0, 24) == []
+        assert _rain_windows(HOURS, [], 0, 24) == []
+
+
+class TestHourlyOutlook:
+    def _hourly(self):
+        temps = [10 + h for h in range(15)] + [24 - (h - 15) for h in range(15, 24)] + [0] * 24
+        probs = [0] * 13 + [55, 70, 80, 40] + [0] * 7 + [0] * 24
+        return {"time": HOURS, "temperature_2m": temps, "precipitation_probability": probs}
+
+    def test_lines_and_timeline_24hr(self):
+        result = _format_hourly_outlook(self._hourly(), 0, 24, "°C", "24HR")
+        assert "Rain Likely: 13:00 to 16:00 (up to 80%)" in result
+        assert "Warmest: 24°C at 14:00" in result
+        assert "06    09    12    15    18    21" in result
+        assert "Rain     0%    0%    0%   80%    0%    0%" in result
+
+    def test_12hr_labels(self):
+        result = _format_hourly_outlook(self._hourly(), 0, 24, "°F", "12HR")
+        assert "Rain Likely: 1:00 PM to 4:00 PM" in result
+        assert "3pm" in result
+
+    def test_missing_series_renders_nothing(self):
+        assert _format_hourly_outlook({"time": HOURS}, 0, 24, "°C", "24HR") == ""
+
+    def test_included_in_forecast(self):
+        weather_json = _make_weather_json(70, 55)
+        weather_json["hourly"].update(
+            temperature_2m=[50 + h for h in range(24)],
+            precipitation_probability=[0] * 16 + [75] * 8,
+        )
+
+        def fake_retry(url, **kwargs):
+            resp = MagicMock()
+            resp.json.return_value = {} if "air-quality" in url else weather_json
+            return resp
+
+        with (
+            patch("get_forecast._get_with_timeout_retry", side_effect=fake_retry),
+            patch("get_forecast.datetime", _FixedDatetime),
+            patch("get_forecast._fetch_alerts_us", return_value=""),
+        ):
+            result = _call_get_forecast()
+        assert "Rain Likely: 4:00 PM to midnight (up to 75%)" in result
+        assert "Warmest: 73°F at 11:00 PM" in result
+
+
+# ── Batched forecasts ──────────────────────────────────────────────────────────
+
+class TestBatchedForecasts:
+    LOCATIONS = [
+        (40.7128, -74.0060, "us", "New York, NY", FIXED_TZ),
+        (34.0522, -118.2437, "us", "Los Angeles, CA", FIXED_TZ),
+        (41.8781, -87.6298, "us", "Chicago, IL", FIXED_TZ),
+    ]
+
+    def _fake_retry(self, urls, weather_json):
+        def fake_retry(url, **kwargs):
+            urls.append(url)
+            count = len(url.split("latitude=")[1].split("&")[0].split(","))
+            payload = {} if "air-quality" in url else weather_json
+            resp = MagicMock()
+            resp.json.return_value = [payload] * count if count > 1 else payload
+            return resp
+
+        return fake_retry
+
+    def test_one_request_per_chunk(self):
+        urls = []
+        fake_retry = self._fake_retry(urls, _make_weather_json(70, 55))
+        with (
+            patch("get_forecast._get_with_timeout_retry", side_effect=fake_retry),
+            patch("get_forecast.datetime", _FixedDatetime),
+            patch("get_forecast._fetch_alerts_us", return_value=""),
+        ):
+            prefetch_forecasts([(lat, lon, cc, tz) for lat, lon, cc, _, tz in self.LOCATIONS], "IMPERIAL")
+            results = [
+                get_forecast(lat, lon, cc, city_state, "IMPERIAL", "12HR", tz, "test")
+                for lat, lon, cc, city_state, tz in self.LOCATIONS
+            ]
+        assert len(results) == 3
+        assert "Los Angeles, CA" in results[1]
+        assert len(urls) == 2  # one forecast + one AQI request for all three
+        assert "latitude=40.7,34.05,41.9" in urls[0]
+
+    def test_chunking(self):
+        urls = []
+        fake_retry = self._fake_retry(urls, _make_weather_json(70, 55))
+        with (
+            patch("get_forecast._get_with_timeout_retry", side_effect=fake_retry),
+            patch("get_forecast.datetime", _FixedDatetime),
+            patch("get_forecast._BATCH_CHUNK_SIZE", 2),
+        ):
+            requests_made = prefetch_forecasts(
+                [(lat, lon, cc, tz) for lat, lon, cc, _, tz in self.LOCATIONS], "IMPERIAL"
+            )
+        assert requests_made == 4  # 2 forecast chunks + 2 AQI chunks
+
+    def test_cached_locations_not_refetched(self):
+        urls = []
+        fake_retry = self._fake_retry(urls, _make_weather_json(70, 55))
+        locations = [(lat, lon, cc, tz) for lat, lon, cc, _, tz in self.LOCATIONS]
+        with (
+            patch("get_forecast._get_with_timeout_retry", side_effect=fake_retry),
+            patch("get_forecast.datetime", _FixedDatetime),
+        ):
+            prefetch_forecasts(locations, "IMPERIAL")
+            assert prefetch_forecasts(locations, "IMPERIAL") == 0
+        assert len(urls) == 2
@@ -0,0 +1,26 @@
+"""Tests for src/get_puzzles.py — the word search section."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from get_puzzles import get_puzzles
+
+
+def _word(text, coordinates):
+    return SimpleNamespace(text=text, coordinates=coordinates, direction=SimpleNamespace(name="E"))
+
+
+# ── word search ────────────────────────────────────────────────────────────────
+
+class TestWordSearch:
+    def test_words_the_generator_could_not_place_are_left_out(self):
+        placed = _word("CAT", [(1, 1), (1, 2), (1, 3)])
+        unplaced = _word("GIRAFFE", [])  # no room left in the grid
+        word_search = SimpleNamespace(
+            puzzle=[["C", "A", "T"]], words=[placed, unplaced], placed_words=[placed],
+            random_words=lambda *args, **kwargs: None,
+        )
+        with patch("get_puzzles.WordSearch", return_value=word_search):
+            puzzles, answers = get_puzzles()
+        assert "Cat" in puzzles and "Cat ((1, 1), E)" in answers
+        assert "Giraffe" not in puzzles and "Giraffe" not in answers
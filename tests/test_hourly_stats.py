@@ -0,0 +1,66 @@
+"""Tests for src/hourly_stats.py — day index and per-day series aggregation."""
+
+import pytest
+
+import hourly_stats
+from hourly_stats import daily_stats, day_index
+
+TIMES = [f"2026-01-15T{h:02d}:00" for h in range(24)] + [f"2026-01-16T{h:02d}:00" for h in range(24)]
+
+
+# ── day_index ──────────────────────────────────────────────────────────────────
+
+class TestDayIndex:
+    def test_offsets_per_date(self):
+        assert day_index(TIMES) == {"2026-01-15": (0, 24), "2026-01-16": (24, 48)}
+
+    def test_empty(self):
+        assert day_index([]) == {}
+
+
+# ── daily_stats ────────────────────────────────────────────────────────────────
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request):
+    if request.param and hourly_stats.np is None:
+        pytest.skip("NumPy not installed")
+    return request.param
+
+
+class TestDailyStats:
+    def test_min_max_mean_peak(self, use_numpy):
+        values = list(range(24)) + [10] * 24
+        stats = daily_stats({"time": TIMES, "aqi": values}, ["aqi"], use_numpy=use_numpy)
+        today = stats["2026-01-15"]["aqi"]
+        assert today["min"] == 0
+        assert today["max"] == 23
+        assert today["mean"] == pytest.approx(11.5)
+        assert today["peak_time"] == "2026-01-15T23:00"
+        assert stats["2026-01-16"]["aqi"]["mean"] == pytest.approx(10)
+
+    def test_peak_time_is_first_maximum(self, use_numpy):
+        values = [1, 5, 5] + [0] * 45
+        stats = daily_stats({"time": TIMES, "uv": values}, ["uv"], use_numpy=use_numpy)
+        assert stats["2026-01-15"]["uv"]["peak_time"] == "2026-01-15T01:00"
+
+    def test_null_readings_skipped(self, use_numpy):
+        values = [None] * 12 + [4] * 12 + [None] * 24
+        stats = daily_stats({"time": TIMES, "pm10": values}, ["pm10"], use_numpy=use_numpy)
+        assert stats["2026-01-15"]["pm10"]["mean"] == pytest.approx(4)
+        assert "pm10" not in stats["2026-01-16"]
+
+    def test_missing_series_left_out(self, use_numpy):
+        stats = daily_stats({"time": TIMES}, ["ozone"], use_numpy=use_numpy)
+        assert stats["2026-01-15"] == {}
+
+    def test_backends_agree(self):
+        if hourly_stats.np is None:
+            pytest.skip("NumPy not installed")
+        values = [(h * 37 % 11) + 0.3 for h in range(48)]
+        hourly = {"time": TIMES, "v": values}
+        fast = daily_stats(hourly, ["v"], use_numpy=True)
+        slow = daily_stats(hourly, ["v"], use_numpy=False)
+        for day in fast:
+            assert fast[day]["v"]["peak_time"] == slow[day]["v"]["peak_time"]
+            for field in ("min", "max", "mean"):
+                assert fast[day]["v"][field] == pytest.approx(slow[day]["v"][field])
@@ -0,0 +1,189 @@
+"""Tests for src/http_cassette.py: recording real responses and replaying them offline."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import httpx
+import pytest
+import requests
+
+import http_cassette
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        self.server.hits += 1
+        payload = json.dumps({"path": self.path, "hit": self.server.hits, "body": body}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-Upstream", "yes")
+        self.send_header("Set-Cookie", "session=cookie-secret")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    """A real local HTTP server; yields its base URL and stops it after the test."""
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    server.hits = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _uninstall():
+    yield
+    http_cassette.uninstall()
+
+
+def _record(directory, calls):
+    with http_cassette.cassette(http_cassette.RECORD, str(directory)):
+        return [call() for call in calls]
+
+
+# ── requests ───────────────────────────────────────────────────────────────────
+
+class TestRequests:
+    def test_replay_matches_recording_without_upstream(self, tmp_path, upstream):
+        server, url = upstream
+        recorded = _record(tmp_path, [lambda: requests.get(f"{url}/a", timeout=5)])[0]
+        server.shutdown()
+
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=0):
+            replayed = requests.get(f"{url}/a", timeout=5)
+        assert replayed.status_code == 200
+        assert replayed.json() == recorded.json()
+        assert replayed.headers["X-Upstream"] == "yes"
+
+    def test_streamed_body_readable_from_raw(self, tmp_path, upstream):
+        _, url = upstream
+        recorded = _record(tmp_path, [lambda: requests.get(f"{url}/feed", stream=True, timeout=5)])[0]
+        assert json.loads(recorded.raw.read())["path"] == "/feed"
+
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=0):
+            replayed = requests.get(f"{url}/feed", stream=True, timeout=5)
+        assert json.loads(replayed.raw.read())["path"] == "/feed"
+
+    def test_repeated_requests_replayed_in_order_then_last_repeats(self, tmp_path, upstream):
+        _, url = upstream
+        _record(tmp_path, [lambda: requests.get(f"{url}/n", timeout=5)] * 2)
+
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=0):
+            hits = [requests.get(f"{url}/n", timeout=5).json()["hit"] for _ in range(3)]
+        assert hits == [1, 2, 2]
+
+    def test_changed_body_falls_back_to_url(self, tmp_path, upstream):
+        _, url = upstream
+        _record(tmp_path, [lambda: requests.post(f"{url}/chat", data="recorded prompt", timeout=5)])
+
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=0):
+            replayed = requests.post(f"{url}/chat", data="today's prompt", timeout=5)
+        assert replayed.json()["body"] == "recorded prompt"
+
+    def test_unrecorded_request_fails_like_unreachable_host(self, tmp_path, upstream):
+        _, url = upstream
+        _record(tmp_path, [])
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path)):
+            with pytest.raises(requests.ConnectionError, match="no recorded response"):
+                requests.get(f"{url}/other", timeout=5)
+
+    def test_replay_waits_scaled_latency(self, tmp_path, upstream):
+        _, url = upstream
+        _record(tmp_path, [lambda: requests.get(f"{url}/a", timeout=5)])
+        entry = json.loads((tmp_path / "interactions.jsonl").read_text())
+
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=2):
+            with patch("http_cassette.time.sleep") as mock_sleep:
+                requests.get(f"{url}/a", timeout=5)
+        mock_sleep.assert_called_once_with(entry["elapsed"] * 2)
+
+    def test_request_headers_not_stored(self, tmp_path, upstream):
+        _, url = upstream
+        _record(tmp_path, [lambda: requests.get(f"{url}/a", headers={"Authorization": "Bearer secret"}, timeout=5)])
+        assert "secret" not in (tmp_path / "interactions.jsonl").read_text()
+
+    def test_query_values_and_cookies_redacted(self, tmp_path, upstream):
+        server, url = upstream
+        _record(tmp_path, [
+            lambda: requests.get(f"{url}/feed.ics?token=feed-secret&days=7", timeout=5),
+            lambda: requests.get(f"{url}/feed.ics?token=other-secret&days=7", timeout=5),
+        ])
+        entries = [json.loads(line) for line in (tmp_path / "interactions.jsonl").read_text().splitlines()]
+        stored = json.dumps([{"url": e["url"], "headers": e["headers"]} for e in entries])
+        assert "feed-secret" not in stored and "days=7" not in stored
+        assert "REDACTED" in entries[0]["url"] and "cookie-secret" not in stored
+        server.shutdown()
+
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=0):
+            other = requests.get(f"{url}/feed.ics?token=other-secret&days=7", timeout=5)
+            first = requests.get(f"{url}/feed.ics?token=feed-secret&days=7", timeout=5)
+        assert first.json()["path"].endswith("token=feed-secret&days=7")
+        assert other.json()["path"].endswith("token=other-secret&days=7")
+        assert "Set-Cookie" not in first.headers
+
+    def test_redact_url_keeps_keys_and_path(self):
+        redacted = http_cassette.redact_url("https://user:pw@example.com/cal/basic.ics?key=abc&tz=")
+        assert redacted.startswith("https://user:REDACTED-") and "/cal/basic.ics?key=REDACTED-" in redacted
+        assert "abc" not in redacted and "pw@" not in redacted
+        assert http_cassette.redact_url("https://example.com/a") == "https://example.com/a"
+
+
+# ── httpx ──────────────────────────────────────────────────────────────────────
+
+class TestHttpx:
+    def test_sync_client_replay(self, tmp_path, upstream):
+        server, url = upstream
+        recorded = _record(tmp_path, [lambda: httpx.get(f"{url}/h", timeout=5)])[0]
+        server.shutdown()
+
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=0):
+            replayed = httpx.get(f"{url}/h", timeout=5)
+        assert replayed.json() == recorded.json()
+
+    def test_async_client_record_and_replay(self, tmp_path, upstream):
+        _, url = upstream
+
+        async def _get():
+            async with httpx.AsyncClient() as client:
+                return (await client.get(f"{url}/async", timeout=5)).json()
+
+        recorded = _record(tmp_path, [lambda: asyncio.run(_get())])[0]
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path), latency_scale=0):
+            assert asyncio.run(_get()) == recorded
+
+    def test_unrecorded_request_raises_connect_error(self, tmp_path, upstream):
+        _, url = upstream
+        _record(tmp_path, [])
+        with http_cassette.cassette(http_cassette.REPLAY, str(tmp_path)):
+            with pytest.raises(httpx.ConnectError):
+                httpx.get(f"{url}/other", timeout=5)
+
+
+# ── installation ───────────────────────────────────────────────────────────────
+
+class TestInstall:
+    def test_uninstall_restores_transports(self):
+        original = requests.adapters.HTTPAdapter.send
+        http_cassette.install(http_cassette.REPLAY, "/nonexistent")
+        assert requests.adapters.HTTPAdapter.send is not original
+        http_cassette.uninstall()
+        assert requests.adapters.HTTPAdapter.send is original
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            http_cassette.install("PLAYBACK")
@@ -0,0 +1,98 @@
+"""Tests for src/http_client.py — shared retrying GET for sync and async callers."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+import requests
+
+import circuit_breaker
+from http_client import async_get_with_retry, get_with_retry
+
+
+def _run(handler, **kwargs):
+    async def _go():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await async_get_with_retry(client, "https://example.com/data", **kwargs)
+
+    with patch("http_client.asyncio.sleep", side_effect=lambda s: asyncio.sleep(0)):
+        return asyncio.run(_go())
+
+
+# ── async_get_with_retry ───────────────────────────────────────────────────────
+
+class TestAsyncGetWithRetry:
+    def test_returns_response_on_success(self):
+        response = _run(lambda request: httpx.Response(200, json={"ok": True}))
+        assert response.json() == {"ok": True}
+
+    def test_retries_transient_status_then_succeeds(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503 if len(calls) < 3 else 200, text="ok")
+
+        response = _run(handler, initial_retry_delay=0.01)
+        assert response.status_code == 200
+        assert len(calls) == 3
+
+    def test_retries_transport_errors(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, text="ok")
+
+        assert _run(handler, initial_retry_delay=0.01).text == "ok"
+        assert len(calls) == 2
+
+    def test_non_transient_status_fails_fast(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(404)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            _run(handler)
+        assert len(calls) == 1
+
+    def test_gives_up_after_max_elapsed(self):
+        with pytest.raises(httpx.HTTPStatusError):
+            _run(lambda request: httpx.Response(500), initial_retry_delay=0.01, max_elapsed_seconds=0)
+
+    def test_not_modified_is_returned(self):
+        response = _run(lambda request: httpx.Response(304))
+        assert response.status_code == 304
+
+
+# ── get_with_retry ─────────────────────────────────────────────────────────────
+
+def _response(status):
+    response = requests.Response()
+    response.status_code = status
+    response.url = "https://example.com/points/0,0"
+    return response
+
+
+class TestGetWithRetry:
+    def test_not_found_fails_fast_without_counting_against_the_host(self):
+        with patch("http_client.requests.get", return_value=_response(404)) as mock_get, \
+                patch("http_client.circuit_breaker.record_failure") as record_failure, \
+                patch("http_client.time.sleep"):
+            with pytest.raises(requests.exceptions.HTTPError):
+                get_with_retry("https://example.com/points/0,0", initial_retry_delay=0.01)
+        assert mock_get.call_count == 1
+        record_failure.assert_not_called()
+        assert circuit_breaker.allow("https://example.com/other")
+
+    def test_transient_status_is_retried(self):
+        responses = [_response(503), _response(200)]
+        with patch("http_client.requests.get", side_effect=responses) as mock_get, \
+                patch("http_client.time.sleep"):
+            assert get_with_retry("https://example.com/data", initial_retry_delay=0.01).status_code == 200
+        assert mock_get.call_count == 2
@@ -0,0 +1,96 @@
+"""Tests for src/ics_parse_pool.py — parsing large feeds in worker processes."""
+
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import ics_parse_pool
+from get_ical_events import parse_icalendar
+
+
+@pytest.fixture(autouse=True)
+def _no_pool():
+    yield
+    ics_parse_pool.configure(0)
+
+
+def _feed(count):
+    events = [
+        "BEGIN:VEVENT\r\nUID:weekly\r\nDTSTART;TZID=Europe/Berlin:20260105T090000\r\n"
+        "DTEND;TZID=Europe/Berlin:20260105T100000\r\nRRULE:FREQ=WEEKLY;COUNT=10\r\nSUMMARY:Standup\r\n"
+        "LOCATION:Room 1\r\nEND:VEVENT"
+    ]
+    for i in range(count):
+        events.append(
+            f"BEGIN:VEVENT\r\nUID:event-{i}\r\nDTSTART:202603{i % 28 + 1:02d}T090000Z\r\n"
+            f"DTEND:202603{i % 28 + 1:02d}T100000Z\r\nSUMMARY:Meeting {i}\r\n"
+            f"DESCRIPTION:{'Agenda item. ' * 10}\r\nEND:VEVENT"
+        )
+    return ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + "\r\n".join(events) + "\r\nEND:VCALENDAR\r\n").encode()
+
+
+def _key(event):
+    return tuple((k, str(v)) for k, v in sorted(dict(event).items()) if v is not None)
+
+
+LARGE = _feed(200)
+SMALL = _feed(2)
+
+
+# ── pool ───────────────────────────────────────────────────────────────────────
+
+class TestPool:
+    def test_large_feed_parsed_in_a_worker_matches_in_process(self):
+        assert len(LARGE) >= ics_parse_pool._IN_PROCESS_BYTES
+        ics_parse_pool.configure(2)
+        with patch.object(ics_parse_pool, "_pool_failed") as pool_failed:
+            events = ics_parse_pool.parse_feed(LARGE)
+        pool_failed.assert_not_called()
+        assert sorted(map(_key, events)) == sorted(map(_key, parse_icalendar(LARGE.decode())))
+        assert {type(e["uid"]) for e in events} == {str}
+
+    def test_pool_is_started_on_first_use(self):
+        ics_parse_pool.configure(1)
+        assert ics_parse_pool._executor is None
+        ics_parse_pool.parse_feed(LARGE)
+        assert ics_parse_pool._executor is not None
+
+    def test_small_feed_stays_in_process(self):
+        ics_parse_pool.configure(1)
+        with patch.object(ics_parse_pool, "_start") as start:
+            events = ics_parse_pool.parse_feed(SMALL)
+        start.assert_not_called()
+        assert len(events) == 12
+
+    def test_without_workers_everything_is_parsed_in_process(self):
+        assert ics_parse_pool._executor is None
+        assert len(ics_parse_pool.parse_feed(LARGE)) == 210
+
+    def test_async_parse_uses_the_pool(self):
+        ics_parse_pool.configure(1)
+        events = asyncio.run(ics_parse_pool.parse_feed_async(LARGE))
+        assert len(events) == 210
+
+
+# ── failures ───────────────────────────────────────────────────────────────────
+
+class TestFailures:
+    def test_broken_pool_falls_back_to_in_process_and_is_restarted(self):
+        ics_parse_pool.configure(1)
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        with patch.object(ics_parse_pool, "_executor", MagicMock(**{"submit.return_value": future})):
+            events = ics_parse_pool.parse_feed(LARGE)
+            assert ics_parse_pool._executor is None
+        assert len(events) == 210
+        assert len(ics_parse_pool.parse_feed(LARGE)) == 210
+        assert ics_parse_pool._executor is not None
+
+    def test_declared_encoding_is_used_in_the_worker(self):
+        ics_parse_pool.configure(1)
+        feed = LARGE.replace(b"Meeting 0\r\n", "Réunion\r\n".encode("latin-1"))
+        events = ics_parse_pool.parse_feed(feed, "latin-1")
+        assert "Réunion" in {e["summary"] for e in events}
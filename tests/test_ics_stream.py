@@ -0,0 +1,156 @@
+"""Tests for src/ics_stream.py — the streaming pre-filter for iCalendar feeds."""
+
+import io
+from datetime import date, datetime
+
+import pytz
+
+from get_ical_events import events_today_from_ical
+from ics_stream import ICSScanner, scan_calendar
+
+TODAY = date(2026, 3, 10)
+
+
+def _event(uid, start, end, *extra, summary="Event"):
+    return "\r\n".join([
+        "BEGIN:VEVENT", f"UID:{uid}", f"DTSTART{start}", f"DTEND{end}", f"SUMMARY:{summary}", *extra, "END:VEVENT",
+    ])
+
+
+def _calendar(*components):
+    return "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//test//EN", *components, "END:VCALENDAR"]) + "\r\n"
+
+
+def _uids(ics):
+    return [line[4:] for line in ics.splitlines() if line.startswith("UID:")]
+
+
+_BERLIN = "\r\n".join([
+    "BEGIN:VTIMEZONE", "TZID:Europe/Berlin",
+    "BEGIN:STANDARD", "DTSTART:19701025T030000", "TZOFFSETFROM:+0200", "TZOFFSETTO:+0100", "END:STANDARD",
+    "END:VTIMEZONE",
+])
+_TOKYO = "\r\n".join([
+    "BEGIN:VTIMEZONE", "TZID:Asia/Tokyo",
+    "BEGIN:STANDARD", "DTSTART:19700101T000000", "TZOFFSETFROM:+0900", "TZOFFSETTO:+0900", "END:STANDARD",
+    "END:VTIMEZONE",
+])
+
+
+# ── window ─────────────────────────────────────────────────────────────────────
+
+class TestWindow:
+    def test_keeps_only_events_near_the_window(self):
+        ics = _calendar(
+            _event("past", ":20250101T090000Z", ":20250101T100000Z"),
+            _event("today", ":20260310T090000Z", ":20260310T100000Z"),
+            _event("tomorrow-utc", ":20260311T020000Z", ":20260311T030000Z"),
+            _event("future", ":20270101T090000Z", ":20270101T100000Z"),
+        )
+        assert _uids(scan_calendar(ics, TODAY)) == ["today", "tomorrow-utc"]
+
+    def test_multi_day_event_spanning_the_window_is_kept(self):
+        ics = _calendar(_event("trip", ";VALUE=DATE:20260301", ";VALUE=DATE:20260320"))
+        assert _uids(scan_calendar(ics, TODAY)) == ["trip"]
+
+    def test_event_without_dtend_is_dropped_like_the_parser_does(self):
+        ics = _calendar("BEGIN:VEVENT\r\nUID:open\r\nDTSTART:20260310T090000Z\r\nEND:VEVENT")
+        assert _uids(scan_calendar(ics, TODAY)) == []
+
+    def test_unreadable_dates_are_kept(self):
+        ics = _calendar(_event("odd", ":garbage", ":garbage"))
+        assert _uids(scan_calendar(ics, TODAY)) == ["odd"]
+
+    def test_other_components_are_skipped(self):
+        ics = _calendar("BEGIN:VTODO\r\nUID:todo\r\nDTSTART:20260310T090000Z\r\nEND:VTODO")
+        assert _uids(scan_calendar(ics, TODAY)) == []
+
+
+# ── recurrence ─────────────────────────────────────────────────────────────────
+
+class TestRecurrence:
+    def test_open_ended_series_is_kept(self):
+        ics = _calendar(_event("weekly", ":20200106T090000Z", ":20200106T100000Z", "RRULE:FREQ=WEEKLY"))
+        assert _uids(scan_calendar(ics, TODAY)) == ["weekly"]
+
+    def test_finished_and_future_series_are_dropped(self):
+        ics = _calendar(
+            _event("ended", ":20200106T090000Z", ":20200106T100000Z", "RRULE:FREQ=DAILY;UNTIL=20210101T000000Z"),
+            _event("later", ":20270106T090000Z", ":20270106T100000Z", "RRULE:FREQ=DAILY"),
+        )
+        assert _uids(scan_calendar(ics, TODAY)) == []
+
+    def test_override_moving_an_occurrence_into_the_window_keeps_its_series(self):
+        ics = _calendar(
+            _event("s", ":20260105T090000Z", ":20260105T100000Z", "RRULE:FREQ=WEEKLY;UNTIL=20260202T000000Z"),
+            _event("s", ":20260310T090000Z", ":20260310T100000Z", "RECURRENCE-ID:20260112T090000Z"),
+        )
+        assert _uids(scan_calendar(ics, TODAY)) == ["s", "s"]
+
+    def test_overrides_far_from_the_window_are_dropped(self):
+        ics = _calendar(
+            _event("s", ":20260105T090000Z", ":20260105T100000Z", "RRULE:FREQ=WEEKLY"),
+            _event("s", ":20260113T090000Z", ":20260113T100000Z", "RECURRENCE-ID:20260112T090000Z"),
+        )
+        assert _uids(scan_calendar(ics, TODAY)) == ["s"]
+
+
+# ── timezones ──────────────────────────────────────────────────────────────────
+
+class TestTimezones:
+    def test_only_referenced_vtimezones_are_kept(self):
+        ics = _calendar(
+            _BERLIN,
+            _TOKYO,
+            _event("berlin", ";TZID=Europe/Berlin:20260310T090000", ";TZID=Europe/Berlin:20260310T100000"),
+            _event("tokyo-past", ";TZID=Asia/Tokyo:20200310T090000", ";TZID=Asia/Tokyo:20200310T100000"),
+        )
+        result = scan_calendar(ics, TODAY)
+        assert "TZID:Europe/Berlin" in result
+        assert "TZID:Asia/Tokyo" not in result
+
+
+# ── streaming ──────────────────────────────────────────────────────────────────
+
+class TestStreaming:
+    def test_folded_lines_split_across_chunks(self):
+        ics = _calendar(_event(
+            "folded", ":20260310T090000Z", ":20260310T100000Z", summary="Café\r\n  meeting with a long title",
+        )).encode("utf-8")
+        scanner = ICSScanner(TODAY)
+        for i in range(0, len(ics), 7):
+            scanner.feed(ics[i:i + 7])
+        assert "SUMMARY:Café meeting with a long title" in scanner.close()
+        assert (scanner.scanned, scanner.kept) == (1, 1)
+
+    def test_reads_binary_stream_with_lf_line_endings(self):
+        ics = _calendar(_event("lf", ":20260310T090000Z", ":20260310T100000Z")).replace("\r\n", "\n")
+        assert _uids(scan_calendar(io.BytesIO(ics.encode()), TODAY)) == ["lf"]
+
+    def test_declared_charset_is_honoured(self):
+        ics = _calendar(_event("latin", ":20260310T090000Z", ":20260310T100000Z", summary="Réunion"))
+        result = scan_calendar(ics.encode("latin-1"), TODAY, encoding="latin-1")
+        assert "SUMMARY:Réunion" in result
+
+
+# ── parity with the full parse ─────────────────────────────────────────────────
+
+class TestParity:
+    def test_same_events_today_as_parsing_the_whole_feed(self):
+        tz = pytz.timezone("America/New_York")
+        today = datetime.now(tz).date()
+        stamp = today.strftime("%Y%m%d")
+        ics = _calendar(
+            _event("old", ":20200101T090000Z", ":20200101T100000Z"),
+            _event("now", f":{stamp}T150000Z", f":{stamp}T160000Z"),
+            _event("daily", ":20240101T150000Z", ":20240101T153000Z", "RRULE:FREQ=DAILY"),
+            _event("allday", f";VALUE=DATE:{stamp}", f";VALUE=DATE:{stamp}", summary="Holiday"),
+        )
+
+        def key(event):
+            return event["uid"], event["start"], event["end"], event["summary"]
+
+        full = sorted(map(key, events_today_from_ical(ics, tz)))
+        scanned = sorted(map(key, events_today_from_ical(scan_calendar(ics, today), tz)))
+        assert scanned == full
+        assert {uid for uid, *_ in full} == {"now", "daily", "allday"}
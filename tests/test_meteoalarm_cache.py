@@ -0,0 +1,174 @@
+"""Tests for src/meteoalarm_cache.py and the MeteoAlarm fetch path in get_forecast."""
+
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytz
+import requests
+
+import get_forecast
+import meteoalarm_cache
+from get_forecast import _fetch_alerts_meteoalarm, _parse_meteoalarm_items
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:cap="urn:oasis:names:tc:emergency:cap:1.2">
+  <channel>
+    <item>
+      <title>Yellow wind warning for Wien</title>
+      <description>Gusts up to 80 km/h</description>
+      <cap:severity>Moderate</cap:severity>
+      <cap:areaDesc>Wien</cap:areaDesc>
+    </item>
+    <item>
+      <title>Orange snow warning</title>
+      <description>Heavy snow</description>
+      <cap:severity>Severe</cap:severity>
+      <cap:areaDesc>Tirol Oberland</cap:areaDesc>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(meteoalarm_cache, "METEOALARM_CACHE_DIR", str(tmp_path))
+    meteoalarm_cache.clear()
+    yield
+    meteoalarm_cache.clear()
+
+
+def _response(status_code=200, content=FEED, headers=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.content = content
+    resp.raw = io.BytesIO(content)
+    resp.headers = headers or {"ETag": '"v1"', "Last-Modified": "Mon, 12 Jan 2026 10:00:00 GMT"}
+    return resp
+
+
+def _long_feed(regions):
+    """FEED with `regions` unrelated items listed before Wien and Tirol."""
+    filler = "".join(f"<item><title>Yellow rain warning for Region {i}</title></item>" for i in range(regions))
+    return FEED.replace(b"<channel>", f"<channel>{filler}".encode())
+
+
+def _alerts(city_state_str="Wien, Austria"):
+    return _fetch_alerts_meteoalarm("at", city_state_str, "24HR", pytz.UTC, "test")
+
+
+# ── index / lookup ─────────────────────────────────────────────────────────────
+
+class TestLookup:
+    ITEMS = [
+        {"title": "Yellow wind warning for Wien", "areas": ["Wien"]},
+        {"title": "Orange snow warning", "areas": ["Tirol Oberland"]},
+    ]
+
+    def test_matches_title_token(self):
+        entry = {"items": self.ITEMS, "index": meteoalarm_cache.build_index(self.ITEMS)}
+        assert meteoalarm_cache.lookup(entry, "Wien, Austria") == [self.ITEMS[0]]
+
+    def test_matches_cap_area_name(self):
+        entry = {"items": self.ITEMS, "index": meteoalarm_cache.build_index(self.ITEMS)}
+        assert meteoalarm_cache.lookup(entry, "Tirol Oberland") == [self.ITEMS[1]]
+
+    def test_compound_region_name_matches_by_substring(self):
+        items = self.ITEMS + [{"title": "Yellow thunderstorm warning for Berlin-Mitte", "areas": []}]
+        entry = {"items": items, "index": meteoalarm_cache.build_index(items)}
+        assert meteoalarm_cache.lookup(entry, "Berlin, Germany") == [items[2]]
+
+    def test_mentions_matches_like_lookup(self):
+        assert meteoalarm_cache.mentions(self.ITEMS[1], "Tirol Oberland")
+        assert meteoalarm_cache.mentions({"title": "Warning for Berlin-Mitte"}, "Berlin, Germany")
+        assert not meteoalarm_cache.mentions(self.ITEMS[1], "Wien")
+        assert not meteoalarm_cache.mentions(self.ITEMS[1], "")
+
+    def test_falls_back_to_all_items(self):
+        entry = {"items": self.ITEMS, "index": meteoalarm_cache.build_index(self.ITEMS)}
+        assert meteoalarm_cache.lookup(entry, "Graz") == self.ITEMS
+        assert meteoalarm_cache.lookup(entry, "") == self.ITEMS
+
+
+# ── streaming parse ────────────────────────────────────────────────────────────
+
+class TestParseItems:
+    def test_parses_cap_fields_from_stream(self):
+        items, truncated = _parse_meteoalarm_items(io.BytesIO(FEED))
+        assert not truncated
+        assert [i["title"] for i in items] == ["Yellow wind warning for Wien", "Orange snow warning"]
+        assert items[0]["severity"] == "Moderate"
+        assert items[1]["areas"] == ["Tirol Oberland"]
+
+    def test_stops_at_item_limit(self):
+        items, truncated = _parse_meteoalarm_items(FEED, limit=1)
+        assert len(items) == 1 and truncated
+
+    def test_matching_item_past_the_limit_is_kept(self, caplog):
+        items, truncated = _parse_meteoalarm_items(_long_feed(5), limit=3, locations=["Tirol Oberland, Austria"])
+        assert truncated
+        assert [i["title"] for i in items] == [
+            "Yellow rain warning for Region 0",
+            "Yellow rain warning for Region 1",
+            "Yellow rain warning for Region 2",
+            "Orange snow warning",
+        ]
+        assert "dropped 3 other item(s)" in caplog.text
+
+
+# ── conditional fetch ──────────────────────────────────────────────────────────
+
+class TestMeteoAlarmFetch:
+    def test_one_download_serves_every_recipient(self):
+        with patch("get_forecast._get_with_timeout_retry", return_value=_response()) as mock_get:
+            vienna = _alerts("Wien, Austria")
+            tyrol = _alerts("Tirol Oberland, Austria")
+        assert mock_get.call_count == 1
+        assert "Wien" in vienna and "snow" not in vienna
+        assert "snow" in tyrol and "Wien" not in tyrol
+
+    def test_revalidates_with_validators_and_reuses_parse_on_304(self, monkeypatch):
+        with patch("get_forecast._get_with_timeout_retry", return_value=_response()):
+            _alerts()
+        monkeypatch.setattr(meteoalarm_cache, "_METEOALARM_FRESH_SECONDS", 0)
+        with patch("get_forecast._get_with_timeout_retry", return_value=_response(304, b"")) as mock_get:
+            result = _alerts()
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Mon, 12 Jan 2026 10:00:00 GMT"
+        assert "Yellow wind warning for Wien" in result
+
+    def test_disk_entry_used_after_restart(self, monkeypatch):
+        with patch("get_forecast._get_with_timeout_retry", return_value=_response()):
+            _alerts()
+        meteoalarm_cache.clear()
+        monkeypatch.setattr(meteoalarm_cache, "_METEOALARM_FRESH_SECONDS", 0)
+        with patch("get_forecast._get_with_timeout_retry", return_value=_response(304, b"")) as mock_get:
+            result = _alerts()
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert "Wien" in result
+
+    def test_feed_is_streamed_and_closed(self):
+        resp = _response()
+        with patch("get_forecast._get_with_timeout_retry", return_value=resp) as mock_get:
+            assert "Wien" in _alerts()
+        assert mock_get.call_args.kwargs["stream"] is True
+        resp.close.assert_called_once()
+
+    def test_truncated_feed_is_fetched_again_for_an_uncovered_location(self, monkeypatch):
+        monkeypatch.setattr(get_forecast, "_METEOALARM_MAX_ITEMS", 3)
+        with patch(
+            "get_forecast._get_with_timeout_retry", side_effect=lambda *a, **k: _response(content=_long_feed(3))
+        ) as mock_get:
+            vienna = _alerts("Wien, Austria")
+            tyrol = _alerts("Tirol Oberland, Austria")
+            again = _alerts("Wien, Austria")
+        assert "Wien" in vienna and "Wien" in again
+        assert "snow" in tyrol
+        assert mock_get.call_count == 2
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+
+    def test_fetch_failure_returns_empty(self):
+        with patch("get_forecast._get_with_timeout_retry", side_effect=requests.ConnectionError("down")):
+            assert _alerts() == ""
@@ -0,0 +1,189 @@
+"""Tests for src/nws_cache.py and the NWS alert fetch path in get_forecast."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytz
+import requests
+
+import nws_cache
+from get_forecast import _fetch_alerts_us, _zones_from_point
+
+POINT = {
+    "properties": {
+        "forecastZone": "https://api.weather.gov/zones/forecast/NYZ072",
+        "county": "https://api.weather.gov/zones/county/NYC061",
+    }
+}
+
+
+def _alert(alert_id, event, description="Heavy snow expected.\n\nMore detail."):
+    return {
+        "id": alert_id,
+        "properties": {
+            "event": event,
+            "severity": "Moderate",
+            "headline": f"{event} issued",
+            "description": description,
+            "expires": "2026-01-13T18:00:00-05:00",
+        },
+    }
+
+
+ALERTS = {"features": [_alert("urn:a1", "Winter Storm Warning")]}
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(nws_cache, "NWS_CACHE_DIR", str(tmp_path))
+    nws_cache.clear()
+    yield
+    nws_cache.clear()
+
+
+def _json_response(payload):
+    resp = MagicMock()
+    resp.json.return_value = payload
+    return resp
+
+
+def _fake_get(alerts=ALERTS, calls=None):
+    def fake(url, **kwargs):
+        if calls is not None:
+            calls.append(url)
+        if "/points/" in url:
+            return _json_response(POINT)
+        return _json_response(alerts)
+    return fake
+
+
+def _alerts(lat=40.7128, lon=-74.006, mode=None):
+    return _fetch_alerts_us(lat, lon, "24HR", pytz.UTC, "test", mode)
+
+
+# ── zone resolution ────────────────────────────────────────────────────────────
+
+class TestZones:
+    def test_zone_ids_from_point_payload(self):
+        assert _zones_from_point(POINT) == ["NYZ072", "NYC061"]
+
+    def test_point_resolved_once_and_persisted(self):
+        calls = []
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get(calls=calls)):
+            _alerts()
+        nws_cache.clear()
+        calls.clear()
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get(calls=calls)):
+            _alerts()
+        assert not any("/points/" in url for url in calls)
+        assert any("zone=NYC061,NYZ072" in url for url in calls)
+
+    def test_unresolvable_point_falls_back_to_point_query(self):
+        calls = []
+
+        def fake(url, **kwargs):
+            calls.append(url)
+            if "/points/" in url:
+                raise requests.HTTPError("404")
+            return _json_response(ALERTS)
+
+        with patch("get_forecast._get_with_timeout_retry", side_effect=fake):
+            result = _alerts()
+        assert "Winter Storm Warning" in result
+        assert "alerts/active?point=40.7128,-74.006" in calls[-1]
+
+
+# ── per-zone alerts ────────────────────────────────────────────────────────────
+
+class TestZoneAlerts:
+    def test_recipients_in_same_zone_share_one_request(self):
+        calls = []
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get(calls=calls)):
+            _alerts(40.7128, -74.006)
+            nws_cache.put_zones(40.73, -73.99, ["NYZ072", "NYC061"])
+            _alerts(40.73, -73.99)
+        assert sum("alerts/active" in url for url in calls) == 1
+
+    def test_alerts_refetched_after_ttl(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(nws_cache, "_NWS_ALERTS_TTL_SECONDS", 0)
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get(calls=calls)):
+            _alerts()
+            _alerts()
+        assert sum("alerts/active" in url for url in calls) == 2
+
+    def test_fetch_failure_returns_empty(self):
+        nws_cache.put_zones(40.7128, -74.006, ["NYZ072"])
+        with patch("get_forecast._get_with_timeout_retry", side_effect=requests.ConnectionError("down")):
+            assert _alerts() == ""
+
+
+# ── new-since-last-email mode ──────────────────────────────────────────────────
+
+class TestNewAlertsMode:
+    def test_full_mode_repeats_full_text(self):
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get()):
+            with nws_cache.digest_alerts("a@example.com") as shown:
+                first = _alerts(mode="FULL")
+            shown.commit()
+            nws_cache.clear()
+            second = _alerts(mode="FULL")
+        assert "Heavy snow expected." in first
+        assert "Heavy snow expected." in second
+
+    def test_delivered_alert_is_shortened(self):
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get()):
+            with nws_cache.digest_alerts("a@example.com") as shown:
+                first = _alerts(mode="NEW")
+            shown.commit()
+            with nws_cache.digest_alerts("a@example.com"):
+                second = _alerts(mode="NEW")
+        assert "Heavy snow expected." in first
+        assert "Heavy snow expected." not in second
+        assert "**Winter Storm Warning** [Moderate] continues until" in second
+
+    def test_rendering_twice_without_delivering_keeps_full_text(self):
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get()):
+            with nws_cache.digest_alerts("a@example.com"):
+                first = _alerts(mode="NEW")
+            with nws_cache.digest_alerts("a@example.com"):
+                second = _alerts(mode="NEW")
+            third = _alerts(mode="NEW")  # outside of any build
+        assert "Heavy snow expected." in first
+        assert "Heavy snow expected." in second
+        assert "Heavy snow expected." in third
+        assert nws_cache.seen_ids(nws_cache.point_key(40.7128, -74.006)) == set()
+
+    def test_seen_alerts_are_kept_per_recipient(self):
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get()):
+            with nws_cache.digest_alerts("a@example.com") as shown:
+                _alerts(mode="NEW")
+            shown.commit()
+            with nws_cache.digest_alerts("b@example.com"):
+                other = _alerts(mode="NEW")
+        assert "Heavy snow expected." in other
+
+    def test_new_alert_alongside_continuing_one_gets_full_text(self):
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get()):
+            with nws_cache.digest_alerts("a@example.com") as shown:
+                _alerts(mode="NEW")
+            shown.commit()
+        nws_cache.clear()  # drop the in-memory alerts; seen IDs persist on disk
+        both = {"features": ALERTS["features"] + [_alert("urn:a2", "Flood Watch", "Rivers rising.")]}
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get(alerts=both)):
+            with nws_cache.digest_alerts("a@example.com"):
+                result = _alerts(mode="NEW")
+        assert "Rivers rising." in result
+        assert "Heavy snow expected." not in result
+
+    def test_expired_alerts_are_forgotten(self):
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get()):
+            with nws_cache.digest_alerts("a@example.com") as shown:
+                _alerts(mode="NEW")
+            shown.commit()
+        nws_cache.clear()
+        with patch("get_forecast._get_with_timeout_retry", side_effect=_fake_get(alerts={"features": []})):
+            with nws_cache.digest_alerts("a@example.com") as shown:
+                _alerts(mode="NEW")
+                shown.commit()
+                assert nws_cache.seen_ids(nws_cache.point_key(40.7128, -74.006)) == set()
@@ -0,0 +1,228 @@
+"""Tests for src/occurrence_index.py and the indexed webcal / CalDAV paths."""
+
+import sqlite3
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytz
+import requests
+
+import get_ical_events
+import occurrence_index
+from get_caldav_events import _sync_indexed_calendar
+from get_ical_events import get_ics_events
+
+TZ = pytz.timezone("America/New_York")
+DAY = date(2026, 3, 10)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(occurrence_index, "INDEX_PATH", str(tmp_path / "occurrences.sqlite3"))
+    occurrence_index.clear()
+    yield
+    occurrence_index.clear()
+
+
+def _event(uid, start, end, summary="Event", recurrence_id=None):
+    return {
+        "start": start, "end": end, "summary": summary, "location": None,
+        "uid": uid, "description": None, "recurrence_id": recurrence_id,
+    }
+
+
+def _uids(events):
+    return sorted(e["uid"] for e in events)
+
+
+# ── index ──────────────────────────────────────────────────────────────────────
+
+class TestIndex:
+    def test_range_query_returns_events_near_the_day(self):
+        occurrence_index.replace_source("s", {"": [
+            _event("past", datetime(2025, 1, 1, 9, tzinfo=pytz.UTC), datetime(2025, 1, 1, 10, tzinfo=pytz.UTC)),
+            _event("today", datetime(2026, 3, 10, 9, tzinfo=pytz.UTC), datetime(2026, 3, 10, 10, tzinfo=pytz.UTC)),
+            _event("future", datetime(2027, 1, 1, 9), datetime(2027, 1, 1, 10)),
+        ]}, "v1")
+        assert _uids(occurrence_index.events_between(["s"], DAY)) == ["today"]
+
+    def test_long_event_begun_earlier_is_found(self):
+        occurrence_index.replace_source("s", {"": [
+            _event("trip", date(2026, 2, 1), date(2026, 4, 1)),
+            _event("short", date(2026, 2, 1), date(2026, 2, 2)),
+        ]}, "v1")
+        assert _uids(occurrence_index.events_between(["s"], DAY)) == ["trip"]
+
+    def test_values_round_trip(self):
+        aware = TZ.localize(datetime(2026, 3, 10, 9, 30))
+        occurrence_index.replace_source("s", {"": [
+            _event("aware", aware, aware + timedelta(hours=1), recurrence_id=aware),
+            _event("floating", datetime(2026, 3, 10, 12), datetime(2026, 3, 10, 13)),
+            _event("allday", date(2026, 3, 10), date(2026, 3, 11)),
+        ]}, "v1")
+        events = {e["uid"]: e for e in occurrence_index.events_between(["s"], DAY)}
+        assert events["aware"]["start"] == aware
+        assert events["aware"]["recurrence_id"] == aware
+        assert events["floating"]["start"] == datetime(2026, 3, 10, 12)
+        assert events["allday"]["start"] == date(2026, 3, 10)
+
+    def test_only_requested_sources_are_queried(self):
+        today = _event("a", datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10))
+        occurrence_index.replace_source("s1", {"": [today]}, "v1")
+        occurrence_index.replace_source("s2", {"": [dict(today, uid="b")]}, "v1")
+        assert _uids(occurrence_index.events_between(["s2"], DAY)) == ["b"]
+
+    def test_update_objects_replaces_and_deletes_per_href(self):
+        start, end = datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10)
+        occurrence_index.replace_source("s", {
+            "/a.ics": [_event("a", start, end)],
+            "/b.ics": [_event("b", start, end)],
+        }, "token-1")
+        occurrence_index.update_objects("s", {
+            "/a.ics": [_event("a", start, end, summary="Moved")],
+            "/b.ics": None,
+        }, "token-2")
+        events = occurrence_index.events_between(["s"], DAY)
+        assert [(e["uid"], e["summary"]) for e in events] == [("a", "Moved")]
+        assert occurrence_index.source_state("s")["version"] == "token-2"
+
+    def test_events_without_uid_are_all_kept(self):
+        start, end = datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10)
+        occurrence_index.replace_source("s", {"": [
+            _event(None, start, end, summary="Dentist"),
+            _event(None, start, end, summary="Standup"),
+            _event(None, start + timedelta(hours=2), end + timedelta(hours=2), summary="Dentist"),
+        ]}, "v1")
+        events = occurrence_index.events_between(["s"], DAY)
+        assert sorted(e["summary"] for e in events) == ["Dentist", "Dentist", "Standup"]
+        assert {e["uid"] for e in events} == {None}
+
+    def test_index_from_an_older_schema_is_rebuilt(self):
+        with sqlite3.connect(occurrence_index.INDEX_PATH) as conn:
+            conn.execute("CREATE TABLE occurrences (source TEXT, uid TEXT)")
+        today = _event("a", datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10))
+        occurrence_index.replace_source("s", {"": [today]}, "v1")
+        assert _uids(occurrence_index.events_between(["s"], DAY)) == ["a"]
+
+    def test_content_version_ignores_dtstamp(self):
+        a = b"BEGIN:VEVENT\r\nDTSTAMP:20260101T000000Z\r\nUID:x\r\nEND:VEVENT\r\n"
+        b = b"BEGIN:VEVENT\r\nDTSTAMP:20260310T120000Z\r\nUID:x\r\nEND:VEVENT\r\n"
+        assert occurrence_index.content_version(a) == occurrence_index.content_version(b)
+        assert occurrence_index.content_version(a) != occurrence_index.content_version(a.replace(b"x", b"y"))
+
+
+# ── webcal feeds ───────────────────────────────────────────────────────────────
+
+def _feed(summary, uid="e1"):
+    now = datetime.now(TZ)
+    stamp = now.strftime("%Y%m%d")
+    return (
+        f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nBEGIN:VEVENT\r\nUID:{uid}\r\n"
+        f"DTSTAMP:{now.strftime('%Y%m%dT%H%M%S')}Z\r\n"
+        f"DTSTART;VALUE=DATE:{stamp}\r\nDTEND;VALUE=DATE:{stamp}\r\nSUMMARY:{summary}\r\n"
+        "END:VEVENT\r\nEND:VCALENDAR\r\n"
+    ).encode()
+
+
+def _response(body=b"", status=200, headers=None):
+    response = MagicMock(status_code=status, content=body, headers=headers or {})
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestWebcal:
+    URL = "https://example.com/cal.ics"
+
+    def _get(self, *responses):
+        with patch("http_client.requests.get", side_effect=list(responses)) as mock_get, \
+                patch("get_ical_events.parse_icalendar", wraps=get_ical_events.parse_icalendar) as parse:
+            events = [get_ics_events(self.URL, TZ, use_index=True) for _ in responses]
+        return events, mock_get, parse
+
+    def test_unchanged_feed_is_parsed_once(self):
+        events, _, parse = self._get(_response(_feed("Standup")), _response(_feed("Standup")))
+        assert [e["summary"] for e in events[1]] == ["Standup"]
+        assert parse.call_count == 1
+
+    def test_changed_feed_is_reindexed(self):
+        events, _, parse = self._get(_response(_feed("Standup")), _response(_feed("Retro")))
+        assert [e["summary"] for e in events[1]] == ["Retro"]
+        assert parse.call_count == 2
+
+    def test_not_modified_uses_index_and_sends_validators(self):
+        events, mock_get, parse = self._get(
+            _response(_feed("Standup"), headers={"ETag": '"v1"'}), _response(status=304),
+        )
+        assert [e["summary"] for e in events[1]] == ["Standup"]
+        assert mock_get.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert parse.call_count == 1
+
+    def test_download_failure_falls_back_to_index(self):
+        self._get(_response(_feed("Standup")))
+        with patch("get_ical_events.get_with_retry", side_effect=requests.ConnectionError("down")):
+            events = get_ics_events(self.URL, TZ, use_index=True)
+        assert [e["summary"] for e in events] == ["Standup"]
+
+
+# ── CalDAV sync ────────────────────────────────────────────────────────────────
+
+def _object(href, summary=None):
+    """A CalDAV object; one without data stands for a deleted object."""
+    return SimpleNamespace(url=href, data=_feed(summary, uid=href).decode() if summary else None)
+
+
+class _Collection(list):
+    def __init__(self, sync_token, objects):
+        super().__init__(objects)
+        self.sync_token = sync_token
+
+
+class TestCaldavSync:
+    def test_sync_token_changes_are_applied_incrementally(self):
+        cal = MagicMock()
+        cal.get_objects_by_sync_token.side_effect = [
+            _Collection("t1", [_object("/a.ics", "A"), _object("/b.ics", "B")]),
+            _Collection("t2", [_object("/b.ics")]),
+        ]
+        _sync_indexed_calendar(cal, "caldav:cal")
+        _sync_indexed_calendar(cal, "caldav:cal")
+
+        today = datetime.now(TZ).date()
+        assert [e["summary"] for e in occurrence_index.events_between(["caldav:cal"], today)] == ["A"]
+        assert cal.get_objects_by_sync_token.call_args_list[1].kwargs["sync_token"] == "t1"
+
+    def test_unchanged_token_skips_parsing(self):
+        cal = MagicMock()
+        cal.get_objects_by_sync_token.side_effect = [
+            _Collection("t1", [_object("/a.ics", "A")]),
+            _Collection("t1", []),
+        ]
+        _sync_indexed_calendar(cal, "caldav:cal")
+        with patch("get_caldav_events.parse_icalendar") as parse:
+            _sync_indexed_calendar(cal, "caldav:cal")
+        parse.assert_not_called()
+
+    def test_fake_token_is_reindexed_in_full(self):
+        cal = MagicMock()
+        cal.get_objects_by_sync_token.side_effect = [
+            _Collection("fake-1", [_object("/a.ics", "A"), _object("/b.ics", "B")]),
+            _Collection("fake-2", [_object("/b.ics", "B")]),
+        ]
+        _sync_indexed_calendar(cal, "caldav:cal")
+        _sync_indexed_calendar(cal, "caldav:cal")
+
+        today = datetime.now(TZ).date()
+        assert [e["summary"] for e in occurrence_index.events_between(["caldav:cal"], today)] == ["B"]
+        assert cal.get_objects_by_sync_token.call_args_list[1].kwargs["sync_token"] is None
+
+    def test_changed_objects_are_fetched_in_one_multiget(self):
+        cal = MagicMock()
+        cal.get_objects_by_sync_token.return_value = _Collection("t1", [_object("/a.ics"), _object("/b.ics")])
+        cal.multiget.return_value = [_object("/a.ics", "A")]  # /b.ics was deleted
+        _sync_indexed_calendar(cal, "caldav:cal")
+
+        cal.multiget.assert_called_once_with(["/a.ics", "/b.ics"])
+        today = datetime.now(TZ).date()
+        assert [e["summary"] for e in occurrence_index.events_between(["caldav:cal"], today)] == ["A"]
@@ -0,0 +1,117 @@
+"""Tests for src/outbox.py — spooling, delivery status and retry backoff."""
+
+import os
+import smtplib
+from unittest.mock import patch
+
+import outbox
+from outbox import enqueue, deliver_pending, outbox_status
+
+
+def _deliver(tmp_path, results=None, side_effect=None, **kwargs):
+    with patch("outbox.send_batch", return_value=results, side_effect=side_effect) as mock_batch:
+        counts = deliver_pending("smtp.example.com", 465, "user", "pass", outbox_dir=str(tmp_path), **kwargs)
+    return counts, mock_batch
+
+
+# ── enqueue ────────────────────────────────────────────────────────────────────
+
+class TestEnqueue:
+    def test_writes_body_and_pending_metadata(self, tmp_path):
+        message_id = enqueue("Subject: hi\n\nbody", "from@example.com", "to@example.com", outbox_dir=str(tmp_path))
+        assert os.path.exists(tmp_path / f"{message_id}.eml")
+        status = outbox_status(str(tmp_path))
+        assert status["pending"] == 1
+        meta = status["messages"][0]
+        assert meta["recipients"] == ["to@example.com"]
+        assert meta["attempts"] == 0
+
+
+# ── deliver_pending ────────────────────────────────────────────────────────────
+
+class TestDeliverPending:
+    def test_successful_delivery_marks_sent_and_removes_body(self, tmp_path):
+        message_id = enqueue("body", "from@example.com", ["to@example.com"], outbox_dir=str(tmp_path))
+        counts, mock_batch = _deliver(tmp_path, results=[(["to@example.com"], None)])
+        assert counts["sent"] == 1
+        assert not os.path.exists(tmp_path / f"{message_id}.eml")
+        assert outbox_status(str(tmp_path))["sent"] == 1
+        sent_messages = mock_batch.call_args[0][5]
+        assert sent_messages == [(["to@example.com"], "body")]
+
+    def test_failure_is_rescheduled_with_backoff(self, tmp_path):
+        enqueue("body", "from@example.com", ["to@example.com"], outbox_dir=str(tmp_path))
+        error = smtplib.SMTPServerDisconnected("down")
+        counts, _ = _deliver(tmp_path, results=[(["to@example.com"], error)])
+        assert counts["retrying"] == 1
+        meta = outbox_status(str(tmp_path))["messages"][0]
+        assert meta["status"] == "pending"
+        assert meta["attempts"] == 1
+        assert meta["next_attempt_at"] > meta["last_attempt_at"]
+        assert "down" in meta["last_error"]
+
+    def test_message_not_retried_before_backoff_elapses(self, tmp_path):
+        enqueue("body", "from@example.com", ["to@example.com"], outbox_dir=str(tmp_path))
+        _deliver(tmp_path, results=[(["to@example.com"], OSError("down"))])
+        counts, mock_batch = _deliver(tmp_path, results=[])
+        assert mock_batch.call_count == 0
+        assert counts == {"sent": 0, "retrying": 0, "failed": 0}
+
+    def test_marked_failed_after_max_attempts(self, tmp_path):
+        enqueue("body", "from@example.com", ["to@example.com"], outbox_dir=str(tmp_path))
+        with patch.object(outbox, "_MAX_ATTEMPTS", 1):
+            counts, _ = _deliver(tmp_path, results=[(["to@example.com"], OSError("down"))])
+        assert counts["failed"] == 1
+        assert outbox_status(str(tmp_path))["failed"] == 1
+
+    def test_refused_recipient_fails_without_retry(self, tmp_path):
+        enqueue("body", "from@example.com", ["to@example.com"], outbox_dir=str(tmp_path))
+        error = smtplib.SMTPRecipientsRefused({"to@example.com": (550, b"No such user")})
+        counts, _ = _deliver(tmp_path, results=[(["to@example.com"], error)])
+        assert counts == {"sent": 0, "retrying": 0, "failed": 1}
+        meta = outbox_status(str(tmp_path))["messages"][0]
+        assert meta["status"] == "failed"
+        assert meta["attempts"] == 1
+
+    def test_permanent_reply_codes_fail_and_temporary_ones_retry(self, tmp_path):
+        for error, expected in [
+            (smtplib.SMTPSenderRefused(553, b"Sender not allowed", "from@example.com"), "failed"),
+            (smtplib.SMTPDataError(554, b"Message rejected"), "failed"),
+            (smtplib.SMTPDataError(451, b"Try again later"), "retrying"),
+            (smtplib.SMTPRecipientsRefused({"to@example.com": (450, b"Mailbox busy")}), "retrying"),
+            (smtplib.SMTPAuthenticationError(535, b"Bad credentials"), "retrying"),
+        ]:
+            outbox_dir = tmp_path / str(error.__class__.__name__) / expected
+            enqueue("body", "from@example.com", ["to@example.com"], outbox_dir=str(outbox_dir))
+            counts, _ = _deliver(outbox_dir, results=[(["to@example.com"], error)])
+            assert counts[expected] == 1, error
+
+    def test_old_sent_and_failed_entries_are_pruned(self, tmp_path):
+        enqueue("sent", "from@example.com", ["a@example.com"], outbox_dir=str(tmp_path))
+        failed_id = enqueue("failed", "from@example.com", ["b@example.com"], outbox_dir=str(tmp_path))
+        error = smtplib.SMTPRecipientsRefused({"b@example.com": (550, b"No such user")})
+        _deliver(tmp_path, results=[(["a@example.com"], None), (["b@example.com"], error)])
+        assert os.path.exists(tmp_path / f"{failed_id}.eml")
+
+        with patch("outbox.time.time", return_value=outbox.time.time() + outbox._RETENTION_SECONDS + 60):
+            _deliver(tmp_path, results=[])
+        assert outbox_status(str(tmp_path))["messages"] == []
+        assert os.listdir(tmp_path) == []
+
+    def test_message_ids_limits_delivery(self, tmp_path):
+        enqueue("old", "from@example.com", ["a@example.com"], outbox_dir=str(tmp_path))
+        new_id = enqueue("new", "from@example.com", ["b@example.com"], outbox_dir=str(tmp_path))
+        _, mock_batch = _deliver(tmp_path, results=[(["b@example.com"], None)], message_ids={new_id})
+        assert mock_batch.call_args[0][5] == [(["b@example.com"], "new")]
+
+
+# ── _retry_delay ───────────────────────────────────────────────────────────────
+
+class TestRetryDelay:
+    def test_doubles_each_attempt(self):
+        assert outbox._retry_delay(1) == 60
+        assert outbox._retry_delay(2) == 120
+        assert outbox._retry_delay(3) == 240
+
+    def test_capped(self):
+        assert outbox._retry_delay(50) == 3600
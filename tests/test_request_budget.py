@@ -0,0 +1,117 @@
+"""Tests for src/request_budget.py and how the retry helpers honour it."""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import requests
+
+import request_budget
+from http_client import RequestBudgetExhausted, async_get_with_retry, get_with_retry
+
+
+def _ok():
+    resp = MagicMock()
+    resp.raise_for_status.return_value = None
+    return resp
+
+
+# ── context ────────────────────────────────────────────────────────────────────
+
+class TestRequestBudget:
+    def test_no_budget_outside_block(self):
+        assert request_budget.current() is None
+        assert request_budget.remaining() is None
+
+    def test_budget_set_and_reset(self):
+        with request_budget.request_budget(30) as budget:
+            assert request_budget.current() is budget
+            assert 0 < request_budget.remaining() <= 30
+        assert request_budget.current() is None
+
+    def test_thread_pool_sees_budget_via_copy_context(self):
+        with request_budget.request_budget(30) as budget:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                seen = pool.submit(contextvars.copy_context().run, request_budget.current).result()
+        assert seen is budget
+
+    def test_record_outside_block_is_ignored(self):
+        request_budget.record_cut_short("https://example.com", "skipped")
+
+
+# ── get_with_retry under a budget ──────────────────────────────────────────────
+
+class TestRetryUnderBudget:
+    def test_attempt_timeout_shortened_to_budget(self):
+        with request_budget.request_budget(5):
+            with patch("http_client.requests.get", return_value=_ok()) as mock_get:
+                get_with_retry("https://example.com", timeout=10)
+        assert mock_get.call_args.kwargs["timeout"] <= 5
+
+    def test_request_skipped_when_budget_exhausted(self):
+        with request_budget.request_budget(0) as budget:
+            with patch("http_client.requests.get") as mock_get:
+                with pytest.raises(RequestBudgetExhausted):
+                    get_with_retry("https://example.com")
+        mock_get.assert_not_called()
+        assert budget.cut_short == [("https://example.com", "skipped, budget exhausted")]
+
+    def test_exhausted_budget_is_a_request_exception(self):
+        assert issubclass(RequestBudgetExhausted, requests.RequestException)
+
+    def test_retry_skipped_when_sleep_would_not_leave_time(self):
+        calls = []
+
+        def fake_get(url, **kwargs):
+            calls.append(url)
+            raise requests.ConnectionError("refused")
+
+        with request_budget.request_budget(5) as budget:
+            with patch("http_client.requests.get", side_effect=fake_get), \
+                 patch("http_client.time.sleep") as mock_sleep:
+                with pytest.raises(requests.ConnectionError):
+                    get_with_retry("https://example.com", initial_retry_delay=10)
+        assert len(calls) == 1
+        mock_sleep.assert_not_called()
+        assert len(budget.cut_short) == 1
+        assert budget.cut_short[0][1].startswith("retry skipped")
+
+    def test_retries_normally_when_budget_allows(self):
+        responses = [requests.ConnectionError("refused"), _ok()]
+
+        def fake_get(url, **kwargs):
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with request_budget.request_budget(60) as budget:
+            with patch("http_client.requests.get", side_effect=fake_get), \
+                 patch("http_client.time.sleep"):
+                get_with_retry("https://example.com", initial_retry_delay=1)
+        assert budget.cut_short == []
+
+
+# ── async_get_with_retry under a budget ────────────────────────────────────────
+
+class TestAsyncRetryUnderBudget:
+    def test_request_skipped_when_budget_exhausted(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200)
+
+        async def _go():
+            with request_budget.request_budget(0) as budget:
+                async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                    with pytest.raises(RequestBudgetExhausted):
+                        await async_get_with_retry(client, "https://example.com")
+            return budget
+
+        budget = asyncio.run(_go())
+        assert calls == []
+        assert len(budget.cut_short) == 1
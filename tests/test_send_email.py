@@ -1,6 +1,9 @@
-"""Tests for src/send_email.py — convert_section and append_section."""
+"""Tests for src/send_email.py — section rendering, recipients and summary handling."""
 
-from send_email import convert_section, append_section
+from concurrent.futures import Future
+from unittest.mock import patch
+
+from send_email import convert_section, append_section, parse_recipients, render_email, resolve_summary
 
 
 # ── convert_section ────────────────────────────────────────────────────────────
@@ -56,3 +59,61 @@ class TestAppendSection:
     def test_text_format_false_skips_plain_text(self):
         text, _ = append_section("existing", "", "# Content", "section", text_format=False)
         assert text == "existing"
+
+
+# ── parse_recipients ───────────────────────────────────────────────────────────
+
+class TestParseRecipients:
+    def test_single_recipient(self):
+        assert parse_recipients("a@example.com", "Alex") == [("a@example.com", "Alex")]
+
+    def test_names_matched_by_position(self):
+        result = parse_recipients("a@example.com, b@example.com", "Alex, Blair")
+        assert result == [("a@example.com", "Alex"), ("b@example.com", "Blair")]
+
+    def test_missing_names_reuse_last_name(self):
+        result = parse_recipients("a@example.com,b@example.com", "Household")
+        assert result == [("a@example.com", "Household"), ("b@example.com", "Household")]
+
+    def test_empty_value_returns_no_recipients(self):
+        assert parse_recipients("", "Alex") == []
+
+
+# ── resolve_summary / render_email summary ordering ────────────────────────────
+
+class TestResolveSummary:
+    def test_plain_string_passes_through(self):
+        assert resolve_summary("# Summary\n\nHi") == "# Summary\n\nHi"
+
+    def test_waits_for_future(self):
+        future = Future()
+        future.set_result("# Summary\n\nDone")
+        assert resolve_summary(future) == "# Summary\n\nDone"
+
+    def test_deadline_returns_none(self):
+        assert resolve_summary(Future(), timeout=0.01) is None
+
+    def test_failed_future_returns_none(self):
+        future = Future()
+        future.set_exception(RuntimeError("boom"))
+        assert resolve_summary(future) is None
+
+
+class TestRenderEmailSummary:
+    def test_summary_started_from_leading_sections_and_placed_first(self):
+        future = Future()
+        future.set_result("# Summary\n\nBusy day.\n\n")
+        with patch("send_email.start_summary", return_value=future) as mock_start:
+            text, html = render_email(
+                "1.0", "UTC", "key", "True", "False", "Monday",
+                weather_string="# Weather", cal_string="# Calendar", rss_string="# News",
+            )
+        assert mock_start.call_args[0][0] == "# Weather\n\n# Calendar\n\n"
+        assert text.index("Busy day.") < text.index("# Weather") < text.index("# News")
+        assert html.index("section summary") < html.index("section weather")
+
+    def test_precomputed_summary_skips_generation(self):
+        with patch("send_email.start_summary") as mock_start:
+            text, _ = render_email("1.0", "UTC", "key", "True", "False", "Monday", summary="# Summary\n\nGiven.\n\n")
+        mock_start.assert_not_called()
+        assert "Given." in text
@@ -0,0 +1,106 @@
+"""Tests for src/smtp_session.py — connection reuse, reconnects and batching."""
+
+import smtplib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from smtp_session import SMTPSession, send_batch
+
+
+def _session(**kwargs):
+    return SMTPSession("smtp.example.com", 465, "user", "pass", **kwargs)
+
+
+# ── SMTPSession ────────────────────────────────────────────────────────────────
+
+class TestSMTPSession:
+    def test_one_login_for_many_messages(self):
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            with _session() as session:
+                for i in range(5):
+                    session.send("from@example.com", [f"to{i}@example.com"], "body")
+        assert mock_smtp.call_count == 1
+        server = mock_smtp.return_value
+        assert server.login.call_count == 1
+        assert server.sendmail.call_count == 5
+        server.quit.assert_called_once()
+
+    def test_string_recipient_is_wrapped_in_list(self):
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            with _session() as session:
+                session.send("from@example.com", "to@example.com", "body")
+        mock_smtp.return_value.sendmail.assert_called_once_with(
+            "from@example.com", ["to@example.com"], "body"
+        )
+
+    def test_session_recycled_after_message_cap(self):
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            with _session(max_messages_per_session=2) as session:
+                for i in range(5):
+                    session.send("from@example.com", ["to@example.com"], "body")
+        # 5 messages at 2 per session → 3 connections
+        assert mock_smtp.call_count == 3
+
+    def test_reconnects_on_server_disconnect(self):
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            mock_smtp.return_value.sendmail.side_effect = [
+                smtplib.SMTPServerDisconnected("bye"),
+                {},
+            ]
+            with _session() as session:
+                session.send("from@example.com", ["to@example.com"], "body")
+        assert mock_smtp.call_count == 2
+        assert mock_smtp.return_value.sendmail.call_count == 2
+
+    def test_dropped_connection_is_closed_before_reconnecting(self):
+        dropped, fresh = MagicMock(), MagicMock()
+        dropped.sendmail.side_effect = smtplib.SMTPServerDisconnected("bye")
+        dropped.close.side_effect = OSError("already closed")
+        with patch("smtplib.SMTP_SSL", side_effect=[dropped, fresh]):
+            with _session() as session:
+                session.send("from@example.com", ["to@example.com"], "body")
+        dropped.close.assert_called_once()
+        fresh.sendmail.assert_called_once()
+
+    def test_gives_up_after_repeated_disconnects(self):
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            mock_smtp.return_value.sendmail.side_effect = smtplib.SMTPServerDisconnected("bye")
+            with pytest.raises(smtplib.SMTPServerDisconnected):
+                with _session() as session:
+                    session.send("from@example.com", ["to@example.com"], "body")
+
+    def test_message_objects_are_serialised(self):
+        message = MagicMock()
+        message.as_string.return_value = "serialised"
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            with _session() as session:
+                session.send("from@example.com", ["to@example.com"], message)
+        mock_smtp.return_value.sendmail.assert_called_once_with(
+            "from@example.com", ["to@example.com"], "serialised"
+        )
+
+
+# ── send_batch ─────────────────────────────────────────────────────────────────
+
+class TestSendBatch:
+    def test_reports_per_message_failures_without_aborting(self):
+        refused = smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"no")})
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            mock_smtp.return_value.sendmail.side_effect = [{}, refused, {}]
+            results = send_batch(
+                "smtp.example.com", 465, "user", "pass", "from@example.com",
+                [(["a@example.com"], "1"), (["bad@example.com"], "2"), (["c@example.com"], "3")],
+            )
+        assert [err is None for _, err in results] == [True, False, True]
+        assert mock_smtp.call_count == 1
+
+    def test_auth_failure_is_not_retried_per_message(self):
+        with patch("smtplib.SMTP_SSL") as mock_smtp:
+            mock_smtp.return_value.login.side_effect = smtplib.SMTPAuthenticationError(535, b"bad")
+            results = send_batch(
+                "smtp.example.com", 465, "user", "pass", "from@example.com",
+                [(["a@example.com"], "1"), (["b@example.com"], "2")],
+            )
+        assert all(isinstance(err, smtplib.SMTPAuthenticationError) for _, err in results)
+        assert mock_smtp.return_value.login.call_count == 1
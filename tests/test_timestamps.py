@@ -0,0 +1,65 @@
+"""Tests for src/timestamps.py — shared timestamp parsing and formatting."""
+
+from datetime import datetime, timezone
+
+import pytz
+
+from timestamps import format_timestamp, output_format, parse_timestamp
+
+NY = pytz.timezone("America/New_York")
+
+
+# ── parse_timestamp ────────────────────────────────────────────────────────────
+
+class TestParseTimestamp:
+    def test_iso_with_offset(self):
+        assert parse_timestamp("2026-01-15T08:30:00-05:00") == datetime(2026, 1, 15, 13, 30, tzinfo=timezone.utc)
+
+    def test_iso_with_z_suffix(self):
+        assert parse_timestamp("2026-01-15T08:30:00Z") == datetime(2026, 1, 15, 8, 30, tzinfo=timezone.utc)
+
+    def test_iso_without_offset_is_naive(self):
+        assert parse_timestamp("2026-01-15T08:30:00").tzinfo is None
+
+    def test_rfc_2822(self):
+        assert parse_timestamp("Thu, 15 Jan 2026 08:30:00 +0000") == datetime(
+            2026, 1, 15, 8, 30, tzinfo=timezone.utc
+        )
+
+    def test_rfc_2822_without_weekday(self):
+        assert parse_timestamp("15 Jan 2026 08:30:00 GMT").day == 15
+
+    def test_unparseable_and_empty(self):
+        assert parse_timestamp("soon") is None
+        assert parse_timestamp("2026-13-45T99:00:00") is None
+        assert parse_timestamp("") is None
+
+
+# ── format_timestamp ───────────────────────────────────────────────────────────
+
+class TestFormatTimestamp:
+    def test_converts_to_timezone(self):
+        assert format_timestamp("2026-01-15T13:30:00+00:00", "24HR", NY) == "2026-01-15 08:30 EST"
+
+    def test_12_hour(self):
+        assert format_timestamp("2026-01-15T13:30:00+00:00", "12hr", NY) == "2026-01-15 08:30 AM EST"
+
+    def test_naive_iso_is_not_shifted(self):
+        assert format_timestamp("2026-01-15T13:30:00", "24HR", NY).startswith("2026-01-15 13:30")
+
+    def test_raw_string_returned_when_unparseable(self):
+        assert format_timestamp("until further notice", "24HR", NY) == "until further notice"
+
+    def test_styles(self):
+        assert format_timestamp("2026-01-15T13:30:00+00:00", "12HR", NY, style="time") == "8:30 AM"
+        assert format_timestamp("2026-01-15T13:30:00+00:00", "24HR", NY, style="datetime") == (
+            "08:30 on Thursday, January 15, 2026"
+        )
+
+
+class TestOutputFormat:
+    def test_cached_per_time_system(self):
+        output_format.cache_clear()
+        output_format("24HR")
+        output_format("24HR")
+        assert output_format.cache_info().hits == 1
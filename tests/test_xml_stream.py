@@ -0,0 +1,63 @@
+"""Tests for src/xml_stream.py — incremental element iteration over XML feeds."""
+
+import io
+
+import pytest
+import xml.etree.ElementTree as ET
+
+from xml_stream import iter_elements
+
+FEED = b"""<?xml version="1.0"?>
+<rss xmlns:cap="urn:oasis:names:tc:emergency:cap:1.2">
+  <channel>
+    <title>Feed</title>
+    <item><title>one</title><cap:severity>Minor</cap:severity></item>
+    <item><title>two</title></item>
+    <item><title>three</title></item>
+  </channel>
+</rss>
+"""
+
+
+class _CountingStream(io.BytesIO):
+    """BytesIO that records how many bytes have been read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+# ── iter_elements ──────────────────────────────────────────────────────────────
+
+class TestIterElements:
+    def test_yields_each_matching_element(self):
+        titles = [item.findtext("title") for item in iter_elements(FEED, "item")]
+        assert titles == ["one", "two", "three"]
+
+    def test_accepts_file_like_source(self):
+        assert len(list(iter_elements(io.BytesIO(FEED), "item"))) == 3
+
+    def test_matches_namespaced_tags_by_local_name(self):
+        severities = [el.text for el in iter_elements(FEED, "severity")]
+        assert severities == ["Minor"]
+
+    def test_processed_elements_are_cleared(self):
+        seen = list(iter_elements(FEED, "item"))
+        assert len(seen) == 3
+        assert all(len(item) == 0 and item.text is None for item in seen)
+
+    def test_limit_stops_without_reading_rest_of_stream(self):
+        big = FEED.replace(b"</channel>", b"<item><title>x</title></item>" * 20000 + b"</channel>")
+        stream = _CountingStream(big)
+        items = [item.findtext("title") for item in iter_elements(stream, "item", limit=2)]
+        assert items == ["one", "two"]
+        assert stream.bytes_read < len(big)
+
+    def test_malformed_xml_raises_parse_error(self):
+        with pytest.raises(ET.ParseError):
+            list(iter_elements(b"<rss><item>", "item"))